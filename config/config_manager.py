@@ -1,8 +1,14 @@
+import os
 import json
+import time
 import fcntl
+import atexit
+import threading
 from pathlib import Path
 from typing import Dict, List
 from contextlib import contextmanager
+from config.state_journal import StateJournal
+from utils.stats_aggregator import StatsAggregator
 
 class ConfigManager:
     def __init__(self):
@@ -13,8 +19,17 @@ class ConfigManager:
         
         self.config_file = self.root_path / "scraper_config.json"
         self.lock_file = self.root_path / "scraper_config.json.lock"
+        self.journal_file = self.root_path / "scraper_config.journal"
         self.extractable_types: dict[str, str] = {} 
+
+        # Estado em memória: processed/failed/not_found são sets ordenados (dict),
+        # as transições vão para o journal e o JSON só é reescrito na compactação
+        self.state_lock = threading.RLock()
+        self.journal = StateJournal(self.journal_file)
+        self._dirty = False
+
         self.load_config()
+        atexit.register(self.flush)
     
     def _file_lock(self):
         """Context manager para file lock (Linux/Unix)"""
@@ -37,20 +52,100 @@ class ConfigManager:
         return lock()
         
     def load_config(self):
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-            except json.JSONDecodeError:
-                # Se o arquivo estiver corrompido, recria
-                print("⚠️ Config file corrupted. Recreating defaults.")
+        with self.state_lock:
+            # Recarregar não pode descartar stats pendentes em memória
+            if getattr(self, 'data', None) and self._dirty:
+                self.save_config()
+
+            if self.config_file.exists():
+                try:
+                    with open(self.config_file, 'r', encoding='utf-8') as f:
+                        self.data = json.load(f)
+                except json.JSONDecodeError:
+                    # Se o arquivo estiver corrompido, recria
+                    print("⚠️ Config file corrupted. Recreating defaults.")
+                    self.data = {}
+                
+                self.migrate_config()
+            else:
+                # Cria a estrutura padrão inicial
                 self.data = {}
-            
-            self.migrate_config()
-        else:
-            # Cria a estrutura padrão inicial
-            self.data = {}
-            self.migrate_config()
+                self.migrate_config()
+
+            self._load_status_sets()
+            self._replay_journal()
+
+            if self._dirty:
+                self.save_config()
+
+    def _load_status_sets(self):
+        """Converte as listas do snapshot em sets ordenados (membership e remoção O(1))"""
+        for site_type in ["essence", "main"]:
+            for key in StateJournal.STATUS_KEYS.values():
+                self.data[site_type][key] = dict.fromkeys(self.data[site_type].get(key) or [])
+
+    def _replay_journal(self):
+        """Recuperação de crash: reaplica as transições que ainda não entraram no snapshot"""
+        replayed = 0
+        for site_type, status, item_id in self.journal.replay():
+            if site_type not in self.data:
+                continue
+            if status == StateJournal.CLEAR_FAILED:
+                self.data[site_type]["failed_items"].clear()
+            else:
+                self._apply_status(site_type, status, item_id)
+            replayed += 1
+
+        if replayed:
+            print(f"♻️ Journal: {replayed} transições recuperadas")
+            self._dirty = True
+
+    def _apply_status(self, site_type: str, status: str, item_id: str) -> bool:
+        """Move o item para a lista do status, removendo das outras. Retorna se mudou algo"""
+        changed = False
+        for journal_status, key in StateJournal.STATUS_KEYS.items():
+            items = self.data[site_type][key]
+            if journal_status == status:
+                if item_id not in items:
+                    items[item_id] = None
+                    changed = True
+            elif item_id in items:
+                del items[item_id]
+                changed = True
+
+        if status == "processed":
+            self.data[site_type]["last_item"] = item_id
+        return changed
+
+    def _set_status(self, site_type: str, status: str, item_id: str):
+        with self.state_lock:
+            if self._apply_status(site_type, status, item_id):
+                self.journal.append(site_type, status, item_id)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Compacta journal + stats pendentes no snapshot quando o limite é atingido"""
+        if self.journal.should_compact():
+            self.save_config()
+        elif self._dirty and time.monotonic() - self.journal.last_compact >= self.journal.compact_interval:
+            self.save_config()
+
+    def _serializable_data(self) -> Dict:
+        snapshot = {}
+        for key, value in self.data.items():
+            if isinstance(value, dict) and key in ("essence", "main"):
+                value = {
+                    k: (list(v) if k in StateJournal.STATUS_KEYS.values() else v)
+                    for k, v in value.items()
+                }
+            snapshot[key] = value
+        return snapshot
+
+    def flush(self):
+        """Grava o snapshot se houver transições ou stats pendentes (shutdown)"""
+        with self.state_lock:
+            if self._dirty or self.journal.pending:
+                self.save_config()
     
     def migrate_config(self):
         """Garante que todas as chaves necessárias existam no config"""
@@ -104,22 +199,29 @@ class ConfigManager:
                             changed = True
 
         if changed:
-            self.save_config()
+            # Gravado no fim do load_config, depois do replay do journal
+            self._dirty = True
     
     def save_config(self):
-        """🔒 SALVA COM FILE LOCK"""
-        with self._file_lock():
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2)
+        """🔒 SALVA COM FILE LOCK (snapshot atômico + truncate do journal)"""
+        with self.state_lock:
+            snapshot = self._serializable_data()
+            with self._file_lock():
+                tmp_file = self.config_file.with_suffix('.json.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.config_file)
+                self.journal.truncate()
+            self._dirty = False
 
     def save_stats(self, site_type: str, stats: Dict):
-        """Salva estatísticas no config"""
-        with self._file_lock():
-            self.data[site_type]["stats"] = stats
-            # Otimização: Não precisamos salvar o arquivo inteiro a cada update de stat se for frequente,
-            # mas para segurança, manteremos o dump.
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2)
+        """Salva estatísticas no config (persistidas na próxima compactação)"""
+        with self.state_lock:
+            self.data[site_type]["stats"] = dict(stats)
+            self._dirty = True
+            self._maybe_compact()
     
     def load_stats(self, site_type: str) -> Dict:
         """Carrega estatísticas da memória"""
@@ -127,132 +229,30 @@ class ConfigManager:
     
     def update_stats_from_files(self, site_type: str) -> Dict:
         """
-        Lê o disco para contar arquivos processados real.
-        Útil para quando reinicia a aplicação.
+        Recalcula os stats a partir do item store ativo (arquivos ou SQLite).
+        Útil para quando reinicia a aplicação. Durante o scraping use o
+        StatsAggregator (uma varredura + deltas) em vez de chamar isto por item.
         """
-        # ⚠️ CORREÇÃO CRÍTICA: Usar self.root_path
-        output_dir = self.root_path / f"html_items_{site_type}"
-        
-        if not output_dir.exists():
-            return self.data[site_type]["stats"]
-            
-        stats = {
-            "total_items": self.data[site_type].get("extractable_count", 0),
-            "processed_items": 0,
-            "successful_items": 0,
-            "failed_items": 0,
-            "not_found_items": 0,
-            "item_box_found": 0,
-            "skill_box_found": 0,
-            "total_guaranteed_items": 0,
-            "total_random_items": 0,
-            "total_possible_items": 0
-        }
-        
-        # Lista diretórios numéricos apenas
-        processed_dirs = [d for d in output_dir.iterdir() if d.is_dir() and d.name.isdigit()]
-        stats["processed_items"] = len(processed_dirs)
-        
-        for item_dir in processed_dirs:
-            json_file = item_dir / "data.json"
-            if json_file.exists():
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    if data.get('scraping_info', {}).get('is_extractable', False):
-                        stats["successful_items"] += 1
-                        
-                        box_data = data.get('box_data', {})
-                        item_type = data.get('scraping_info', {}).get('item_type', '')
-                        
-                        if item_type == "PEEL":
-                            stats["item_box_found"] += 1
-                        else:
-                            stats["skill_box_found"] += 1
-                            
-                        stats["total_guaranteed_items"] += len(box_data.get("guaranteed_items", []))
-                        stats["total_random_items"] += len(box_data.get("random_items", []))
-                        stats["total_possible_items"] += len(box_data.get("possible_items", []))
-                    else:
-                        stats["not_found_items"] += 1
-                        
-                except Exception:
-                    # Se arquivo corrompido, conta como falha
-                    stats["failed_items"] += 1
-        
-        # Sincroniza com as listas de falha conhecidas no config
-        stats["failed_items"] = len(self.data[site_type]["failed_items"])
-        stats["not_found_items"] = len(self.data[site_type]["not_found_items"])
+        stats = StatsAggregator(self, site_type).seed()
         
         # Atualiza a memória e salva
         self.save_stats(site_type, stats)
         return stats
             
     def add_processed_item(self, site_type: str, item_id: str):
-        with self._file_lock():
-            changed = False
-            if item_id not in self.data[site_type]["processed_items"]:
-                self.data[site_type]["processed_items"].append(item_id)
-                changed = True
-            
-            if item_id in self.data[site_type]["failed_items"]:
-                self.data[site_type]["failed_items"].remove(item_id)
-                changed = True
-                
-            if item_id in self.data[site_type]["not_found_items"]:
-                self.data[site_type]["not_found_items"].remove(item_id)
-                changed = True
-                
-            self.data[site_type]["last_item"] = item_id
-            
-            if changed:
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.data, f, indent=2)
+        self._set_status(site_type, "processed", item_id)
             
     def add_failed_item(self, site_type: str, item_id: str):
-        with self._file_lock():
-            changed = False
-            if item_id not in self.data[site_type]["failed_items"]:
-                self.data[site_type]["failed_items"].append(item_id)
-                changed = True
-                
-            if item_id in self.data[site_type]["processed_items"]:
-                self.data[site_type]["processed_items"].remove(item_id)
-                changed = True
-                
-            if item_id in self.data[site_type]["not_found_items"]:
-                self.data[site_type]["not_found_items"].remove(item_id)
-                changed = True
-            
-            if changed:
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.data, f, indent=2)
+        self._set_status(site_type, "failed", item_id)
             
     def add_not_found_item(self, site_type: str, item_id: str):
-        with self._file_lock():
-            changed = False
-            if item_id not in self.data[site_type]["not_found_items"]:
-                self.data[site_type]["not_found_items"].append(item_id)
-                changed = True
-                
-            if item_id in self.data[site_type]["processed_items"]:
-                self.data[site_type]["processed_items"].remove(item_id)
-                changed = True
-                
-            if item_id in self.data[site_type]["failed_items"]:
-                self.data[site_type]["failed_items"].remove(item_id)
-                changed = True
-                
-            if changed:
-                with open(self.config_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.data, f, indent=2)
+        self._set_status(site_type, "not_found", item_id)
             
     def clear_failed_items(self, site_type: str):
-        with self._file_lock():
-            self.data[site_type]["failed_items"] = []
-            with open(self.config_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
+        with self.state_lock:
+            self.data[site_type]["failed_items"].clear()
+            self.journal.append(site_type, StateJournal.CLEAR_FAILED)
+            self._maybe_compact()
     
     def get_site_stats(self, site_type: str) -> Dict:
         # Garante que estrutura existe
@@ -268,10 +268,10 @@ class ConfigManager:
         }
 
     def save_current_state(self, site_type: str, stats: dict):
-        with self._file_lock():
-            self.data[site_type]["last_stats"] = stats
-            with open(self.config_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
+        with self.state_lock:
+            self.data[site_type]["last_stats"] = dict(stats)
+            self._dirty = True
+            self._maybe_compact()
 
     def load_current_state(self, site_type: str) -> dict:
         return self.data[site_type].get("last_stats", {})
@@ -317,12 +317,12 @@ class ConfigManager:
             return all_items
         
         # 📊 MODO INCREMENTAL
-        processed_set = set(self.data[site_type]["processed_items"])
-        not_found_set = set(self.data[site_type]["not_found_items"])
-        failed_set = set(self.data[site_type]["failed_items"])
+        processed_set = self.data[site_type]["processed_items"]
+        not_found_set = self.data[site_type]["not_found_items"]
+        failed_set = self.data[site_type]["failed_items"]
         
         # Remove items já processados ou não encontrados
-        already_checked = processed_set | not_found_set
+        already_checked = processed_set.keys() | not_found_set.keys()
         
         candidates = [
             item for item in all_items 
@@ -0,0 +1,90 @@
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Iterator, Tuple
+
+
+class StateJournal:
+    """
+    Log append-only das transições de status dos itens (processed/failed/not_found).
+
+    Cada transição vira uma linha `site<TAB>status<TAB>item_id` no fim do arquivo,
+    custo O(1) em vez de reescrever o scraper_config.json inteiro.
+    O ConfigManager compacta o log num snapshot periodicamente e no shutdown,
+    e faz replay das linhas na inicialização para recuperar de um crash.
+    """
+
+    # status do journal -> chave da lista no config
+    STATUS_KEYS = {
+        "processed": "processed_items",
+        "failed": "failed_items",
+        "not_found": "not_found_items",
+    }
+    CLEAR_FAILED = "clear_failed"
+
+    def __init__(self, journal_file: Path, compact_every: int = 1000, compact_interval: float = 60.0):
+        self.journal_file = Path(journal_file)
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+
+        self.pending = 0
+        self.last_compact = time.monotonic()
+        self._lock = threading.Lock()
+        self._handle = None
+
+    def _open(self):
+        if self._handle is None:
+            self._handle = open(self.journal_file, 'a', encoding='utf-8')
+        return self._handle
+
+    def append(self, site_type: str, status: str, item_id: str = "-"):
+        """Registra uma transição (uma linha, sem reescrever nada)"""
+        line = f"{site_type}\t{status}\t{item_id}\n"
+        with self._lock:
+            handle = self._open()
+            handle.write(line)
+            handle.flush()
+            self.pending += 1
+
+    def replay(self) -> Iterator[Tuple[str, str, str]]:
+        """Lê as transições gravadas desde o último snapshot (ignora linha truncada por crash)"""
+        if not self.journal_file.exists():
+            return
+
+        with open(self.journal_file, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    # Última linha incompleta: escrita interrompida
+                    break
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) != 3:
+                    continue
+                site_type, status, item_id = parts
+                if status in self.STATUS_KEYS or status == self.CLEAR_FAILED:
+                    yield site_type, status, item_id
+
+    def should_compact(self) -> bool:
+        if self.pending == 0:
+            return False
+        if self.pending >= self.compact_every:
+            return True
+        return time.monotonic() - self.last_compact >= self.compact_interval
+
+    def truncate(self):
+        """Chamado depois que o snapshot foi gravado: o log volta a ficar vazio"""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            with open(self.journal_file, 'w', encoding='utf-8') as f:
+                f.flush()
+                os.fsync(f.fileno())
+            self.pending = 0
+            self.last_compact = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
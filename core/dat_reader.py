@@ -0,0 +1,179 @@
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Campos usados por TODOS os consumidores de cada tipo de .dat. Pedir sempre o conjunto
+# completo garante que cada arquivo seja lido uma única vez por sessão.
+ITEM_NAME_FIELDS = ('id', 'name', 'additionalname', 'default_action')
+SKILL_FIELDS = ('skill_id', 'skill_level', 'skill_sublevel', 'name', 'desc', 'desc_param', 'icon')
+SKILLGRP_FIELDS = ('skill_id', 'icon')
+RELIC_FIELDS = ('relics_id', 'item_id', 'grade', 'skill_id', 'level')
+RELIC_COLLECTION_FIELDS = ('relics_collection_id', 'category', 'relics_collection_name',
+                           'option_id', 'need_relics')
+ETCITEMGRP_FIELDS = ('object_id', 'material_type')
+
+# chave=[texto com espaços] | chave={{a;b};{c;d}} | chave=valor
+_FIELD_RE = re.compile(
+    r'(?<!\S)(\w+)='
+    r'(?:\[([^\]]*)\]'
+    r'|(\{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*\})'
+    r'|(\S*))'
+)
+
+
+def _tokenize_regex(line: str, fields: Optional[frozenset]) -> Dict[str, str]:
+    record = {}
+    for match in _FIELD_RE.finditer(line):
+        key = match.group(1)
+        if key in record or (fields is not None and key not in fields):
+            continue
+        value = match.group(2)
+        if value is None:
+            value = match.group(3)
+            if value is None:
+                value = match.group(4)
+        record[key] = value
+    return record
+
+
+def tokenize_line(line: str, fields: Optional[frozenset] = None) -> Dict[str, str]:
+    """
+    Quebra um registro .dat (uma linha) em {campo: valor}.
+    Valores [..] vêm sem os colchetes; valores {..} vêm crus.
+    Só o primeiro valor de cada campo é mantido.
+
+    Caminho rápido: split por TAB (formato padrão dos dumps). Linhas separadas por
+    espaço ou com TAB dentro de [..] caem no regex.
+    """
+    if '\t' not in line:
+        return _tokenize_regex(line, fields)
+
+    record = {}
+    for token in line.rstrip('\r\n').split('\t'):
+        key, sep, value = token.partition('=')
+        if not sep:
+            continue
+        key = key.strip()
+        if key in record or (fields is not None and key not in fields):
+            continue
+        if value[:1] == '[':
+            if value[-1:] != ']':
+                return _tokenize_regex(line, fields)
+            value = value[1:-1]
+        record[key] = value
+    return record
+
+
+def split_tuples(value: Optional[str]) -> List[List[str]]:
+    """'{{50579;6;72};{50579;7;72}}' -> [['50579', '6', '72'], ['50579', '7', '72']]"""
+    if not value:
+        return []
+    inner = value.strip().strip('{}')
+    if not inner:
+        return []
+    return [part.replace('{', '').replace('}', '').split(';') for part in inner.split('};{')]
+
+
+def to_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _DatTable:
+    """Registros de um .dat já tokenizados: colunas fixas, uma tupla por linha"""
+
+    __slots__ = ('tag', 'fields', 'rows', 'size', 'mtime_ns')
+
+    def __init__(self, tag: str, fields: Tuple[str, ...], rows: List[tuple], size: int, mtime_ns: int):
+        self.tag = tag
+        self.fields = fields
+        self.rows = rows
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+
+class DatReader:
+    """
+    Tokenizer único para os .dat do cliente (uma linha por registro: <tag>_begin ... <tag>_end).
+
+    O arquivo é lido em streaming uma vez; os campos pedidos ficam numa tabela em memória
+    (por sessão, invalidada por tamanho/mtime) e cada consumidor só projeta as colunas de
+    que precisa. Se um consumidor pedir um campo que não está na tabela, o arquivo é relido
+    com a união dos campos.
+    """
+
+    _tables: Dict[Tuple[str, str], _DatTable] = {}
+    _lock = threading.Lock()
+    _path_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    @staticmethod
+    def stream(dat_file, tag: str, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, str]]:
+        """Lê o arquivo linha a linha e gera um dict por registro <tag>_begin (sem cache)"""
+        begin = f"{tag}_begin"
+        wanted = frozenset(fields) if fields is not None else None
+        with open(dat_file, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                line = line.lstrip()
+                if not line.startswith(begin):
+                    continue
+                yield tokenize_line(line, wanted)
+
+    @classmethod
+    def _path_lock(cls, key) -> threading.Lock:
+        with cls._lock:
+            return cls._path_locks.setdefault(key, threading.Lock())
+
+    @classmethod
+    def table(cls, dat_file, tag: str, fields: Sequence[str]) -> _DatTable:
+        path = Path(dat_file)
+        key = (str(path.resolve()), tag)
+        stat = path.stat()  # FileNotFoundError sobe para o consumidor, como antes
+
+        with cls._path_lock(key):
+            table = cls._tables.get(key)
+            if (table is not None and table.size == stat.st_size
+                    and table.mtime_ns == stat.st_mtime_ns
+                    and all(field in table.fields for field in fields)):
+                return table
+
+            # Relê mantendo as colunas já pedidas por outros consumidores
+            columns = tuple(fields)
+            if table is not None:
+                columns = table.fields + tuple(f for f in fields if f not in table.fields)
+
+            rows = [
+                tuple(record.get(field) for field in columns)
+                for record in cls.stream(path, tag, columns)
+            ]
+            table = _DatTable(tag, columns, rows, stat.st_size, stat.st_mtime_ns)
+            cls._tables[key] = table
+            return table
+
+    @classmethod
+    def rows(cls, dat_file, tag: str, fields: Sequence[str],
+             shared_fields: Sequence[str] = ()) -> Iterator[tuple]:
+        """
+        Gera tuplas com os valores de `fields` (None se o campo não existe na linha).
+        `shared_fields` é o conjunto completo usado pelos outros consumidores do arquivo,
+        para que a primeira leitura já traga todas as colunas.
+        """
+        wanted = tuple(shared_fields) + tuple(f for f in fields if f not in shared_fields)
+        table = cls.table(dat_file, tag, wanted)
+        positions = [table.fields.index(field) for field in fields]
+        for row in table.rows:
+            yield tuple(row[i] for i in positions)
+
+    @classmethod
+    def records(cls, dat_file, tag: str, fields: Sequence[str],
+                shared_fields: Sequence[str] = ()) -> Iterator[Dict[str, Optional[str]]]:
+        for row in cls.rows(dat_file, tag, fields, shared_fields):
+            yield dict(zip(fields, row))
+
+    @classmethod
+    def clear(cls):
+        """Descarta as tabelas da sessão (ex.: depois de um --rebuild-index)"""
+        with cls._lock:
+            cls._tables.clear()
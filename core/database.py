@@ -1,80 +1,114 @@
 import json
-import re
+import threading
 from typing import Dict, Optional
+from core.index_cache import IndexCache
+from core.dat_reader import DatReader, ITEM_NAME_FIELDS, SKILL_FIELDS, SKILLGRP_FIELDS, to_int
+
+class _LazyIndex:
+    """
+    Índice de classe materializado no primeiro acesso (DatabaseManager.X ou self.X).
+    A carga é feita uma única vez por processo, com lock por índice.
+    """
+
+    def __init__(self, dat_file: str, kind: str, builder_name: str):
+        self.dat_file = dat_file
+        self.kind = kind
+        self.builder_name = builder_name
+        self.name = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        value = self._value
+        if value is None:
+            value = self.load(owner or type(obj))
+        return value
+
+    def load(self, owner):
+        with self._lock:
+            if self._value is None:
+                builder = getattr(owner, self.builder_name)
+                self._value = IndexCache.load_or_build(self.dat_file, self.kind, builder) or {}
+            return self._value
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
+
+    def reset(self):
+        with self._lock:
+            self._value = None
+
 
 class DatabaseManager:
-    # ✅ Variáveis de classe (compartilhadas entre instâncias)
-    ITEM_INDEX: dict[int, str] = {}
-    ITEM_INDEX_ESSENCE: dict[int, str] = {}
-    SKILL_INDEX: dict[int, list[str]] = {}
-    SKILL_INDEX_ESSENCE: dict[int, list[str]] = {}
-    SKILLGRP_INDEX: dict[int, str] = {}
-    SKILLGRP_INDEX_ESSENCE: dict[int, str] = {}
-    
+    # ✅ Variáveis de classe (compartilhadas entre instâncias), carregadas no primeiro acesso
+    ITEM_INDEX: dict[int, str] = _LazyIndex('databases/items_main.dat', 'item', 'build_item_index')
+    ITEM_INDEX_ESSENCE: dict[int, str] = _LazyIndex('databases/items_essence.dat', 'item', 'build_item_index')
+    SKILL_INDEX: dict[int, list[str]] = _LazyIndex('databases/skills_main.dat', 'skill', 'build_skill_index')
+    SKILL_INDEX_ESSENCE: dict[int, list[str]] = _LazyIndex('databases/skills_essence.dat', 'skill', 'build_skill_index')
+    SKILLGRP_INDEX: dict[int, str] = _LazyIndex('databases/skillgrp_main.dat', 'skillgrp', 'build_skillgrp_index')
+    SKILLGRP_INDEX_ESSENCE: dict[int, str] = _LazyIndex('databases/skillgrp_essence.dat', 'skillgrp', 'build_skillgrp_index')
+
+    INDEX_NAMES = (
+        'ITEM_INDEX', 'ITEM_INDEX_ESSENCE',
+        'SKILL_INDEX', 'SKILL_INDEX_ESSENCE',
+        'SKILLGRP_INDEX', 'SKILLGRP_INDEX_ESSENCE',
+    )
+
     def __init__(self, config):
         self.config = config
         self.config_file = self.config.config_file
         self.lock_file = self.config.lock_file
         self.extractable_types = {}
         self.config.load_config()
-        
-        # ✅ Carregar índices se ainda não foram carregados
-        self._ensure_indexes_loaded()
-    
+        # Índices não são mais carregados aqui: cada um sobe no primeiro acesso
+
+    @classmethod
+    def _lazy_index(cls, name: str) -> _LazyIndex:
+        return cls.__dict__[name]
+
+    @classmethod
+    def warm_indexes(cls, names=None):
+        """Materializa os índices pedidos (todos por padrão)"""
+        for name in names or cls.INDEX_NAMES:
+            cls._lazy_index(name).load(cls)
+
+    @classmethod
+    def warm_indexes_async(cls, names=None) -> threading.Thread:
+        """Aquece os índices numa thread em background (ex.: depois da janela aparecer)"""
+        thread = threading.Thread(target=cls.warm_indexes, args=(names,),
+                                  name="index-warmup", daemon=True)
+        thread.start()
+        return thread
+
     def _ensure_indexes_loaded(self):
-        """Carrega os índices apenas uma vez (lazy loading)"""
-        if not DatabaseManager.ITEM_INDEX:
-            DatabaseManager.ITEM_INDEX = self.build_item_index('databases/items_main.dat')
-        
-        if not DatabaseManager.ITEM_INDEX_ESSENCE:
-            DatabaseManager.ITEM_INDEX_ESSENCE = self.build_item_index('databases/items_essence.dat')
-        
-        if not DatabaseManager.SKILL_INDEX:
-            DatabaseManager.SKILL_INDEX = self.build_skill_index('databases/skills_main.dat')
-        
-        if not DatabaseManager.SKILL_INDEX_ESSENCE:
-            DatabaseManager.SKILL_INDEX_ESSENCE = self.build_skill_index('databases/skills_essence.dat')
+        """Carrega todos os índices de uma vez (acesso normal já é lazy)"""
+        self.warm_indexes()
 
-        if not DatabaseManager.SKILLGRP_INDEX:
-            DatabaseManager.SKILLGRP_INDEX = self.build_skillgrp_index('databases/skillgrp_main.dat')
-        
-        if not DatabaseManager.SKILLGRP_INDEX_ESSENCE:
-            DatabaseManager.SKILLGRP_INDEX_ESSENCE = self.build_skillgrp_index('databases/skillgrp_essence.dat')
+    def rebuild_indexes(self):
+        """Ignora o cache e reconstrói todos os índices a partir dos .dat (--rebuild-index)"""
+        IndexCache.request_rebuild()
+        DatReader.clear()
+        for name in self.INDEX_NAMES:
+            self._lazy_index(name).reset()
+        self.warm_indexes()
 
     @staticmethod
     def build_item_index(dat_file: str) -> dict[int, str]: 
         """Constrói índice de items a partir do .dat"""
         index = {}
         try:
-            with open(dat_file, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    if ('item_name_begin' in line
-                        and 'id=' in line
-                        and 'name=[' in line
-                        and 'additionalname=[' in line):
-
-                        try:
-                            item_id = int(line.split("id=")[1].split()[0])
-                        except:
-                            continue
-
-                        # name=[...]
-                        n1 = line.find('name=[') + 6
-                        n2 = line.find(']', n1)
-                        name = line[n1:n2] if n2 != -1 else ''
-
-                        # additionalname=[...]
-                        a1 = line.find('additionalname=[') + len('additionalname=[')
-                        a2 = line.find(']', a1)
-                        add = line[a1:a2] if a2 != -1 else ''
-
-                        # montar nome final
-                        if add:
-                            full_name = f"{name} - {add}"
-                        else:
-                            full_name = name
-
-                        index[item_id] = full_name
+            for item_id, name, add in DatReader.rows(
+                    dat_file, 'item_name', ('id', 'name', 'additionalname'), ITEM_NAME_FIELDS):
+                item_id = to_int(item_id)
+                if item_id is None or name is None or add is None:
+                    continue
+
+                # montar nome final
+                index[item_id] = f"{name} - {add}" if add else name
         except FileNotFoundError:
             print(f"⚠️ Arquivo não encontrado: {dat_file}")
         except Exception as e:
@@ -87,26 +121,14 @@ class DatabaseManager:
         """Constrói índice de skills a partir do .dat"""
         index = {}
         try:
-            with open(dat_file, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    if 'skill_begin' in line and 'skill_id=' in line and 'name=[' in line and 'icon=[' in line:
-                        try:
-                            skill_id = int(line.split("skill_id=")[1].split()[0])
-                        except:
-                            continue
-                        
-                        # Extrai o nome
-                        n1 = line.find('name=[') + 6
-                        n2 = line.find(']', n1)
-                        name = line[n1:n2] if n2 != -1 else ''
-                        
-                        # Extrai o ícone
-                        a1 = line.find('icon=[') + len('icon=[')
-                        a2 = line.find(']', a1)
-                        icon = line[a1:a2] if a2 != -1 else ''
-                        
-                        # Armazena ambos
-                        index[skill_id] = [name, icon]
+            for skill_id, name, icon in DatReader.rows(
+                    dat_file, 'skill', ('skill_id', 'name', 'icon'), SKILL_FIELDS):
+                skill_id = to_int(skill_id)
+                if skill_id is None or name is None or icon is None:
+                    continue
+                
+                # Armazena nome e ícone
+                index[skill_id] = [name, icon]
         
         except FileNotFoundError:
             print(f"Arquivo {dat_file} não encontrado")
@@ -118,21 +140,10 @@ class DatabaseManager:
         """Constrói índice de ícones de skills a partir do skillgrp.dat"""
         index = {}
         try:
-            with open(dat_file, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    if 'skill_begin' in line and 'skill_id=' in line and 'icon=[' in line:
-                        try:
-                            skill_id = int(line.split("skill_id=")[1].split()[0])
-                        except:
-                            continue
-                        
-                        # Extrai o ícone
-                        a1 = line.find('icon=[') + len('icon=[')
-                        a2 = line.find(']', a1)
-                        icon = line[a1:a2] if a2 != -1 else ''
-                        
-                        if icon:
-                            index[skill_id] = icon
+            for skill_id, icon in DatReader.rows(dat_file, 'skill', ('skill_id', 'icon'), SKILLGRP_FIELDS):
+                skill_id = to_int(skill_id)
+                if skill_id is not None and icon:
+                    index[skill_id] = icon
         
         except FileNotFoundError:
             print(f"Arquivo {dat_file} não encontrado")
@@ -149,31 +160,19 @@ class DatabaseManager:
         items_peel = []
         
         try:
-            with open(dat_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            items = content.split('item_name_begin')
-            
             action_map = {
                 'action_peel': 'PEEL',
                 'action_skill_reduce': 'SKILL_REDUCE',
                 'action_skill_reduce_on_skill_success': 'SKILL_REDUCE_ON_SKILL_SUCCESS'
             }
             
-            for item_block in items[1:]:
-                id_match = re.search(r'id=(\d+)', item_block)
-                if not id_match:
-                    continue
-                
-                item_id = id_match.group(1)
-                
-                # Buscar default_action
-                action_match = re.search(r'default_action=\[([^\]]+)\]', item_block)
-                
-                if not action_match:
+            # Mesma leitura do .dat usada pelo ITEM_INDEX (DatReader)
+            for item_id, action in DatReader.rows(
+                    dat_file, 'item_name', ('id', 'default_action'), ITEM_NAME_FIELDS):
+                if not item_id or not item_id.isdigit() or not action:
                     continue
                 
-                action = action_match.group(1).strip()
+                action = action.strip()
                 
                 # Separar nas 3 categorias
                 if action == 'action_skill_reduce_on_skill_success':
@@ -207,10 +206,9 @@ class DatabaseManager:
             # Atualizar extractable_count no config
             total_extractable = len(items_skill_success) + len(items_skill_reduce) + len(items_peel)
             
-            with self.config._file_lock():
+            with self.config.state_lock:
                 self.config.data[site_type]["extractable_count"] = total_extractable
-                with open(self.config_file, 'w') as f:
-                    json.dump(self.config.data, f, indent=2)
+                self.config.save_config()
             
             return {
                 'skill_reduce_on_skill_success': len(items_skill_success),
@@ -1,6 +1,6 @@
-import json
 from pathlib import Path
 from typing import Optional, Dict, Any, TYPE_CHECKING
+from core.item_store import get_item_store
 
 if TYPE_CHECKING:
     from config.config_manager import ConfigManager
@@ -68,12 +68,9 @@ class ScraperHandler:
                 # Fallback: assume que está rodando da raiz ou que html_items está no CWD
                 base_path = Path(".")
 
-            data_file = base_path / f"html_items_{site_type}" / str(item_id) / "data.json"
+            scraper_data = get_item_store(base_path).get(site_type, item_id)
             
-            if data_file.exists():
-                with open(data_file, 'r', encoding='utf-8') as f:
-                    scraper_data = json.load(f)                
-
+            if scraper_data:
                 return self.normalize_scraper_counts(scraper_data)
                 
         except Exception as e:
@@ -4,6 +4,7 @@ from typing import Optional, List, Dict, TYPE_CHECKING
 import re
 import json
 from models.problem_model import ProblemModel
+from core.item_store import get_item_store
 
 if TYPE_CHECKING:
     from core.handlers.xml_handler import XMLHandler
@@ -722,13 +723,11 @@ class SkillHandler:
     def get_item_name_from_item_id(self, item_id: str, site_type: str) -> Optional[str]:
         """Busca nome do item"""
         try:
-            data_file = Path(f"html_items_{site_type}/{item_id}/data.json")
-            if data_file.exists():
-                with open(data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    name = data.get('item_name') or data.get('name') or data.get('item', {}).get('name')
-                    if name:
-                        return name
+            data = get_item_store().get(site_type, item_id)
+            if data:
+                name = data.get('item_name') or data.get('name') or data.get('item', {}).get('name')
+                if name:
+                    return name
             return self.get_item_name_from_dat(item_id, site_type)
         except Exception:
             return f"Item {item_id}"
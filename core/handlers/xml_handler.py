@@ -1,8 +1,8 @@
-from PyQt6.QtWidgets import QMessageBox
 from lxml import etree
 from pathlib import Path
 from typing import Optional, Dict, Any
 import re
+from core.xml_cache import XMLTreeCache
 
 class XMLHandler:
     def __init__(self, site_type='main'):
@@ -29,17 +29,13 @@ class XMLHandler:
 
         if file_to_load.exists():
             try:
-                parser = etree.XMLParser(
-                    remove_blank_text=False, 
-                    remove_comments=False
-                )
-                tree = etree.parse(str(file_to_load), parser)
-                root = tree.getroot()
+                # Um parse por arquivo de bloco (cache LRU + índice id -> elemento)
+                cached = XMLTreeCache.get(file_to_load)
+                tree = cached.tree
+                root = cached.root
                 
-                items = root.xpath(f".//item[@id='{item_id}'][@name][@type]")
-                if items:
-                    item_elem = items[0]
-                    
+                item_elem = cached.find('item', item_id)
+                if item_elem is not None:
                     content_str = etree.tostring(item_elem, encoding='unicode', method='xml', pretty_print=False)
 
                     # Remove namespace sujo se houver
@@ -78,10 +74,10 @@ class XMLHandler:
             return None
         
         try:
-            skill_parser = etree.XMLParser(remove_blank_text=False, remove_comments=False)
-            tree = etree.parse(str(file_to_load), skill_parser)
-            root = tree.getroot()
-            skill_elem = root.find(f".//skill[@id='{skill_id}']")
+            cached = XMLTreeCache.get(file_to_load)
+            tree = cached.tree
+            root = cached.root
+            skill_elem = cached.find('skill', skill_id)
             
             if skill_elem is not None:
                 content_str = etree.tostring(
@@ -173,6 +169,7 @@ class XMLHandler:
             # 9. Salvar Arquivo Final
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(new_content)
+            XMLTreeCache.invalidate(output_file)
             
             print(f"✅ Skill {skill_id} salva com sucesso em {output_file}")
             
@@ -0,0 +1,335 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.item_store import SITE_TYPES
+from core.write_behind import atomic_write, on_commit
+
+# Aba do wiki -> nome da página guardada (mesmos arquivos do layout original)
+TAB_PAGES = {
+    "skills": "skills.html",
+    "guaranteed": "box_guaranteed.html",
+    "random": "box_random.html",
+    "possible": "box_possible.html",
+}
+PAGE_NAMES = tuple(TAB_PAGES.values())
+PAGE_TABS = {name: tab for tab, name in TAB_PAGES.items()}
+
+# (item_id, nome da página, HTML cru)
+ArchivedPage = Tuple[str, str, bytes]
+
+
+class HtmlArchive(ABC):
+    """
+    Arquivo das páginas HTML baixadas pelo scraper (skills.html, box_<tipo>.html).
+
+    Duas implementações, como no ItemStore:
+    - FileHtmlArchive: layout original html_items_<site>/<id>/<página>.html
+    - PackHtmlArchive: packs append-only comprimidos + índice SQLite, com deduplicação
+
+    Use get_html_archive() para obter o backend ativo do projeto.
+    """
+
+    @abstractmethod
+    def put(self, site_type: str, item_id, name: str, body: bytes, url: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def get(self, site_type: str, item_id, name: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def names(self, site_type: str, item_id) -> List[str]:
+        ...
+
+    @abstractmethod
+    def iter_pages(self, site_type: str) -> Iterator[ArchivedPage]:
+        ...
+
+    @abstractmethod
+    def item_ids(self, site_type: str) -> List[str]:
+        """IDs com pelo menos uma página guardada"""
+
+    def item_pages(self, site_type: str, item_id) -> Dict[str, bytes]:
+        pages = {}
+        for name in self.names(site_type, item_id):
+            body = self.get(site_type, item_id, name)
+            if body is not None:
+                pages[name] = body
+        return pages
+
+    def close(self):
+        pass
+
+
+class FileHtmlArchive(HtmlArchive):
+    """Layout original: um arquivo por página dentro do diretório do item"""
+
+    def __init__(self, root_path):
+        self.root_path = Path(root_path)
+
+    def item_dir(self, site_type: str, item_id) -> Path:
+        return self.root_path / f"html_items_{site_type}" / str(item_id)
+
+    def put(self, site_type: str, item_id, name: str, body: bytes, url: Optional[str] = None):
+        atomic_write(self.item_dir(site_type, item_id) / name, body)
+
+    def get(self, site_type: str, item_id, name: str) -> Optional[bytes]:
+        page = self.item_dir(site_type, item_id) / name
+        return page.read_bytes() if page.exists() else None
+
+    def names(self, site_type: str, item_id) -> List[str]:
+        item_dir = self.item_dir(site_type, item_id)
+        return [name for name in PAGE_NAMES if (item_dir / name).exists()]
+
+    def item_ids(self, site_type: str) -> List[str]:
+        items_dir = self.root_path / f"html_items_{site_type}"
+        if not items_dir.exists():
+            return []
+        return sorted((d.name for d in items_dir.iterdir()
+                       if d.name.isdigit() and any((d / name).exists() for name in PAGE_NAMES)), key=int)
+
+    def iter_pages(self, site_type: str) -> Iterator[ArchivedPage]:
+        items_dir = self.root_path / f"html_items_{site_type}"
+        if not items_dir.exists():
+            return
+        for page in items_dir.glob("*/*.html"):
+            try:
+                yield page.parent.name, page.name, page.read_bytes()
+            except OSError as e:
+                print(f"❌ Erro ao ler {page}: {e}")
+
+
+class PackHtmlArchive(HtmlArchive):
+    """
+    Páginas comprimidas (zlib) em packs append-only (html_archive/pack-NNNN.pack).
+
+    O índice SQLite guarda cada corpo UMA vez, endereçado pelo sha1 (blobs: pack,
+    offset, tamanho), e cada página como (site, item, nome, url, fetched_at, sha1).
+    Páginas idênticas (ex.: abas vazias) ocupam um único blob. A leitura é acesso
+    direto: seek no pack + decompress. Um crash no meio de um append só deixa bytes
+    órfãos no fim do pack, nunca uma entrada de índice apontando para lixo.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            pack INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            raw_size INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS pages (
+            site_type TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            url TEXT,
+            fetched_at REAL NOT NULL,
+            hash TEXT NOT NULL REFERENCES blobs (hash),
+            PRIMARY KEY (site_type, item_id, name)
+        );
+        CREATE INDEX IF NOT EXISTS idx_pages_hash ON pages (hash);
+    """
+
+    INDEX_FILENAME = "index.sqlite3"
+    max_pack_bytes = 256 * 1024 * 1024
+
+    def __init__(self, archive_dir):
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.archive_dir / self.INDEX_FILENAME), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+        row = self.conn.execute("SELECT COALESCE(MAX(pack), 0) FROM blobs").fetchone()
+        self.pack_number = row[0]
+        self._writer = None
+        self._readers: Dict[int, object] = {}
+
+    def pack_file(self, number: int) -> Path:
+        return self.archive_dir / f"pack-{number:04d}.pack"
+
+    def _append(self, packed: bytes) -> Tuple[int, int]:
+        """Anexa no pack atual (abrindo um novo se passou do limite) e retorna (pack, offset)"""
+        if self._writer is None:
+            self.pack_number = max(self.pack_number, 1)
+            self._writer = open(self.pack_file(self.pack_number), 'ab')
+
+        if self._writer.tell() > 0 and self._writer.tell() + len(packed) > self.max_pack_bytes:
+            self._writer.close()
+            self.pack_number += 1
+            self._writer = open(self.pack_file(self.pack_number), 'ab')
+
+        offset = self._writer.tell()
+        self._writer.write(packed)
+        self._writer.flush()
+        return self.pack_number, offset
+
+    def _store_blob(self, body: bytes) -> str:
+        digest = hashlib.sha1(body).hexdigest()
+        if self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+            return digest
+
+        packed = zlib.compress(body, 6)
+        pack, offset = self._append(packed)
+        self.conn.execute(
+            "INSERT INTO blobs (hash, pack, offset, length, raw_size) VALUES (?, ?, ?, ?, ?)",
+            (digest, pack, offset, len(packed), len(body)),
+        )
+        return digest
+
+    def put(self, site_type: str, item_id, name: str, body: bytes, url: Optional[str] = None,
+            fetched_at: Optional[float] = None):
+        fetched_at = fetched_at or time.time()
+
+        def write():
+            with self.lock, self.conn:
+                digest = self._store_blob(body)
+                self.conn.execute(
+                    """INSERT OR REPLACE INTO pages (site_type, item_id, name, url, fetched_at, hash)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (site_type, int(item_id), name, url, fetched_at, digest),
+                )
+        # No WriteBehindWriter o append no pack só acontece depois do commit do batch
+        on_commit(write)
+
+    def _read_blob(self, pack: int, offset: int, length: int) -> bytes:
+        reader = self._readers.get(pack)
+        if reader is None:
+            reader = self._readers[pack] = open(self.pack_file(pack), 'rb')
+        reader.seek(offset)
+        return zlib.decompress(reader.read(length))
+
+    def get(self, site_type: str, item_id, name: str) -> Optional[bytes]:
+        with self.lock:
+            row = self.conn.execute(
+                """SELECT b.pack, b.offset, b.length FROM pages p JOIN blobs b ON b.hash = p.hash
+                   WHERE p.site_type = ? AND p.item_id = ? AND p.name = ?""",
+                (site_type, int(item_id), name),
+            ).fetchone()
+            if row is None:
+                return None
+            return self._read_blob(*row)
+
+    def names(self, site_type: str, item_id) -> List[str]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT name FROM pages WHERE site_type = ? AND item_id = ? ORDER BY name",
+                (site_type, int(item_id)),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def item_ids(self, site_type: str) -> List[str]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT item_id FROM pages WHERE site_type = ? ORDER BY item_id",
+                (site_type,),
+            ).fetchall()
+        return [str(row[0]) for row in rows]
+
+    def iter_pages(self, site_type: str) -> Iterator[ArchivedPage]:
+        # Ordem física (pack, offset): leitura sequencial dos packs
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT p.item_id, p.name, b.pack, b.offset, b.length FROM pages p
+                   JOIN blobs b ON b.hash = p.hash WHERE p.site_type = ?
+                   ORDER BY b.pack, b.offset""",
+                (site_type,),
+            ).fetchall()
+
+        for item_id, name, pack, offset, length in rows:
+            with self.lock:
+                body = self._read_blob(pack, offset, length)
+            yield str(item_id), name, body
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            pages, = self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+            blobs, packed, raw = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(raw_size), 0) FROM blobs"
+            ).fetchone()
+        return {'pages': pages, 'blobs': blobs, 'packed_bytes': packed, 'raw_bytes': raw}
+
+    def close(self):
+        with self.lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self.conn.close()
+
+
+ARCHIVE_DIRNAME = "html_archive"
+_archives: Dict[Path, HtmlArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_html_archive(root_path=".", backend: Optional[str] = None) -> HtmlArchive:
+    """
+    Backend ativo para o projeto em root_path.
+    Sem backend explícito: packs se html_archive/index.sqlite3 existir (depois do
+    import_html_tree), senão arquivos soltos.
+    """
+    root_path = Path(root_path).resolve()
+    archive_dir = root_path / ARCHIVE_DIRNAME
+    if backend is None:
+        backend = "pack" if (archive_dir / PackHtmlArchive.INDEX_FILENAME).exists() else "files"
+
+    key = root_path / backend
+    with _archives_lock:
+        if key not in _archives:
+            _archives[key] = PackHtmlArchive(archive_dir) if backend == "pack" else FileHtmlArchive(root_path)
+        return _archives[key]
+
+
+def import_html_tree(root_path=".", site_types=SITE_TYPES, remove: bool = False) -> Dict[str, int]:
+    """
+    Importa html_items_<site>/<id>/*.html para os packs (uma vez).
+    Com remove=True apaga cada arquivo solto depois de arquivado.
+    """
+    source = FileHtmlArchive(root_path)
+    target = get_html_archive(root_path, backend="pack")
+    counts = {}
+    for site_type in site_types:
+        count = 0
+        for item_id, name, body in source.iter_pages(site_type):
+            page = source.item_dir(site_type, item_id) / name
+            target.put(site_type, item_id, name, body, fetched_at=page.stat().st_mtime)
+            if remove:
+                page.unlink()
+            count += 1
+        counts[site_type] = count
+    return counts
+
+
+def export_html_tree(root_path=".", site_types=SITE_TYPES) -> Dict[str, int]:
+    """Exporta os packs de volta para html_items_<site>/<id>/*.html"""
+    source = get_html_archive(root_path, backend="pack")
+    target = FileHtmlArchive(root_path)
+    counts = {}
+    for site_type in site_types:
+        count = 0
+        for item_id, name, body in source.iter_pages(site_type):
+            target.put(site_type, item_id, name, body)
+            count += 1
+        counts[site_type] = count
+    return counts
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "import"
+    if command == "export":
+        print(f"📤 Exportados: {export_html_tree()}")
+    else:
+        print(f"📥 Importados: {import_html_tree(remove='--remove' in sys.argv)}")
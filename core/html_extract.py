@@ -0,0 +1,287 @@
+import re
+import time
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml é opcional para o scraper: sem ele fica só o caminho soup
+    etree = None
+    lxml_html = None
+
+# Link da skill na aba skills: /<site>/skills/items/45401_2_1001.html
+_SKILL_HREF_RE = re.compile(r'skills/items/\d+')
+_SKILL_REF_RE = re.compile(r'/(\d{4,5})_(\d+)_(\d+)\.html')
+
+# Builder do BeautifulSoup para as páginas ainda lidas via soup (skilltree, enchant).
+# O lxml monta a árvore bem mais rápido; tests/test_html_extract.py confere que
+# parse_skill_page/extract_skills_from_html/parse_enchantment_page dão o mesmo
+# resultado com ele e com o html.parser nas fixtures dessas páginas.
+SOUP_BUILDER = 'lxml' if lxml_html is not None else 'html.parser'
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    """BeautifulSoup com o builder mais rápido disponível (lxml > html.parser)"""
+    return BeautifulSoup(html, SOUP_BUILDER)
+
+
+def _skill_ref(href: str) -> Optional[Dict[str, str]]:
+    match = _SKILL_REF_RE.search(href)
+    if not match:
+        return None
+    return {
+        "skill_id": match.group(1),
+        "skill_level": match.group(2),
+        "skill_sublevel": match.group(3)
+    }
+
+
+def _parse_enchant(value: str):
+    if value.startswith('+'):
+        value = value[1:]
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class SoupExtractor:
+    """
+    Implementação de referência (BeautifulSoup + html.parser), a lógica original do
+    ScraperWorker. Serve de oráculo para comparar com o caminho rápido.
+    """
+
+    name = 'soup'
+
+    def skill_ref(self, html: str) -> Optional[Dict[str, str]]:
+        try:
+            soup = BeautifulSoup(html, 'html.parser')
+            for link in soup.find_all('a', href=_SKILL_HREF_RE):
+                ref = _skill_ref(str(link.get('href', '')))
+                if ref:
+                    return ref
+            return None
+        except Exception:
+            return None
+
+    def box_items(self, html: str) -> List[Dict]:
+        items = []
+        try:
+            if not html or len(html) < 100:
+                return items
+
+            soup = BeautifulSoup(html, 'html.parser')
+            for item_wrap in soup.find_all('div', class_='item-wrap'):
+                if item_wrap.get('data-item'):
+                    item_data = self.single_item(item_wrap)
+                    if item_data:
+                        items.append(item_data)
+            return items
+        except Exception:
+            return items
+
+    def single_item(self, item_wrap) -> Optional[Dict]:
+        try:
+            item_id = item_wrap.get('data-item', '')
+            if not item_id:
+                return None
+
+            name_elem = item_wrap.select_one('.name a')
+            if not name_elem:
+                return None
+
+            name_parts = []
+            for content in name_elem.contents:
+                if content.name is None:
+                    text = content.strip()
+                    if text:
+                        name_parts.append(text)
+                else:
+                    span_text = content.get_text(strip=True)
+                    if span_text:
+                        name_parts.append(span_text)
+
+            name_text = ' '.join(name_parts).strip()
+
+            if not name_text or name_text.lower() == "not available":
+                return None
+
+            count_elem = item_wrap.select_one('.count-col div')
+            count = count_elem.get_text(strip=True) if count_elem else "1"
+
+            item = {
+                "id": item_id,
+                "name": name_text,
+                "count": count
+            }
+
+            enchant_elem = name_elem.select_one('.enchant')
+            if enchant_elem:
+                item["enchant"] = _parse_enchant(enchant_elem.get_text(strip=True))
+
+            name_container = item_wrap.select_one('.name')
+            if name_container and name_container.get('data-rank'):
+                item["grade"] = name_container.get('data-rank')
+
+            return item
+        except Exception:
+            return None
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlExtractor:
+    """
+    Caminho rápido: parser HTML do lxml + XPaths compilados uma vez sobre a estrutura
+    item-wrap/data-item. Mesma saída do SoupExtractor (textos com strip por nó, como o
+    get_text(strip=True)).
+    """
+
+    name = 'lxml'
+
+    if etree is not None:
+        _item_wraps = etree.XPath(f"//div[{_has_class('item-wrap')}][@data-item]")
+        _name_link = etree.XPath(f"(.//*[{_has_class('name')}]//a)[1]")
+        _name_container = etree.XPath(f"(.//*[{_has_class('name')}])[1]")
+        _count = etree.XPath(f"(.//*[{_has_class('count-col')}]//div)[1]")
+        _enchant = etree.XPath(f"(.//*[{_has_class('enchant')}])[1]")
+        _links = etree.XPath("//a[@href]")
+        _texts = etree.XPath(".//text()")
+
+    @staticmethod
+    def _parse(html: str):
+        return lxml_html.document_fromstring(html)
+
+    @classmethod
+    def _stripped_text(cls, elem) -> str:
+        return ''.join(text.strip() for text in cls._texts(elem))
+
+    def skill_ref(self, html: str) -> Optional[Dict[str, str]]:
+        try:
+            for link in self._links(self._parse(html)):
+                href = link.get('href', '')
+                if _SKILL_HREF_RE.search(href):
+                    ref = _skill_ref(href)
+                    if ref:
+                        return ref
+            return None
+        except Exception:
+            return None
+
+    def box_items(self, html: str) -> List[Dict]:
+        items = []
+        try:
+            if not html or len(html) < 100:
+                return items
+
+            for item_wrap in self._item_wraps(self._parse(html)):
+                item_data = self.single_item(item_wrap)
+                if item_data:
+                    items.append(item_data)
+            return items
+        except Exception:
+            return items
+
+    def single_item(self, item_wrap) -> Optional[Dict]:
+        try:
+            item_id = item_wrap.get('data-item', '')
+            if not item_id:
+                return None
+
+            name_elem = self._name_link(item_wrap)
+            if not name_elem:
+                return None
+            name_elem = name_elem[0]
+
+            # Equivalente a name_elem.contents: texto solto, filhos (texto completo) e tails
+            name_parts = []
+            if name_elem.text and name_elem.text.strip():
+                name_parts.append(name_elem.text.strip())
+            for child in name_elem:
+                if child.tag is etree.Comment:
+                    text = (child.text or '').strip()
+                elif isinstance(child.tag, str):
+                    text = self._stripped_text(child)
+                else:
+                    text = ''
+                if text:
+                    name_parts.append(text)
+                if child.tail and child.tail.strip():
+                    name_parts.append(child.tail.strip())
+
+            name_text = ' '.join(name_parts).strip()
+
+            if not name_text or name_text.lower() == "not available":
+                return None
+
+            count_elem = self._count(item_wrap)
+            count = self._stripped_text(count_elem[0]) if count_elem else "1"
+
+            item = {
+                "id": item_id,
+                "name": name_text,
+                "count": count
+            }
+
+            enchant_elem = self._enchant(name_elem)
+            if enchant_elem:
+                item["enchant"] = _parse_enchant(self._stripped_text(enchant_elem[0]))
+
+            name_container = self._name_container(item_wrap)
+            if name_container and name_container[0].get('data-rank'):
+                item["grade"] = name_container[0].get('data-rank')
+
+            return item
+        except Exception:
+            return None
+
+
+EXTRACTORS = {
+    SoupExtractor.name: SoupExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+
+def get_extractor(name: Optional[str] = None):
+    """Extrator pelo nome; sem nome, o mais rápido disponível"""
+    if name is None:
+        name = LxmlExtractor.name if etree is not None else SoupExtractor.name
+    return EXTRACTORS[name]()
+
+
+_process_extractors: Dict[str, object] = {}
+
+
+def extract_pages(extractor_name: str, pages: Dict[str, Optional[bytes]]) -> Dict:
+    """
+    Extração de um item inteiro a partir do HTML cru (bytes) das abas. É o ponto de
+    entrada do process pool do ScraperWorker: entra HTML, sai só o compacto
+    {'skill_data': ..., 'boxes': {tipo: [itens]}, 'timings': {aba: segundos}}.
+
+    Os tempos voltam no resultado porque o filho do pool não enxerga as métricas do
+    processo principal; quem consome (parse_item_pages) é que os registra.
+    """
+    extractor = _process_extractors.get(extractor_name)
+    if extractor is None:
+        extractor = _process_extractors[extractor_name] = get_extractor(extractor_name)
+
+    timings = {}
+    skill_data = None
+    skills_html = pages.get("skills")
+    if skills_html:
+        started = time.perf_counter()
+        skill_data = extractor.skill_ref(skills_html.decode('utf-8', errors='replace'))
+        timings["skills"] = time.perf_counter() - started
+
+    boxes = {}
+    for box_type in ("guaranteed", "random", "possible"):
+        html = pages.get(box_type)
+        if html:
+            started = time.perf_counter()
+            boxes[box_type] = extractor.box_items(html.decode('utf-8', errors='replace'))
+            timings[box_type] = time.perf_counter() - started
+    return {'skill_data': skill_data, 'boxes': boxes, 'timings': timings}
@@ -0,0 +1,200 @@
+import atexit
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class CachedPage:
+    """Uma resposta 200 guardada: corpo descomprimido + validadores"""
+
+    __slots__ = ('url', 'etag', 'last_modified', 'content_type', 'fetched_at', 'body')
+
+    def __init__(self, url: str, etag: Optional[str], last_modified: Optional[str],
+                 content_type: Optional[str], fetched_at: float, body: bytes):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+        self.fetched_at = fetched_at
+        self.body = body
+
+    def validators(self) -> Dict[str, str]:
+        """Headers da requisição condicional (vazio se o site não mandou ETag/Last-Modified)"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    Cache HTTP em disco (SQLite) das páginas do wiki, chaveado pela URL.
+
+    Guarda ETag/Last-Modified e o corpo comprimido (zlib). Política:
+    - idade < ttl: servido direto do cache, sem requisição;
+    - idade >= ttl: requisição condicional; 304 renova a entrada e usa o corpo guardado;
+    - soma dos corpos > max_bytes: remove as entradas acessadas há mais tempo (LRU).
+
+    Com ttl = 0 (padrão) toda página é revalidada: o site continua sendo a fonte da
+    verdade, mas um re-scan sem mudanças só trafega headers.
+
+    lookup() não grava nada: o accessed_at dos hits fica em memória e vai para o
+    banco junto com o próximo store/refresh, antes de um evict ou no close().
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            content_type TEXT,
+            fetched_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL,
+            body BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at);
+    """
+
+    cache_file = Path("databases/.http_cache/pages.sqlite3")
+    ttl = 0.0
+    max_bytes = 512 * 1024 * 1024
+    # Hits pendentes acima disso são gravados no próprio lookup (só com TTL e sem stores)
+    max_pending_access = 4096
+
+    _default: Optional['HTTPCache'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, cache_file=None, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.cache_file = Path(cache_file) if cache_file else self.cache_file
+        self.ttl = self.ttl if ttl is None else ttl
+        self.max_bytes = self.max_bytes if max_bytes is None else max_bytes
+
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.cache_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        self._accessed: Dict[str, float] = {}
+
+    @classmethod
+    def default(cls) -> 'HTTPCache':
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                atexit.register(cls._default.close)
+            return cls._default
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return self.ttl > 0 and time.time() - page.fetched_at < self.ttl
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, content_type, fetched_at, body FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[url] = time.time()
+            if len(self._accessed) >= self.max_pending_access:
+                self._flush_accessed()
+                self.conn.commit()
+
+        etag, last_modified, content_type, fetched_at, body = row
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            self.discard(url)
+            return None
+        return CachedPage(url, etag, last_modified, content_type, fetched_at, body)
+
+    def store(self, url: str, body: bytes, etag: Optional[str] = None,
+              last_modified: Optional[str] = None, content_type: Optional[str] = None):
+        packed = zlib.compress(body, 6)
+        now = time.time()
+        with self.lock:
+            self._accessed.pop(url, None)
+            self._flush_accessed()
+            old = self.conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self.conn.execute(
+                """INSERT OR REPLACE INTO pages
+                   (url, etag, last_modified, content_type, fetched_at, accessed_at, size, body)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (url, etag, last_modified, content_type, now, now, len(packed), packed),
+            )
+            self.total_bytes += len(packed) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def refresh(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """304: a página não mudou, só renova a idade (e validadores novos, se vieram)"""
+        now = time.time()
+        with self.lock:
+            self._accessed.pop(url, None)
+            self._flush_accessed()
+            self.conn.execute(
+                """UPDATE pages SET fetched_at = ?, accessed_at = ?,
+                          etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                   WHERE url = ?""",
+                (now, now, etag, last_modified, url),
+            )
+            self.conn.commit()
+
+    def discard(self, url: str):
+        with self.lock:
+            self._accessed.pop(url, None)
+            row = self.conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self.total_bytes -= row[0]
+                self.conn.commit()
+
+    def _flush_accessed(self):
+        """Grava os accessed_at acumulados pelos hits (chamado com o lock, commit fica com quem chamou)"""
+        if not self._accessed:
+            return
+        accessed, self._accessed = self._accessed, {}
+        self.conn.executemany("UPDATE pages SET accessed_at = ? WHERE url = ?",
+                              [(accessed_at, url) for url, accessed_at in accessed.items()])
+
+    def _evict(self):
+        # Remove em lotes até ficar em 90% do limite (evita evict a cada store)
+        self._flush_accessed()
+        target = int(self.max_bytes * 0.9)
+        while self.total_bytes > target:
+            rows = self.conn.execute(
+                "SELECT url, size FROM pages ORDER BY accessed_at LIMIT 256"
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                break
+            for url, size in rows:
+                self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self.total_bytes -= size
+                if self.total_bytes <= target:
+                    break
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM pages")
+            self.conn.commit()
+            self._accessed.clear()
+            self.total_bytes = 0
+
+    def close(self):
+        with self.lock:
+            try:
+                self._flush_accessed()
+                self.conn.commit()
+            except sqlite3.ProgrammingError:
+                return  # já fechado
+            self.conn.close()
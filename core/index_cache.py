@@ -0,0 +1,113 @@
+import os
+import pickle
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+
+class IndexCache:
+    """
+    Cache binário (pickle) dos índices compilados a partir dos .dat.
+
+    Cada índice fica em databases/.index_cache/<kind>-<arquivo>.pkl com um cabeçalho
+    (versão, tamanho, mtime e sha1 do .dat) seguido do índice. Se tamanho e mtime
+    batem, o índice é carregado direto, sem parse de texto. Se mudaram, o sha1 decide:
+    conteúdo igual só atualiza o cabeçalho, conteúdo diferente reconstrói.
+    """
+
+    CACHE_VERSION = 1
+    cache_dir = Path("databases/.index_cache")
+    force_rebuild = False  # --rebuild-index
+
+    _lock = threading.Lock()
+    _file_locks: dict = {}  # um lock por arquivo de cache (warm-up em paralelo não se bloqueia)
+    _rebuilt: set = set()  # caches já regenerados neste processo
+
+    @classmethod
+    def _file_lock(cls, cache_file: Path) -> threading.Lock:
+        with cls._lock:
+            return cls._file_locks.setdefault(cache_file, threading.Lock())
+
+    @classmethod
+    def request_rebuild(cls):
+        """Força cada índice a ser reconstruído (uma vez) na próxima carga"""
+        with cls._lock:
+            cls.force_rebuild = True
+            cls._rebuilt.clear()
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    @classmethod
+    def cache_file(cls, dat_file: Path, kind: str) -> Path:
+        return cls.cache_dir / f"{kind}-{dat_file.name}.pkl"
+
+    @classmethod
+    def _write(cls, cache_file: Path, header: dict, data: Any):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+
+    @classmethod
+    def load_or_build(cls, dat_file, kind: str, builder: Callable[[str], Any]) -> Any:
+        """
+        Retorna o índice do cache ou chama builder(dat_file) e grava o resultado.
+        Se o builder devolver None (erro no parse), nada é gravado.
+        """
+        dat_file = Path(dat_file)
+        if not dat_file.exists():
+            # Sem fonte não há o que cachear; o builder já trata/loga o erro
+            return builder(str(dat_file))
+
+        cache_file = cls.cache_file(dat_file, kind)
+        stat = dat_file.stat()
+        file_hash = None
+
+        lock = cls._file_lock(cache_file)
+        with lock:
+            skip_cache = cls.force_rebuild and cache_file not in cls._rebuilt
+            if not skip_cache and cache_file.exists():
+                try:
+                    with open(cache_file, 'rb') as f:
+                        header = pickle.load(f)
+                        if header.get('version') == cls.CACHE_VERSION:
+                            if header['size'] == stat.st_size and header['mtime_ns'] == stat.st_mtime_ns:
+                                return pickle.load(f)
+
+                            # Arquivo tocado: só reconstrói se o conteúdo mudou
+                            file_hash = cls._file_hash(dat_file)
+                            if header['sha1'] == file_hash:
+                                data = pickle.load(f)
+                                header.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                                cls._write(cache_file, header, data)
+                                return data
+                except Exception as e:
+                    print(f"⚠️ Cache de índice inválido ({cache_file.name}): {e}")
+
+        data = builder(str(dat_file))
+        if data is None:
+            return None
+
+        header = {
+            'version': cls.CACHE_VERSION,
+            'kind': kind,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': file_hash or cls._file_hash(dat_file),
+        }
+        with lock:
+            try:
+                cls._write(cache_file, header, data)
+                cls._rebuilt.add(cache_file)
+            except Exception as e:
+                print(f"⚠️ Não foi possível gravar cache {cache_file.name}: {e}")
+        return data
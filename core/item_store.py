@@ -0,0 +1,599 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from core.write_behind import atomic_write, on_commit
+
+BOX_TYPES = ("guaranteed_items", "random_items", "possible_items")
+SITE_TYPES = ("essence", "main")
+
+# Contagem por item usada pelos stats: (is_extractable, item_type, guaranteed, random, possible)
+ItemCounts = Tuple[bool, str, int, int, int]
+
+# Entrada do índice de staleness: (schema_version, last_updated, content_hash)
+IndexEntry = Tuple[int, Optional[str], str]
+
+# Versão do formato do data.json gravado pelo scraper. Suba quando a extração ou o
+# formato do registro mudar: itens com versão menor voltam para a fila do scrape.
+SCHEMA_VERSION = 1
+
+
+def legacy_schema_version(data: Dict) -> int:
+    """
+    Versão de um data.json anterior ao campo schema_version (as checagens da antiga
+    needs_json_update): 1 se já tem enchant/audit_data/is_extractable/skill_data, senão 0.
+    """
+    for box_type in BOX_TYPES:
+        for entry in data.get('box_data', {}).get(box_type, []):
+            if 'enchant' not in entry:
+                return 0
+
+    scraping_info = data.get('scraping_info', {})
+    if 'audit_data' not in data or 'is_extractable' not in scraping_info:
+        return 0
+    if scraping_info.get('has_skills') and 'skill_data' not in data:
+        return 0
+    return 1
+
+
+def schema_version(data: Dict) -> int:
+    if 'schema_version' in data:
+        try:
+            return int(data['schema_version'])
+        except (TypeError, ValueError):
+            return 0
+    return legacy_schema_version(data)
+
+
+def content_hash(data: Dict) -> str:
+    """Hash do conteúdo do registro sem o carimbo last_updated (mudou de verdade?)"""
+    scraping_info = {k: v for k, v in data.get('scraping_info', {}).items() if k != 'last_updated'}
+    canonical = json.dumps({**data, 'scraping_info': scraping_info}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def index_entry(data: Dict) -> IndexEntry:
+    return schema_version(data), data.get('scraping_info', {}).get('last_updated'), content_hash(data)
+
+
+def skill_columns(data: Dict) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (skill_id, skill_level) do registro: skill_data no topo (item extraível) ou em
+    scraping_info (não extraível). É o critério de with_skills nos dois backends.
+    """
+    skill_data = data.get('skill_data') or data.get('scraping_info', {}).get('skill_data') or {}
+    try:
+        skill_id = int(skill_data['skill_id']) if skill_data.get('skill_id') else None
+        skill_level = int(skill_data['skill_level']) if skill_data.get('skill_level') else None
+    except (TypeError, ValueError):
+        return None, None
+    return skill_id, skill_level
+
+
+class ItemStore(ABC):
+    """
+    Armazenamento dos resultados do scraper (o conteúdo de cada data.json).
+
+    Duas implementações:
+    - FileItemStore: layout original html_items_<site>/<id>/data.json
+    - SQLiteItemStore: um único arquivo items.sqlite3 com colunas indexadas
+
+    Use get_item_store() para obter o backend ativo do projeto.
+    """
+
+    @abstractmethod
+    def get(self, site_type: str, item_id) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def put(self, site_type: str, data: Dict):
+        ...
+
+    @abstractmethod
+    def iter_items(self, site_type: str, with_skills: bool = False) -> Iterator[Dict]:
+        """Todos os registros do site; with_skills: só os com skill_id (ver skill_columns)"""
+
+    def index(self, site_type: str) -> Dict[str, IndexEntry]:
+        """
+        item_id -> (schema_version, last_updated, content_hash) de todos os itens,
+        sem abrir os registros: decidir o que re-processar é uma comparação em memória.
+        """
+        return {str(data.get('item_id')): index_entry(data) for data in self.iter_items(site_type)}
+
+    def index_entries(self, site_type: str, item_ids: Iterable) -> Dict[str, IndexEntry]:
+        """
+        Entradas do índice só dos IDs pedidos (ex.: os in_flight de um ledger), sem
+        carregar o índice inteiro. IDs sem registro não aparecem no resultado.
+        """
+        entries = {}
+        for item_id in item_ids:
+            data = self.get(site_type, item_id)
+            if data is not None:
+                entries[str(item_id)] = index_entry(data)
+        return entries
+
+    def item_counts(self, site_type: str) -> Dict[str, ItemCounts]:
+        """item_id -> contagens usadas pelo StatsAggregator"""
+        counts = {}
+        for data in self.iter_items(site_type):
+            scraping_info = data.get('scraping_info', {})
+            box_data = data.get('box_data', {})
+            counts[str(data.get('item_id'))] = (
+                bool(scraping_info.get('is_extractable', False)),
+                scraping_info.get('item_type', ''),
+                len(box_data.get("guaranteed_items", [])),
+                len(box_data.get("random_items", [])),
+                len(box_data.get("possible_items", [])),
+            )
+        return counts
+
+    def ghost_item_ids(self, site_type: str) -> Set[str]:
+        return {
+            str(data.get('item_id'))
+            for data in self.iter_items(site_type)
+            if data.get('scraping_info', {}).get('is_ghost_item')
+        }
+
+    def close(self):
+        pass
+
+
+class FileItemStore(ItemStore):
+    """
+    Layout original: um diretório por item com data.json.
+
+    O índice fica num sidecar append-only html_items_<site>/index.jsonl (uma linha
+    por put, a última de cada item vale). Itens gravados antes do sidecar existir são
+    lidos uma única vez na primeira chamada de index() e entram no sidecar.
+    """
+
+    INDEX_FILENAME = "index.jsonl"
+    # data.json sem indentação (menor e mais rápido de gravar/ler; o padrão segue legível)
+    compact_json = False
+
+    def __init__(self, root_path):
+        self.root_path = Path(root_path)
+        self.lock = threading.Lock()
+        self._indexes: Dict[str, Dict[str, IndexEntry]] = {}
+
+    def item_dir(self, site_type: str, item_id) -> Path:
+        return self.root_path / f"html_items_{site_type}" / str(item_id)
+
+    def get(self, site_type: str, item_id) -> Optional[Dict]:
+        data_file = self.item_dir(site_type, item_id) / "data.json"
+        if not data_file.exists():
+            return None
+        with open(data_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, site_type: str, data: Dict):
+        if self.compact_json:
+            content = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        else:
+            content = json.dumps(data, indent=2, ensure_ascii=False)
+        atomic_write(self.item_dir(site_type, data['item_id']) / "data.json", content.encode('utf-8'))
+
+        item_id = str(data['item_id'])
+        entry = index_entry(data)
+
+        def publish_index():
+            # Só depois do data.json publicado: o índice nunca aponta para um registro que não existe
+            with self.lock:
+                if site_type in self._indexes:
+                    self._indexes[site_type][item_id] = entry
+                self._write_index(self.index_file(site_type), [(item_id, entry)])
+
+        on_commit(publish_index)
+
+    def index_file(self, site_type: str) -> Path:
+        return self.root_path / f"html_items_{site_type}" / self.INDEX_FILENAME
+
+    @staticmethod
+    def _write_index(index_file: Path, entries, mode: str = 'a'):
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(index_file, mode, encoding='utf-8') as f:
+            for item_id, (version, last_updated, digest) in entries:
+                f.write(json.dumps({"id": item_id, "v": version, "u": last_updated, "h": digest}) + "\n")
+
+    def _load_index(self, site_type: str) -> Dict[str, IndexEntry]:
+        index, lines = {}, 0
+        index_file = self.index_file(site_type)
+        if index_file.exists():
+            with open(index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue  # linha cortada por um crash no meio do append
+                    index[row['id']] = (row['v'], row['u'], row['h'])
+                    lines += 1
+
+        items_dir = self.root_path / f"html_items_{site_type}"
+        on_disk = {p.parent.name for p in items_dir.glob("*/data.json")} if items_dir.exists() else set()
+
+        missing = on_disk - index.keys()
+        for item_id in missing:
+            try:
+                data = self.get(site_type, item_id)
+            except Exception as e:
+                print(f"❌ Erro ao ler {item_id}/data.json: {e}")
+                continue
+            index[item_id] = index_entry(data)
+
+        stale = index.keys() - on_disk
+        for item_id in stale:
+            del index[item_id]
+
+        # Reescreve compactado se havia linhas repetidas/órfãs ou itens novos
+        if missing or stale or lines != len(index):
+            tmp_file = index_file.with_suffix(".tmp")
+            self._write_index(tmp_file, index.items(), mode='w')
+            tmp_file.replace(index_file)
+        return index
+
+    def index(self, site_type: str) -> Dict[str, IndexEntry]:
+        with self.lock:
+            if site_type not in self._indexes:
+                self._indexes[site_type] = self._load_index(site_type)
+            return dict(self._indexes[site_type])
+
+    def index_entries(self, site_type: str, item_ids: Iterable) -> Dict[str, IndexEntry]:
+        # Índice já carregado: consulta em memória; senão um data.json por ID pedido
+        with self.lock:
+            index = self._indexes.get(site_type)
+        if index is None:
+            return super().index_entries(site_type, item_ids)
+        return {str(item_id): index[str(item_id)] for item_id in item_ids if str(item_id) in index}
+
+    def iter_items(self, site_type: str, with_skills: bool = False) -> Iterator[Dict]:
+        items_dir = self.root_path / f"html_items_{site_type}"
+        if not items_dir.exists():
+            return
+
+        for json_file in items_dir.glob("*/data.json"):
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"❌ Erro ao ler {json_file}: {e}")
+                continue
+
+            if with_skills and skill_columns(data)[0] is None:
+                continue
+            yield data
+
+
+class SQLiteItemStore(ItemStore):
+    """
+    Todos os data.json num único SQLite.
+
+    items guarda as colunas consultadas (is_extractable, has_skills, item_type,
+    skill_id, last_updated, schema_version, content_hash) + o JSON sem box_data;
+    box_entries guarda cada entrada do box como linha filha, então stats e
+    agrupamentos viram consultas SQL.
+
+    get() devolve exatamente o que o put() recebeu: o JSON guarda quais listas o
+    box_data tinha, e valores que a coluna não preserva (None, tipos diferentes
+    do da coluna) vão para 'extra'.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            site_type TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            is_extractable INTEGER NOT NULL DEFAULT 0,
+            has_skills INTEGER NOT NULL DEFAULT 0,
+            item_type TEXT NOT NULL DEFAULT '',
+            skill_id INTEGER,
+            skill_level INTEGER,
+            is_ghost INTEGER NOT NULL DEFAULT 0,
+            last_updated TEXT,
+            schema_version INTEGER,
+            content_hash TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (site_type, item_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_items_extractable ON items (site_type, is_extractable, item_type);
+        CREATE INDEX IF NOT EXISTS idx_items_skills ON items (site_type, has_skills, skill_id);
+        CREATE INDEX IF NOT EXISTS idx_items_updated ON items (site_type, last_updated);
+
+        CREATE TABLE IF NOT EXISTS box_entries (
+            site_type TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            box_type TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            entry_id TEXT,
+            name TEXT,
+            count,
+            enchant,
+            grade TEXT,
+            extra TEXT,
+            PRIMARY KEY (site_type, item_id, box_type, position),
+            FOREIGN KEY (site_type, item_id) REFERENCES items (site_type, item_id) ON DELETE CASCADE
+        );
+        CREATE INDEX IF NOT EXISTS idx_box_entries_entry ON box_entries (site_type, entry_id);
+    """
+
+    # Colunas adicionadas depois da primeira versão do schema (migradas no __init__)
+    ADDED_COLUMNS = {"schema_version": "INTEGER", "content_hash": "TEXT"}
+
+    # Chaves de cada entrada do box que viram coluna; o resto vai para 'extra'
+    ENTRY_COLUMNS = ("id", "name", "count", "enchant", "grade")
+    # Colunas TEXT (o SQLite converteria números para texto)
+    TEXT_COLUMNS = ("id", "name", "grade")
+
+    def __init__(self, db_file):
+        self.db_file = Path(db_file)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(self.SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Bancos antigos: cria as colunas novas e preenche o índice uma única vez"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(items)")}
+        with self.conn:
+            for column, column_type in self.ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE items ADD COLUMN {column} {column_type}")
+
+            rows = self.conn.execute(
+                "SELECT site_type, item_id, data FROM items WHERE content_hash IS NULL"
+            ).fetchall()
+            for site_type, item_id, raw in rows:
+                version, _, digest = index_entry(self._rehydrate(site_type, item_id, raw))
+                self.conn.execute(
+                    "UPDATE items SET schema_version = ?, content_hash = ? WHERE site_type = ? AND item_id = ?",
+                    (version, digest, site_type, item_id),
+                )
+
+    def _write(self, site_type: str, data: Dict):
+        item_id = int(data['item_id'])
+        scraping_info = data.get('scraping_info', {})
+        skill_id, skill_level = skill_columns(data)
+        version, last_updated, digest = index_entry(data)
+
+        box_data = data.get('box_data')
+        rest = dict(data)
+        if isinstance(box_data, dict):
+            # No JSON fica o molde do box_data: as listas vazias são preenchidas com box_entries
+            rest['box_data'] = {k: ([] if self._is_box_list(k, v) else v) for k, v in box_data.items()}
+
+        self.conn.execute("DELETE FROM box_entries WHERE site_type = ? AND item_id = ?", (site_type, item_id))
+        self.conn.execute(
+            """INSERT OR REPLACE INTO items
+               (site_type, item_id, is_extractable, has_skills, item_type, skill_id,
+                skill_level, is_ghost, last_updated, schema_version, content_hash, data)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                site_type, item_id,
+                int(bool(scraping_info.get('is_extractable', False))),
+                int(bool(scraping_info.get('has_skills', False))),
+                scraping_info.get('item_type', '') or '',
+                skill_id, skill_level,
+                int(bool(scraping_info.get('is_ghost_item', False))),
+                last_updated, version, digest,
+                json.dumps(rest, ensure_ascii=False),
+            ),
+        )
+
+        if not isinstance(box_data, dict):
+            return
+
+        rows = []
+        for box_type, entries in box_data.items():
+            if not self._is_box_list(box_type, entries):
+                continue
+            for position, entry in enumerate(entries):
+                columns, extra = self._split_entry(entry)
+                rows.append((
+                    site_type, item_id, box_type, position,
+                    str(entry['id']) if entry.get('id') is not None else None,
+                    columns.get('name'), columns.get('count'), columns.get('enchant'), columns.get('grade'),
+                    json.dumps(extra, ensure_ascii=False) if extra else None,
+                ))
+        self.conn.executemany("INSERT INTO box_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    @staticmethod
+    def _is_box_list(box_type: str, value) -> bool:
+        return box_type in BOX_TYPES and isinstance(value, list)
+
+    def _split_entry(self, entry: Dict) -> Tuple[Dict, Dict]:
+        """(colunas, extra): só vira coluna o valor que volta igual do SQLite"""
+        columns, extra = {}, {}
+        for key, value in entry.items():
+            if key not in self.ENTRY_COLUMNS or value is None or isinstance(value, bool):
+                extra[key] = value
+            elif key in self.TEXT_COLUMNS and not isinstance(value, str):
+                extra[key] = value
+            elif not isinstance(value, (str, int, float)):
+                extra[key] = value
+            else:
+                columns[key] = value
+        return columns, extra
+
+    def put(self, site_type: str, data: Dict):
+        def write():
+            with self.lock, self.conn:
+                self._write(site_type, data)
+        # No WriteBehindWriter a transação só roda depois do commit dos arquivos do batch
+        on_commit(write)
+
+    def put_many(self, site_type: str, items):
+        """Carga em massa (import_tree), fora do WriteBehindWriter: uma transação só"""
+        with self.lock, self.conn:
+            for data in items:
+                self._write(site_type, data)
+
+    def _rehydrate(self, site_type: str, item_id: int, raw: str, entries=None) -> Dict:
+        data = json.loads(raw)
+        box_data = data.get('box_data')
+        if not isinstance(box_data, dict):
+            return data
+
+        if entries is None:
+            entries = self.conn.execute(
+                """SELECT box_type, entry_id, name, count, enchant, grade, extra FROM box_entries
+                   WHERE site_type = ? AND item_id = ? ORDER BY box_type, position""",
+                (site_type, item_id),
+            ).fetchall()
+
+        for box_type, entry_id, name, count, enchant, grade, extra in entries:
+            entry = {}
+            if entry_id is not None:
+                entry['id'] = entry_id
+            if name is not None:
+                entry['name'] = name
+            if count is not None:
+                entry['count'] = count
+            if enchant is not None:
+                entry['enchant'] = enchant
+            if grade is not None:
+                entry['grade'] = grade
+            if extra:
+                entry.update(json.loads(extra))
+            box_data[box_type].append(entry)
+        return data
+
+    def get(self, site_type: str, item_id) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM items WHERE site_type = ? AND item_id = ?", (site_type, int(item_id))
+            ).fetchone()
+            if row is None:
+                return None
+            return self._rehydrate(site_type, int(item_id), row[0])
+
+    def iter_items(self, site_type: str, with_skills: bool = False) -> Iterator[Dict]:
+        where = "site_type = ?" + (" AND skill_id IS NOT NULL" if with_skills else "")
+        with self.lock:
+            rows = self.conn.execute(f"SELECT item_id, data FROM items WHERE {where} ORDER BY item_id", (site_type,)).fetchall()
+
+            # Uma consulta para todas as entradas em vez de uma por item
+            entries: Dict[int, list] = {}
+            for item_id, *entry in self.conn.execute(
+                f"""SELECT item_id, box_type, entry_id, name, count, enchant, grade, extra FROM box_entries
+                    WHERE site_type = ? AND item_id IN (SELECT item_id FROM items WHERE {where})
+                    ORDER BY item_id, box_type, position""",
+                (site_type, site_type),
+            ):
+                entries.setdefault(item_id, []).append(entry)
+
+        for item_id, raw in rows:
+            yield self._rehydrate(site_type, item_id, raw, entries.get(item_id, []))
+
+    def index(self, site_type: str) -> Dict[str, IndexEntry]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT item_id, schema_version, last_updated, content_hash FROM items WHERE site_type = ?",
+                (site_type,),
+            ).fetchall()
+        return {str(item_id): (version, last_updated, digest) for item_id, version, last_updated, digest in rows}
+
+    def index_entries(self, site_type: str, item_ids: Iterable) -> Dict[str, IndexEntry]:
+        item_ids = [int(item_id) for item_id in item_ids]
+        rows = []
+        with self.lock:
+            # Em lotes: o SQLite limita o número de parâmetros por consulta
+            for start in range(0, len(item_ids), 500):
+                chunk = item_ids[start:start + 500]
+                rows.extend(self.conn.execute(
+                    f"""SELECT item_id, schema_version, last_updated, content_hash FROM items
+                        WHERE site_type = ? AND item_id IN ({', '.join('?' * len(chunk))})""",
+                    (site_type, *chunk),
+                ).fetchall())
+        return {str(item_id): (version, last_updated, digest) for item_id, version, last_updated, digest in rows}
+
+    def item_counts(self, site_type: str) -> Dict[str, ItemCounts]:
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT i.item_id, i.is_extractable, i.item_type,
+                          COALESCE(SUM(b.box_type = 'guaranteed_items'), 0),
+                          COALESCE(SUM(b.box_type = 'random_items'), 0),
+                          COALESCE(SUM(b.box_type = 'possible_items'), 0)
+                   FROM items i
+                   LEFT JOIN box_entries b ON b.site_type = i.site_type AND b.item_id = i.item_id
+                   WHERE i.site_type = ?
+                   GROUP BY i.item_id""",
+                (site_type,),
+            ).fetchall()
+        return {
+            str(item_id): (bool(extractable), item_type, int(g), int(r), int(p))
+            for item_id, extractable, item_type, g, r, p in rows
+        }
+
+    def ghost_item_ids(self, site_type: str) -> Set[str]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT item_id FROM items WHERE site_type = ? AND is_ghost = 1", (site_type,)
+            ).fetchall()
+        return {str(row[0]) for row in rows}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+DB_FILENAME = "items.sqlite3"
+_stores: Dict[Path, ItemStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_item_store(root_path=".", backend: Optional[str] = None) -> ItemStore:
+    """
+    Backend ativo para o projeto em root_path.
+    Sem backend explícito: SQLite se items.sqlite3 existir (depois do import_tree), senão arquivos.
+    """
+    root_path = Path(root_path).resolve()
+    db_file = root_path / DB_FILENAME
+    if backend is None:
+        backend = "sqlite" if db_file.exists() else "files"
+
+    key = root_path / backend
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SQLiteItemStore(db_file) if backend == "sqlite" else FileItemStore(root_path)
+        return _stores[key]
+
+
+def import_tree(root_path=".", site_types=SITE_TYPES) -> Dict[str, int]:
+    """Importa html_items_<site>/<id>/data.json para o items.sqlite3 (uma vez)"""
+    source = FileItemStore(root_path)
+    target = get_item_store(root_path, backend="sqlite")
+    counts = {}
+    for site_type in site_types:
+        items = list(source.iter_items(site_type))
+        target.put_many(site_type, items)
+        counts[site_type] = len(items)
+    return counts
+
+
+def export_tree(root_path=".", site_types=SITE_TYPES) -> Dict[str, int]:
+    """Exporta o items.sqlite3 de volta para html_items_<site>/<id>/data.json"""
+    source = get_item_store(root_path, backend="sqlite")
+    target = FileItemStore(root_path)
+    counts = {}
+    for site_type in site_types:
+        count = 0
+        for data in source.iter_items(site_type):
+            target.put(site_type, data)
+            count += 1
+        counts[site_type] = count
+    return counts
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "import"
+    if command == "export":
+        print(f"📤 Exportados: {export_tree()}")
+    else:
+        print(f"📥 Importados: {import_tree()}")
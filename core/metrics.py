@@ -0,0 +1,304 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Buckets de latência (segundos), do parse de uma aba até um request lento
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Arquivos/tasks por commit do WriteBehindWriter (max_batch = 64)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+LabelKey = Tuple[str, ...]
+
+
+class _Metric:
+    """Base: valores por combinação de labels, protegidos por um lock (várias threads escrevem)"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values: Dict[LabelKey, object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels {sorted(labels)} != {list(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelKey) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[Dict]:
+        with self.lock:
+            return [{'labels': self._labels(key), 'value': value} for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(_Metric):
+    """Buckets cumulativos no formato Prometheus (le=...), mais soma e contagem"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                index = len(self.buckets)
+            entry['counts'][index] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[Dict]:
+        samples = []
+        with self.lock:
+            for key, entry in self.values.items():
+                cumulative, buckets = 0, []
+                for bound, count in zip(self.buckets + (math.inf,), entry['counts']):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                samples.append({'labels': self._labels(key), 'count': entry['count'],
+                                'sum': entry['sum'], 'buckets': buckets})
+        return samples
+
+
+def quantile(buckets: List[Tuple[float, int]], q: float) -> float:
+    """Quantil aproximado (interpolação linear dentro do bucket, como o histogram_quantile)"""
+    if not buckets or buckets[-1][1] == 0:
+        return 0.0
+    rank = q * buckets[-1][1]
+    lower_bound, lower_count = 0.0, 0
+    for bound, cumulative in buckets:
+        if cumulative >= rank:
+            if math.isinf(bound):
+                return lower_bound
+            if cumulative == lower_count:
+                return bound
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / (cumulative - lower_count)
+        lower_bound, lower_count = bound, cumulative
+    return lower_bound
+
+
+class MetricsRegistry:
+    """
+    Métricas do processo (estilo Prometheus). Os workers escrevem direto nas métricas
+    declaradas abaixo; a leitura é por snapshot() (JSON, usado pelo painel da GUI) ou
+    render_text() (formato de exposição do Prometheus, servido por start_http_server).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, _Metric] = {}
+        self.started_at = time.time()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def reset(self):
+        for metric in list(self.metrics.values()):
+            metric.reset()
+        self.started_at = time.time()
+
+    def snapshot(self) -> Dict:
+        return {
+            'timestamp': time.time(),
+            'started_at': self.started_at,
+            'metrics': {name: {'type': metric.kind, 'help': metric.documentation, 'samples': metric.samples()}
+                        for name, metric in list(self.metrics.items())},
+        }
+
+    def write_snapshot(self, path) -> Path:
+        """Snapshot JSON em disco (tmp + rename, o arquivo nunca fica pela metade)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_name(f".{path.name}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, default=_json_default)
+        tmp_file.replace(path)
+        return path
+
+    def render_text(self) -> str:
+        lines = []
+        for name, metric in list(self.metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample in metric.samples():
+                labels = sample['labels']
+                if metric.kind != 'histogram':
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(sample['value'])}")
+                    continue
+                for bound, cumulative in sample['buckets']:
+                    le = '+Inf' if math.isinf(bound) else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _json_default(value):
+    # +Inf do último bucket
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf"
+    raise TypeError(f"{type(value).__name__} não serializável")
+
+
+REGISTRY = MetricsRegistry()
+
+# ----------------------------------------------------------------------
+# Métricas do scraper
+# ----------------------------------------------------------------------
+HTTP_REQUESTS = REGISTRY.counter(
+    'l2scraper_http_requests_total', 'Requests ao wiki por endpoint e status (cache = servido do HTTPCache)',
+    ('endpoint', 'status'))
+HTTP_RESPONSE_BYTES = REGISTRY.counter(
+    'l2scraper_http_response_bytes_total', 'Bytes baixados do wiki por endpoint', ('endpoint',))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'l2scraper_http_request_seconds', 'Duração do get() da WikiSession (espera de slot + retries inclusos)',
+    ('endpoint',))
+SLOT_WAIT_SECONDS = REGISTRY.histogram(
+    'l2scraper_slot_wait_seconds', 'Espera por token + slot de concorrência no RateLimiter', ('host',))
+RETRIES = REGISTRY.counter(
+    'l2scraper_retries_total', 'Retries agendados (source = site do scraper ou http para retries internos do get)',
+    ('source', 'reason'))
+ITEMS = REGISTRY.counter(
+    'l2scraper_items_total', 'Itens/skills concluídos por worker e resultado', ('site', 'outcome'))
+PARSE_SECONDS = REGISTRY.histogram(
+    'l2scraper_parse_seconds', 'Tempo de extração por tipo de página', ('page',))
+QUEUE_DEPTH = REGISTRY.gauge(
+    'l2scraper_queue_depth', 'Profundidade das filas do pipeline (amostrada a cada 0,5 s)', ('site', 'queue'))
+DISK_WRITE_SECONDS = REGISTRY.histogram(
+    'l2scraper_disk_write_seconds', 'Batches do WriteBehindWriter: prepare (tasks -> tmps) e commit (fsync + rename)',
+    ('stage',))
+DISK_WRITE_BATCH = REGISTRY.histogram(
+    'l2scraper_disk_write_batch_size', 'Tasks por commit do WriteBehindWriter', (), BATCH_BUCKETS)
+
+
+# ----------------------------------------------------------------------
+# Endpoint local
+# ----------------------------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body = self.registry.render_text().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/metrics.json':
+            body = json.dumps(self.registry.snapshot(), default=_json_default).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Um scrape do Prometheus a cada 15 s não precisa ir para o stderr
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_http_server(port: int = 9464, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve /metrics (texto Prometheus) e /metrics.json numa thread daemon. Só escuta
+    no localhost por padrão; chamadas repetidas devolvem o servidor já aberto.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server
+
+
+def stop_http_server():
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
@@ -0,0 +1,233 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.metrics import RETRIES, SLOT_WAIT_SECONDS
+
+# Status que indicam que o site está pedindo para irmos mais devagar
+THROTTLE_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class RetryableHTTPError(Exception):
+    """Falha transitória (429/5xx/timeout/rede). retry_after vem do header, se houver."""
+
+    def __init__(self, url: str, reason: str, retry_after: Optional[float] = None):
+        super().__init__(f"{reason} ({url})")
+        self.url = url
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RetryState:
+    """Backoff exponencial com jitter POR ITEM (a falha de um item não atrasa os outros)"""
+
+    def __init__(self, base: float = 5.0, cap: float = 300.0, max_attempts: int = 10):
+        self.base = base
+        self.cap = cap
+        self.max_attempts = max_attempts
+        self.attempts = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+    def next_delay(self, retry_after: Optional[float] = None) -> float:
+        self.attempts += 1
+        delay = min(self.cap, self.base * (2 ** (self.attempts - 1)))
+        delay = random.uniform(delay / 2, delay)
+        if retry_after:
+            delay = max(delay, min(self.cap, retry_after))
+        return delay
+
+
+class TokenBucket:
+    """Limita a taxa de requisições (req/s) com rajada de até `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class HostController:
+    """
+    Controle adaptativo de UM host: token bucket + limite de concorrência AIMD.
+
+    - Sucesso: a cada `limit` respostas boas o limite sobe +1 e a taxa +rate_step
+      (additive increase), desde que o p90 de latência esteja abaixo do teto.
+    - 429/5xx/timeout: limite e taxa caem pela metade (multiplicative decrease),
+      no máximo uma vez por `cooldown` segundos para uma rajada de erros não zerar tudo.
+    - Latência acima do teto: redução suave (x0.8), também com cooldown.
+    """
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 16,
+                 rate: float = 20.0, min_rate: float = 1.0, max_rate: float = 50.0,
+                 rate_step: float = 1.0, latency_ceiling: float = 5.0, cooldown: float = 2.0):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.latency_ceiling = latency_ceiling
+        self.cooldown = cooldown
+
+        self.bucket = TokenBucket(rate, burst=max(1.0, float(initial_limit)))
+        self.active = 0
+        self.successes = 0
+        self.throttled = 0
+        self.latencies = deque(maxlen=200)
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.bucket.acquire()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.active -= 1
+                self._condition.notify_all()
+
+    def latency_percentile(self, pct: float = 0.9) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def _decrease(self, factor: float) -> bool:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return False
+        self._last_decrease = now
+        self.limit = max(self.min_limit, int(self.limit * factor))
+        self.bucket.rate = max(self.min_rate, self.bucket.rate * factor)
+        self.bucket.burst = max(1.0, float(self.limit))
+        self.successes = 0
+        return True
+
+    def _changed(self):
+        # Acorda quem está esperando um slot se o limite subiu
+        async def notify():
+            async with self._condition:
+                self._condition.notify_all()
+        asyncio.ensure_future(notify())
+
+    def on_success(self, latency: float):
+        self.latencies.append(latency)
+        if latency > self.latency_ceiling and self.latency_percentile() > self.latency_ceiling:
+            self._decrease(0.8)
+            return
+
+        self.successes += 1
+        if self.successes >= self.limit:
+            self.successes = 0
+            if self.limit < self.max_limit:
+                self.limit += 1
+                self.bucket.burst = float(self.limit)
+                self._changed()
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.rate_step)
+
+    def on_throttle(self):
+        self.throttled += 1
+        self._decrease(0.5)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'limit': self.limit,
+            'active': self.active,
+            'rate': round(self.bucket.rate, 2),
+            'p90_latency': round(self.latency_percentile(), 3),
+            'throttled': self.throttled,
+        }
+
+
+class RateLimiter:
+    """
+    Ponto único para requisições ao wiki: um HostController por host.
+
+    get() adquire token + slot, mede a latência e alimenta o AIMD. Respostas
+    429/5xx, timeouts e erros de rede viram RetryableHTTPError; com retries > 0
+    o próprio get() espera (RetryState da chamada) e tenta de novo, com retries = 0
+    quem chamou decide quando reagendar (ex.: a fila do ScraperWorker).
+
+    Os controles usam primitivas asyncio: use uma instância por event loop.
+    """
+
+    def __init__(self, **controller_options):
+        self.controller_options = controller_options
+        self._hosts: Dict[str, HostController] = {}
+
+    def controller(self, url: str) -> HostController:
+        host = urlsplit(url).netloc
+        controller = self._hosts.get(host)
+        if controller is None:
+            controller = self._hosts[host] = HostController(**self.controller_options)
+        return controller
+
+    async def get(self, client: httpx.AsyncClient, url: str, retries: int = 0, **kwargs) -> httpx.Response:
+        retry_state = RetryState(max_attempts=retries)
+        while True:
+            try:
+                return await self._get_once(client, url, **kwargs)
+            except RetryableHTTPError as e:
+                if retry_state.exhausted:
+                    raise
+                RETRIES.inc(source='http', reason=e.reason)
+                await asyncio.sleep(retry_state.next_delay(e.retry_after))
+
+    async def _get_once(self, client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+        controller = self.controller(url)
+        waiting = time.monotonic()
+        async with controller.slot():
+            started = time.monotonic()
+            SLOT_WAIT_SECONDS.observe(started - waiting, host=urlsplit(url).netloc)
+            try:
+                response = await client.get(url, **kwargs)
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+                controller.on_throttle()
+                raise RetryableHTTPError(url, type(e).__name__) from e
+            latency = time.monotonic() - started
+
+        if response.status_code in THROTTLE_STATUSES or response.status_code >= 500:
+            controller.on_throttle()
+            raise RetryableHTTPError(url, f"HTTP {response.status_code}",
+                                     _retry_after(response.headers.get('Retry-After')))
+
+        controller.on_success(latency)
+        return response
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {host: controller.snapshot() for host, controller in self._hosts.items()}
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
@@ -2,6 +2,8 @@ import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Tuple, List, Optional
 from dataclasses import dataclass
+from core.index_cache import IndexCache
+from core.dat_reader import DatReader, SKILL_FIELDS
 
 @dataclass
 class SkillMatch:
@@ -26,86 +28,48 @@ class SkillNameParser:
     def _load_from_dat(self):
         """Tenta carregar de arquivo .dat ou busca em XMLs"""
         if self.dat_file.exists():
-            self._parse_dat_file()
+            maps = IndexCache.load_or_build(self.dat_file, "skill_names", self._build_dat_maps)
+            if maps:
+                self.skill_map, self.id_map = maps
         else:
             print(f"⚠️ {self.dat_file} não encontrado, buscando XMLs...")
             self._load_from_xml_folder()
     
-    def _parse_dat_file(self):
+    def _build_dat_maps(self, dat_file: str):
+        """Builder do IndexCache: só devolve os mapas se o parse terminou sem erro"""
+        if self._parse_dat_file():
+            return self.skill_map, self.id_map
+        return None
+
+    def _parse_dat_file(self) -> bool:
         """Parser direto para .dat - 1 skill por linha"""
         try:
-            with open(self.dat_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or not line.startswith('skill_begin'):
-                        continue
-                    
-                    # Inicialização limpa para garantir o tamanho da tupla
-                    s_id = None
-                    s_lvl = '1'
-                    s_sub = '0'
-                    s_name = "Unknown"
-                    s_desc = ""
-                    s_param = ""
-
-                    # Extração individual para não sobrescrever variáveis
-                    if 'skill_id=' in line:
-                        start = line.find('skill_id=') + 9
-                        end = line.find('\t', start)
-                        if end == -1: end = line.find(' ', start)
-                        s_id = line[start:end].strip()
-                    
-                    if 'skill_level=' in line:
-                        start = line.find('skill_level=') + 12
-                        end = line.find('\t', start)
-                        if end == -1: end = line.find(' ', start)
-                        s_lvl = line[start:end].strip()
-
-                    if 'skill_sublevel=' in line:
-                        start = line.find('skill_sublevel=') + 15
-                        end = line.find('\t', start)
-                        if end == -1: end = line.find(' ', start)
-                        s_sub = line[start:end].strip()
-                    
-                    if 'name=[' in line:
-                        start = line.find('name=[') + 6
-                        end = line.find(']', start)
-                        s_name = line[start:end].strip()
-
-                    if 'desc=[' in line:
-                        start = line.find('desc=[') + 6
-                        end = line.find(']', start)
-                        s_desc = line[start:end].strip()
-
-                    if 'desc_param=[' in line:
-                        start = line.find('desc_param=[') + 12
-                        end = line.find(']', start)
-                        s_param = line[start:end].strip()
-                    
-                    # Indexação mantendo os índices [0, 1, 2] originais
-                    if s_id and s_name:
-                        name_key = s_name.lower()
-                        full_data = (s_id, s_name, s_lvl, s_sub, s_desc, s_param)
-                        
-                        # Garante que a chave exista como lista ANTES de dar append
-                        if name_key not in self.skill_map:
-                            self.skill_map[name_key] = []
-                        self.skill_map[name_key].append(full_data)
-                        
-                        # MESMA COISA AQUI PARA O ID_MAP
-                        if s_id not in self.id_map:
-                            self.id_map[s_id] = []
-                        
-                        # IMPORTANTE: Verifique se este nível já não existe para não duplicar
-                        # mas sempre dê o append para acumular os níveis 1, 2, 3...
-                        self.id_map[s_id].append(full_data)
+            fields = ('skill_id', 'skill_level', 'skill_sublevel', 'name', 'desc', 'desc_param')
+            for s_id, s_lvl, s_sub, s_name, s_desc, s_param in DatReader.rows(
+                    self.dat_file, 'skill', fields, SKILL_FIELDS):
+                # Defaults garantem o tamanho da tupla
+                s_id = s_id.strip() if s_id is not None else None
+                s_lvl = s_lvl.strip() if s_lvl is not None else '1'
+                s_sub = s_sub.strip() if s_sub is not None else '0'
+                s_name = s_name.strip() if s_name is not None else "Unknown"
+                s_desc = s_desc.strip() if s_desc is not None else ""
+                s_param = s_param.strip() if s_param is not None else ""
+                
+                # Indexação mantendo os índices [0, 1, 2] originais
+                if s_id and s_name:
+                    full_data = (s_id, s_name, s_lvl, s_sub, s_desc, s_param)
+                    # Lista por nome e por ID: acumula os níveis 1, 2, 3...
+                    self.skill_map.setdefault(s_name.lower(), []).append(full_data)
+                    self.id_map.setdefault(s_id, []).append(full_data)
             
             print(f"✅ Parser concluído: {len(self.id_map)} skills carregadas.")
+            return True
                 
         except Exception as e:
             print(f"❌ Erro ao carregar {self.dat_file}: {e}")
             import traceback
             traceback.print_exc()
+            return False
     
     def _load_from_xml_folder(self):
         """Carrega skill names de todos os XMLs na pasta skilltree"""
@@ -0,0 +1,250 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from lxml import etree
+
+from core.xml_cache import XMLTreeCache
+
+
+class BatchAutoFixer:
+    """
+    Auto-Fix em lote dos itens do Item Builder, sem Qt: edita os <item> in-place com
+    LXML (preserva a formatação), gera o XML das skills single-level e grava um
+    arquivo de saída por bloco. Usado pelo botão "Auto-Fix All" e pelo `l2scraper fix`.
+
+    Feedback por callbacks: log(msg) e progress(atual, total, status).
+    """
+
+    def __init__(self, scraper_handler, skill_handler, item_handler, xml_handler,
+                 log: Callable[[str], None] = print,
+                 progress: Optional[Callable[[int, int, str], None]] = None):
+        self.scraper_handler = scraper_handler
+        self.skill_handler = skill_handler
+        self.item_handler = item_handler
+        self.xml_handler = xml_handler
+        self.log = log
+        self.progress = progress or (lambda current, total, status: None)
+
+    @staticmethod
+    def load_multilevel_skills(site_type: str) -> set:
+        """Skills do multilevel_skills_<site>.json (ficam fora do auto-fix single-level)"""
+        json_filename = f"multilevel_skills_{site_type}.json"
+        if site_type != "main" or not os.path.exists(json_filename):
+            return set()
+        try:
+            with open(json_filename, 'r', encoding='utf-8') as f:
+                return set(json.load(f).keys())
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar multilevel JSON: {e}")
+            return set()
+
+    def edit_item(self, item_elem, scraper_data: dict, item_id: str, site_type: str = "main"):
+        """
+        Edita item in-place usando LXML
+        Preserva formatação original COMPLETAMENTE
+        """
+        scraping_info = scraper_data.get('scraping_info', {})
+        item_type = scraping_info.get('item_type', '')
+        has_skills = scraping_info.get('has_skills', False)
+        skill_id = self.scraper_handler.get_skill_id(scraper_data)
+
+        self.log(f"  📝 Editando item {item_id} in-place...")
+
+        # Determinar action correta
+        if has_skills and skill_id:
+            correct_action = item_type  # SKILL_REDUCE*
+        else:
+            correct_action = 'PEEL'
+
+        # Atualizar default_action
+        self.skill_handler._update_or_add_set_tag_lxml(item_elem, 'default_action', correct_action)
+
+        # Atualizar handler
+        if has_skills and skill_id:
+            self.skill_handler._update_or_add_set_tag_lxml(item_elem, 'handler', 'ItemSkills')
+
+            # Guardar tail do capsuled_items antes de remover
+            capsuled_tail = '\n\t'
+            for capsuled in item_elem.xpath('./capsuled_items'):
+                if capsuled.tail:
+                    capsuled_tail = capsuled.tail
+                item_elem.remove(capsuled)
+
+            # Remover extractableCount
+            for tag in item_elem.xpath("./set[@name='extractableCountMin']"):
+                item_elem.remove(tag)
+            for tag in item_elem.xpath("./set[@name='extractableCountMax']"):
+                item_elem.remove(tag)
+
+            # Atualizar skills COM TAIL ORIGINAL
+            self.skill_handler._update_or_create_skills_lxml(item_elem, skill_id, site_type, capsuled_tail)
+
+        else:
+            self.skill_handler._update_or_add_set_tag_lxml(item_elem, 'handler', 'ExtractableItems')
+
+            # Guardar tail do skills antes de remover
+            skills_tail = '\n\t'
+            for skills in item_elem.xpath('./skills'):
+                if skills.tail:
+                    skills_tail = skills.tail
+                item_elem.remove(skills)
+
+            # Atualizar capsuled_items COM TAIL ORIGINAL
+            box_data = scraper_data.get('box_data', {})
+            self.item_handler._update_capsuled_items_lxml(item_elem, box_data, item_id, skills_tail)
+
+            # Atualizar extractableCount
+            self.item_handler._update_extractable_count_lxml(item_elem, box_data)
+
+        self.log(f"  ✅ Item {item_id} editado com sucesso")
+
+    def run(self, items_to_fix: List) -> Dict:
+        """Batch processing com LXML - com filtro multilevel. Retorna o resumo (contadores + erros de skill)"""
+        summary = {
+            'success': 0, 'failed': 0,
+            'skill_success': 0, 'skill_failed': 0, 'skill_skipped': 0,
+            'skill_errors': [],
+        }
+        multilevel_sets = {}
+        total = len(items_to_fix)
+
+        # Agrupar por arquivo
+        items_by_file = {}
+        for problem in items_to_fix:
+            file_path = problem.get('xml_file')
+            if not problem.get('has_xml') or not file_path:
+                continue
+            items_by_file.setdefault(file_path, []).append(problem)
+
+        # Processar cada arquivo
+        for file_path, problems in items_by_file.items():
+            self.log(f"\n{'='*80}")
+            self.log(f"📄 Processando {Path(file_path).name} ({len(problems)} items)")
+            self.log(f"{'='*80}")
+
+            site_type = problems[0]['site_type']
+            if site_type not in multilevel_sets:
+                multilevel_sets[site_type] = self.load_multilevel_skills(site_type)
+                if multilevel_sets[site_type]:
+                    self.log(f"✅ Carregadas {len(multilevel_sets[site_type])} skills multilevel para filtro")
+            multilevel_skills = multilevel_sets[site_type]
+
+            output_dir = Path("output_items_essence" if site_type == "essence" else "output_items_main")
+            output_dir.mkdir(exist_ok=True)
+            output_file = output_dir / Path(file_path).name
+
+            file_to_load = output_file if output_file.exists() else file_path
+
+            try:
+                # ✅ CARREGAR COM LXML
+                parser = etree.XMLParser(remove_blank_text=False, remove_comments=False)
+                tree = etree.parse(str(file_to_load), parser)
+                root = tree.getroot()
+
+                # Processar cada item
+                for i, problem in enumerate(problems, 1):
+                    item_id = problem['item_id']
+                    self.progress(summary['success'] + summary['failed'] + 1, total,
+                                  f"Processing {item_id} ({i}/{len(problems)})...")
+
+                    self.log(f"\n[{i}/{len(problems)}] Item {item_id}")
+
+                    try:
+                        # Encontrar item
+                        items = root.xpath(f".//item[@id='{item_id}'][@name][@type]")
+                        if not items:
+                            self.log(f"  ❌ Item não encontrado")
+                            summary['failed'] += 1
+                            continue
+
+                        # Editar
+                        scraper_data = problem.get('scraper_data') or {}
+                        self.edit_item(items[0], scraper_data, item_id, site_type)
+                        summary['success'] += 1
+
+                        # Skill (COM FILTRO MULTILEVEL)
+                        if scraper_data.get('scraping_info', {}).get('has_skills', False):
+                            self.fix_skill(item_id, scraper_data, site_type, multilevel_skills, summary)
+
+                    except Exception as e:
+                        self.log(f"  ❌ Erro no item {item_id}: {e}")
+                        summary['failed'] += 1
+
+                # ✅ SALVAR COM LXML (APÓS processar TODOS os itens)
+                self.write_block(tree, output_file)
+                self.log(f"\n💾 Arquivo salvo: {output_file}")
+
+            except Exception as e:
+                self.log(f"❌ Erro no arquivo {file_path}: {e}")
+                summary['failed'] += len(problems)
+
+        return summary
+
+    def fix_skill(self, item_id, scraper_data, site_type, multilevel_skills, summary):
+        skill_id = self.scraper_handler.get_skill_id(scraper_data)
+        if not skill_id:
+            return
+
+        # ✅ PULA skills que estão no JSON multilevel
+        if str(skill_id) in multilevel_skills:
+            self.log(f"  ⏭️  Skill {skill_id} é MULTILEVEL (no JSON), PULANDO")
+            summary['skill_skipped'] += 1
+            return
+
+        try:
+            skill_level = scraper_data.get('skill_data', {}).get('skill_level', 1)
+            self.log(f"  🔧 Processando skill {skill_id} (level {skill_level})...")
+
+            fixed_skill = self.skill_handler.generate_fixed_skill_xml_single_level(
+                skill_id,
+                skill_level,
+                scraper_data,
+                site_type
+            )
+
+            if fixed_skill:
+                self.xml_handler.save_skill_xml_internal(
+                    skill_id,
+                    fixed_skill,
+                    site_type,
+                    skip_confirmation=True
+                )
+                summary['skill_success'] += 1
+                self.log(f"    ✅ Skill {skill_id} salva")
+            else:
+                summary['skill_failed'] += 1
+                summary['skill_errors'].append(f"Item {item_id} | Skill {skill_id} | Não gerou XML da skill")
+                self.log(f"    ❌ Não gerou XML da skill {skill_id}")
+
+        except Exception as e:
+            summary['skill_failed'] += 1
+            summary['skill_errors'].append(f"Item {item_id} | Skill {skill_id} | Erro: {str(e)}")
+            self.log(f"    ❌ Erro na skill {skill_id}: {e}")
+
+    @staticmethod
+    def write_block(tree, output_file: Path):
+        tree.write(
+            str(output_file),
+            encoding='utf-8',
+            xml_declaration=True,
+            pretty_print=False
+        )
+
+        # Self-closing tags no formato do servidor (<tag />)
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        content = re.sub(r'(?<!\s)/>', ' />', content)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        XMLTreeCache.invalidate(output_file)
+
+    @staticmethod
+    def format_summary(summary: Dict) -> List[str]:
+        lines = [f"Items: ✅ {summary['success']} | ❌ {summary['failed']}"]
+        if summary['skill_success'] or summary['skill_failed'] or summary['skill_skipped']:
+            lines.append(f"Skills: ✅ {summary['skill_success']} | ❌ {summary['skill_failed']} | "
+                         f"⏭️ {summary['skill_skipped']} (multilevel)")
+        return lines
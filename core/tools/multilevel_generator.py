@@ -1,7 +1,7 @@
 import json
-import glob
 import os
 import sys
+from pathlib import Path
 
 # Hack para garantir que o script encontre o módulo 'core' e 'config'
 # Adiciona o diretório raiz do projeto ao PATH do Python
@@ -9,6 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from config.config_manager import ConfigManager
 from core.database import DatabaseManager
+from core.item_store import get_item_store
 
 class MultilevelGrouper:
     def __init__(self, items_directory, site_type='main'):
@@ -76,19 +77,16 @@ class MultilevelGrouper:
     def run(self):
         print(f"🔄 Iniciando agrupamento em: {self.items_directory}...")
         
-        search_path = os.path.join(self.items_directory, "*", "data.json")
-        files = glob.glob(search_path)
+        # Só itens com skill_data (no SQLite é um WHERE skill_id IS NOT NULL indexado)
+        store = get_item_store(Path(self.items_directory).resolve().parent)
         
         count = 0
-        for file_path in files:
+        for data in store.iter_items(self.site_type, with_skills=True):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
                 self._process_item(data)
                 count += 1
             except Exception as e:
-                print(f"❌ Erro ao ler {file_path}: {e}")
+                print(f"❌ Erro ao processar item {data.get('item_id')}: {e}")
 
         self._sort_and_finalize()
         
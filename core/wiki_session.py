@@ -0,0 +1,210 @@
+import asyncio
+import re
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.http_cache import CachedPage, HTTPCache
+from core.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, HTTP_RESPONSE_BYTES
+from core.rate_limiter import RateLimiter, RetryableHTTPError
+
+BASE_URL = "https://l2wiki.com"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Referer": "https://l2wiki.com/",
+    "Origin": "https://l2wiki.com",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "same-origin",
+}
+
+# IDs no caminho viram N para agrupar as métricas por endpoint (/main/skills/N_N_N.html)
+_ID_RE = re.compile(r'\d+')
+
+
+class WikiSession:
+    """
+    Sessão HTTP compartilhada com o l2wiki: UM httpx.AsyncClient (HTTP/2, pool de
+    conexões) e UM RateLimiter por event loop, com headers padrão e métricas por request.
+
+    Os workers rodam suas corrotinas com WikiSession.run(), que usa um event loop
+    compartilhado numa thread própria: assim todos (scrape longo, skilltree, consulta
+    de enchant) reaproveitam as mesmas conexões TLS e o mesmo controle de taxa por host.
+    Dentro da corrotina:
+
+        async with WikiSession.acquire() as session:
+            response = await session.get(url)
+
+    Em um loop próprio (asyncio.run) o client é fechado quando o último usuário sai.
+    """
+
+    max_connections = 16
+    max_keepalive_connections = 7
+    timeout = 15.0
+    limiter_options = {'initial_limit': 8, 'max_limit': 16}
+    # Requisições condicionais (ETag/Last-Modified) pelo HTTPCache em disco
+    use_cache = True
+
+    _sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WikiSession]" = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+    _shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_keepalive_connections),
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(retries=1),
+        )
+        self.limiter = RateLimiter(**self.limiter_options)
+        self.cache = HTTPCache.default() if self.use_cache else None
+        self.metrics: Dict[str, Dict] = {}
+        self.users = 0
+
+    @classmethod
+    def configure(cls, max_connections: Optional[int] = None, max_keepalive_connections: Optional[int] = None,
+                  timeout: Optional[float] = None, use_cache: Optional[bool] = None, **limiter_options):
+        """Ajusta limites/timeout das PRÓXIMAS sessões criadas"""
+        if max_connections is not None:
+            cls.max_connections = max_connections
+        if max_keepalive_connections is not None:
+            cls.max_keepalive_connections = max_keepalive_connections
+        if timeout is not None:
+            cls.timeout = timeout
+        if use_cache is not None:
+            cls.use_cache = use_cache
+        if limiter_options:
+            cls.limiter_options = {**cls.limiter_options, **limiter_options}
+
+    # ------------------------------------------------------------------
+    # Loop compartilhado
+    # ------------------------------------------------------------------
+    @classmethod
+    def _ensure_shared_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._shared_loop is None or cls._shared_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="wiki-session", daemon=True).start()
+                cls._shared_loop = loop
+            return cls._shared_loop
+
+    @classmethod
+    def run(cls, coro):
+        """Executa a corrotina no loop compartilhado e bloqueia a thread chamadora até o fim"""
+        loop = cls._ensure_shared_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    # ------------------------------------------------------------------
+    # Sessão por loop
+    # ------------------------------------------------------------------
+    @classmethod
+    def current(cls) -> 'WikiSession':
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            session = cls._sessions.get(loop)
+            if session is None:
+                session = cls._sessions[loop] = cls()
+            return session
+
+    @classmethod
+    @asynccontextmanager
+    async def acquire(cls):
+        session = cls.current()
+        session.users += 1
+        try:
+            yield session
+        finally:
+            session.users -= 1
+            loop = asyncio.get_running_loop()
+            if session.users == 0 and loop is not cls._shared_loop:
+                with cls._lock:
+                    cls._sessions.pop(loop, None)
+                await session.client.aclose()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    async def get(self, url: str, retries: int = 0, cache: bool = True, **kwargs) -> httpx.Response:
+        """
+        GET pelo RateLimiter do host; 429/5xx/timeout viram RetryableHTTPError.
+        Com cache, páginas já vistas vão com If-None-Match/If-Modified-Since e um 304
+        devolve o corpo guardado como se fosse um 200. O SQLite do cache (leitura,
+        zlib, commits) roda numa thread, nunca no loop compartilhado.
+        """
+        cache = self.cache if cache else None
+        page = await asyncio.to_thread(cache.lookup, url) if cache else None
+
+        started = time.monotonic()
+        status, size = 'error', 0
+        try:
+            if page is not None and cache.is_fresh(page):
+                status = 'cache'
+                return self._cached_response(page)
+
+            if page is not None:
+                kwargs['headers'] = {**page.validators(), **(kwargs.get('headers') or {})}
+
+            response = await self.limiter.get(self.client, url, retries=retries, **kwargs)
+            status, size = response.status_code, len(response.content)
+
+            if page is not None and response.status_code == 304:
+                await asyncio.to_thread(cache.refresh, url, response.headers.get('ETag'),
+                                        response.headers.get('Last-Modified'))
+                return self._cached_response(page)
+
+            if cache is not None and response.status_code == 200:
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                # Sem validadores só vale guardar se o TTL permitir servir sem revalidar
+                if etag or last_modified or cache.ttl > 0:
+                    await asyncio.to_thread(cache.store, url, response.content, etag, last_modified,
+                                            response.headers.get('Content-Type'))
+            return response
+        except RetryableHTTPError as e:
+            status = e.reason
+            raise
+        finally:
+            self._record(url, status, size, time.monotonic() - started)
+
+    @staticmethod
+    def _cached_response(page: CachedPage) -> httpx.Response:
+        headers = {'X-Cache': 'HIT'}
+        if page.content_type:
+            headers['Content-Type'] = page.content_type
+        return httpx.Response(200, headers=headers, content=page.body,
+                              request=httpx.Request('GET', page.url))
+
+    def _record(self, url: str, status, size: int, elapsed: float):
+        endpoint = _ID_RE.sub('N', urlsplit(url).path)
+        entry = self.metrics.get(endpoint)
+        if entry is None:
+            entry = self.metrics[endpoint] = {'requests': 0, 'bytes': 0, 'seconds': 0.0, 'statuses': {}}
+        entry['requests'] += 1
+        entry['bytes'] += size
+        entry['seconds'] += elapsed
+        entry['statuses'][status] = entry['statuses'].get(status, 0) + 1
+        # Mesmos números no registry global (painel de métricas / endpoint /metrics)
+        HTTP_REQUESTS.inc(endpoint=endpoint, status=status)
+        HTTP_RESPONSE_BYTES.inc(size, endpoint=endpoint)
+        HTTP_REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {
+            'endpoints': {endpoint: {**entry, 'statuses': dict(entry['statuses'])}
+                          for endpoint, entry in self.metrics.items()},
+            'hosts': self.limiter.snapshot(),
+        }
@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.state_journal import StateJournal
+
+QUEUED = "queued"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+NOT_FOUND = "not_found"
+
+PENDING_STATES = (QUEUED, IN_FLIGHT)
+FINAL_STATES = (DONE, FAILED, NOT_FOUND)
+
+
+class LedgerJournal(StateJournal):
+    """Transições do ledger entre dois checkpoints (mesmo formato de linha do StateJournal)"""
+
+    STATUS_KEYS = {state: state for state in PENDING_STATES + FINAL_STATES}
+
+
+class WorkLedger:
+    """
+    Plano de UMA execução do scraper por site: a lista de jobs na ordem e o estado
+    de cada item (queued, in_flight, done, failed, not_found).
+
+    A lista de jobs é gravada uma vez por execução em databases/.ledger/<site>.jobs.json;
+    cada checkpoint grava só os estados em <site>.json (os dois atomicamente: tmp +
+    fsync + rename, ligados pelo run_id). Entre checkpoints as transições vão para
+    um journal append-only. Retomar depois de um crash é ler esses arquivos: nada de
+    varrer diretórios nem reler as listas de itens.
+
+    Um item só vira done depois do registro gravado no item store. Se o processo
+    morrer entre as duas coisas, reconcile() acha o registro pelo índice (gravado
+    depois do início da execução) e conclui o item sem baixá-lo de novo.
+    """
+
+    ledger_dir = Path("databases/.ledger")
+
+    def __init__(self, root_path, site_type: str):
+        self.site_type = site_type
+        ledger_dir = Path(root_path) / self.ledger_dir
+        ledger_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_file = ledger_dir / f"{site_type}.json"
+        self.jobs_file = ledger_dir / f"{site_type}.jobs.json"
+        self.journal = LedgerJournal(ledger_dir / f"{site_type}.journal")
+
+        self.lock = threading.RLock()
+        self.jobs: List[Dict] = []
+        self.states: Dict[str, str] = {}
+        self.run_id: Optional[str] = None
+        self.created_at: Optional[str] = None
+        self.full_scan = False
+        # jobs_file em dia com self.jobs (regravado só quando o plano muda)
+        self.jobs_saved = False
+        self._load()
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict]:
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ledger {path.name} ilegível ({e}), começando do zero")
+            return None
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict):
+        tmp_file = path.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+
+    def _load(self):
+        snapshot = self._read_json(self.snapshot_file)
+        plan = self._read_json(self.jobs_file) if snapshot else None
+        run_id = (snapshot or {}).get('run_id')
+        # Crash entre gravar o plano novo e o primeiro checkpoint: run_ids diferentes
+        if run_id and plan and plan.get('run_id') == run_id:
+            self.jobs = plan.get('jobs', [])
+            self.jobs_saved = True
+            self.states = snapshot.get('states', {})
+            self.run_id = run_id
+            self.created_at = snapshot.get('created_at')
+            self.full_scan = snapshot.get('full_scan', False)
+
+        replayed = 0
+        for site_type, state, item_id in self.journal.replay():
+            if site_type == self.site_type and item_id in self.states:
+                self.states[item_id] = state
+                replayed += 1
+        if replayed:
+            print(f"♻️ Ledger {self.site_type}: {replayed} transições recuperadas")
+            self.checkpoint()
+
+    # ------------------------------------------------------------------
+    # Planejamento / retomada
+    # ------------------------------------------------------------------
+    def plan(self, items: List[Dict], full_scan: bool = False):
+        """Nova execução: todos os itens entram como queued"""
+        with self.lock:
+            self.jobs = [dict(item) for item in items]
+            self.states = {str(item['id']): QUEUED for item in items}
+            self.run_id = uuid.uuid4().hex
+            self.created_at = time.strftime("%Y-%m-%d %H:%M:%S")
+            self.full_scan = full_scan
+            self.jobs_saved = False
+            self.checkpoint()
+
+    def is_finished(self) -> bool:
+        return not any(state in PENDING_STATES for state in self.states.values())
+
+    def is_resumable(self, full_scan: bool = False) -> bool:
+        """Existe uma execução interrompida com o mesmo modo (incremental/full scan)?"""
+        return bool(self.jobs) and self.full_scan == full_scan and not self.is_finished()
+
+    def reconcile(self, index: Dict[str, Tuple]) -> List[str]:
+        """
+        Resolve os itens que estavam in_flight no crash: registro gravado durante esta
+        execução (last_updated >= created_at no índice do item store) -> done,
+        senão volta para queued. Retorna os IDs concluídos.
+        """
+        recovered = []
+        with self.lock:
+            for item_id, state in list(self.states.items()):
+                if state != IN_FLIGHT:
+                    continue
+                entry = index.get(item_id)
+                last_updated = entry[1] if entry else None
+                if last_updated and self.created_at and last_updated >= self.created_at:
+                    self.mark(item_id, DONE)
+                    recovered.append(item_id)
+                else:
+                    self.mark(item_id, QUEUED)
+            self.checkpoint()
+        return recovered
+
+    def pending_jobs(self) -> List[Dict]:
+        return [job for job in self.jobs if self.states.get(str(job['id'])) in PENDING_STATES]
+
+    def items_in(self, *states: str) -> Iterator[str]:
+        return (item_id for item_id, state in self.states.items() if state in states)
+
+    def counts(self) -> Dict[str, int]:
+        counts = Counter(self.states.values())
+        return {state: counts.get(state, 0) for state in PENDING_STATES + FINAL_STATES}
+
+    # ------------------------------------------------------------------
+    # Transições
+    # ------------------------------------------------------------------
+    def mark(self, item_id, state: str):
+        item_id = str(item_id)
+        with self.lock:
+            if self.states.get(item_id) == state:
+                return
+            self.states[item_id] = state
+            self.journal.append(self.site_type, state, item_id)
+            if self.journal.should_compact():
+                self.checkpoint()
+
+    def checkpoint(self):
+        """Snapshot atômico dos estados (o plano só na primeira vez) e journal zerado"""
+        with self.lock:
+            if not self.jobs_saved:
+                self._write_json(self.jobs_file, {'run_id': self.run_id, 'jobs': self.jobs})
+                self.jobs_saved = True
+            self._write_json(self.snapshot_file, {
+                'site_type': self.site_type,
+                'run_id': self.run_id,
+                'created_at': self.created_at,
+                'full_scan': self.full_scan,
+                'states': self.states,
+            })
+            self.journal.truncate()
+
+    def close(self):
+        with self.lock:
+            if self.journal.pending:
+                self.checkpoint()
+            self.journal.close()
@@ -0,0 +1,232 @@
+import atexit
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from core.metrics import DISK_WRITE_BATCH, DISK_WRITE_SECONDS
+
+_local = threading.local()
+_tmp_counter = itertools.count()
+
+
+class AtomicBatch:
+    """
+    Arquivos gravados em .tmp e publicados juntos no commit: fsync dos tmps, rename
+    de cada um para o nome final e um fsync por diretório. Um crash no meio deixa o
+    arquivo antigo ou o novo inteiro, nunca um arquivo cortado.
+    """
+
+    def __init__(self, durable: bool = True):
+        self.durable = durable
+        self.staged: List[Tuple[object, Path, Path]] = []
+        self.callbacks: List[Callable] = []
+
+    def write(self, path, data: bytes):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_name(f".{path.name}.{os.getpid()}.{next(_tmp_counter)}.tmp")
+        handle = open(tmp_file, 'wb')
+        try:
+            handle.write(data)
+        except BaseException:
+            handle.close()
+            tmp_file.unlink(missing_ok=True)
+            raise
+        self.staged.append((handle, tmp_file, path))
+
+    def savepoint(self) -> Tuple[int, int]:
+        return len(self.staged), len(self.callbacks)
+
+    def rollback_to(self, savepoint: Tuple[int, int]):
+        """Descarta o que foi preparado depois do savepoint (task que falhou no meio)"""
+        staged, callbacks = savepoint
+        for handle, tmp_file, _ in self.staged[staged:]:
+            handle.close()
+            tmp_file.unlink(missing_ok=True)
+        del self.staged[staged:]
+        del self.callbacks[callbacks:]
+
+    def commit(self):
+        self.publish()
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def publish(self):
+        """Só os arquivos: os callbacks de on_commit ficam para quem chamou"""
+        directories = set()
+        for handle, _, final in self.staged:
+            handle.flush()
+            if self.durable:
+                os.fsync(handle.fileno())
+            handle.close()
+            directories.add(final.parent)
+        for _, tmp_file, final in self.staged:
+            os.replace(tmp_file, final)
+        if self.durable:
+            for directory in directories:
+                _fsync_dir(directory)
+        self.staged = []
+
+    def abort(self):
+        self.rollback_to((0, 0))
+
+
+def _fsync_dir(directory: Path):
+    # Torna o rename durável; sem suporte a fsync de diretório (Windows) fica só o rename
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, data: bytes, durable: bool = True):
+    """
+    Grava o arquivo atomicamente (tmp + rename). Dentro do WriteBehindWriter entra no
+    batch atual e só é publicado no commit; fora dele é gravado na hora.
+    """
+    batch = getattr(_local, 'batch', None)
+    if batch is not None:
+        batch.write(path, data)
+        return
+    batch = AtomicBatch(durable)
+    batch.write(path, data)
+    batch.commit()
+
+
+def on_commit(callback: Callable):
+    """
+    Executa depois que os arquivos do batch atual estiverem publicados (ou já, fora de
+    batch). É onde entram os efeitos que não são arquivos (SQLite, packs, contadores):
+    se a task falhar ou o commit dos arquivos falhar, eles nunca rodam.
+    """
+    batch = getattr(_local, 'batch', None)
+    if batch is not None:
+        batch.callbacks.append(callback)
+    else:
+        callback()
+
+
+class WriteBehindWriter:
+    """
+    Thread dedicada às gravações do scraper (HTML arquivado + data.json).
+
+    submit() devolve um Future (no asyncio: await asyncio.wrap_future(...)), então o
+    event loop nunca espera o disco. A thread junta o que estiver na fila (até
+    max_batch tasks), roda cada task com um AtomicBatch ativo e faz um único commit:
+    os fsyncs do grupo saem juntos. O Future só resolve depois do commit, ou seja,
+    quando os arquivos daquele item já estão publicados.
+
+    Depois dos arquivos rodam os callbacks de on_commit de cada task, na ordem em que
+    foram registrados. Um callback que falha falha só o Future da sua task (os
+    seguintes da mesma task não rodam); os arquivos dela já estão publicados, então
+    a task precisa ser idempotente para ser refeita.
+    """
+
+    max_batch = 64
+    durable = True
+
+    _default: Optional['WriteBehindWriter'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, name: str = "write-behind"):
+        self.queue: "queue.Queue" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def default(cls) -> 'WriteBehindWriter':
+        with cls._default_lock:
+            if cls._default is None or not cls._default.thread.is_alive():
+                cls._default = cls()
+                atexit.register(cls._default.close)
+            return cls._default
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        future = Future()
+        self.queue.put((future, fn, args, kwargs))
+        return future
+
+    def flush(self, timeout: Optional[float] = None):
+        """Bloqueia até tudo que foi submetido antes estar gravado"""
+        if self.thread.is_alive():
+            self.submit(lambda: None).result(timeout)
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def _run(self):
+        while True:
+            task = self.queue.get()
+            if task is None:
+                return
+            tasks = [task]
+            stop = False
+            while len(tasks) < self.max_batch:
+                try:
+                    task = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    stop = True
+                    break
+                tasks.append(task)
+
+            self._run_batch(tasks)
+            if stop:
+                return
+
+    def _run_batch(self, tasks):
+        batch = AtomicBatch(self.durable)
+        results = []
+        started = time.perf_counter()
+        _local.batch = batch
+        try:
+            for future, fn, args, kwargs in tasks:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                savepoint = batch.savepoint()
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    batch.rollback_to(savepoint)
+                    results.append((future, None, e, []))
+                else:
+                    results.append((future, result, None, batch.callbacks[savepoint[1]:]))
+        finally:
+            _local.batch = None
+
+        committing = time.perf_counter()
+        try:
+            batch.publish()
+        except BaseException as e:
+            batch.abort()
+            results = [(future, None, error or e, []) for future, _, error, _ in results]
+        batch.callbacks = []
+        DISK_WRITE_SECONDS.observe(committing - started, stage='prepare')
+        DISK_WRITE_SECONDS.observe(time.perf_counter() - committing, stage='commit')
+        DISK_WRITE_BATCH.observe(len(tasks))
+
+        for future, result, error, callbacks in results:
+            try:
+                for callback in callbacks:
+                    callback()
+            except BaseException as e:
+                error = e
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
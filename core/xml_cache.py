@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+from lxml import etree
+
+
+class _CachedTree:
+    """Árvore parseada de um arquivo de bloco + índices id -> elemento (montados sob demanda)"""
+
+    __slots__ = ('file', 'key', 'tree', 'root', '_indexes')
+
+    def __init__(self, file: str, key: tuple, tree):
+        self.file = file
+        self.key = key
+        self.tree = tree
+        self.root = tree.getroot()
+        self._indexes: Dict[str, Dict[str, etree._Element]] = {}
+
+    def index(self, tag: str) -> Dict[str, etree._Element]:
+        """
+        id -> primeiro <tag id=...> do arquivo.
+        Para <item> só entram os que têm name e type (mesmo filtro do xpath antigo).
+        """
+        index = self._indexes.get(tag)
+        if index is None:
+            index = {}
+            for elem in self.root.iterdescendants(tag):
+                elem_id = elem.get('id')
+                if elem_id is None:
+                    continue
+                if tag == 'item' and (elem.get('name') is None or elem.get('type') is None):
+                    continue
+                index.setdefault(elem_id, elem)
+            self._indexes[tag] = index
+        return index
+
+    def find(self, tag: str, elem_id) -> Optional[etree._Element]:
+        return self.index(tag).get(str(elem_id))
+
+
+class XMLTreeCache:
+    """
+    Cache LRU de arquivos XML de bloco (items_*/NNNNN-NNNNN.xml, skills_*/...).
+
+    A chave é (caminho, mtime, tamanho): se o arquivo mudar em disco a entrada é
+    reparseada no próximo acesso. Quem grava um output deve chamar invalidate(),
+    o que também cobre escritas dentro da mesma resolução de mtime.
+
+    As árvores são COMPARTILHADAS: quem for editar deve parsear a própria cópia
+    (como já fazem os fluxos de save).
+    """
+
+    max_entries = 64
+
+    _entries: "OrderedDict[str, _CachedTree]" = OrderedDict()
+    _lock = threading.RLock()
+
+    @staticmethod
+    def _parser():
+        return etree.XMLParser(remove_blank_text=False, remove_comments=False)
+
+    @classmethod
+    def get(cls, path) -> _CachedTree:
+        """Retorna a árvore do arquivo, parseando só se não estiver em cache ou se mudou"""
+        file = str(Path(path).resolve())
+        stat = Path(file).stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with cls._lock:
+            entry = cls._entries.get(file)
+            if entry is not None and entry.key == key:
+                cls._entries.move_to_end(file)
+                return entry
+
+        tree = etree.parse(file, cls._parser())
+        entry = _CachedTree(str(path), key, tree)
+
+        with cls._lock:
+            cls._entries[file] = entry
+            cls._entries.move_to_end(file)
+            while len(cls._entries) > cls.max_entries:
+                cls._entries.popitem(last=False)
+        return entry
+
+    @classmethod
+    def invalidate(cls, path):
+        with cls._lock:
+            cls._entries.pop(str(Path(path).resolve()), None)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
@@ -0,0 +1,394 @@
+# l2scraper.py
+"""
+Runner headless (sem QApplication, sem abas): python -m l2scraper <comando> [opções]
+
+    scrape     baixa os itens de um site (ScraperWorker) ou re-extrai do HTML arquivado (--reparse)
+    scan       valida os XMLs de itens contra os dados do scraper (ItemScanner)
+    fix        scan + Auto-Fix em lote dos itens com dados do scraper (BatchAutoFixer)
+    relics     atualiza RelicData/RelicCollectionData a partir dos DATs (RelicUpdateRunner)
+    skilltree  scrape profundo da skill tree de uma classe (SkillTreeScraper)
+    index      aquece/reconstrói os índices dos DATs e gera as listas de itens
+
+scan/fix/relics/skilltree usam os núcleos sem Qt de core/tools (os mesmos que as
+QThreads da GUI embrulham), com log/progresso por callbacks para o terminal.
+O scrape ainda roda o ScraperWorker: o run() do QThread na thread principal, com os
+sinais ligados direto aos callbacks. Ctrl+C pede parada limpa (o ledger guarda o
+progresso); um segundo Ctrl+C aborta.
+
+PyQt6 só é obrigatório para o scrape, e só o QtCore: nada de QApplication nem display.
+Os outros comandos e o --help não importam Qt.
+"""
+import argparse
+import json
+import re
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+from core.metrics import REGISTRY, start_http_server
+
+# Logs da skill tree vêm formatados em HTML para o QTextEdit
+_TAG_RE = re.compile(r'<[^>]+>')
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INTERRUPTED = 130
+
+
+class ConsoleReporter:
+    """Callbacks de log/progresso para o terminal; progresso no máximo a cada `interval` s"""
+
+    def __init__(self, quiet: bool = False, interval: float = 2.0):
+        self.quiet = quiet
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.last_progress = 0.0
+
+    def log(self, message):
+        text = _TAG_RE.sub('', str(message))
+        with self.lock:
+            print(text, flush=True)
+
+    def progress(self, current, total, status=""):
+        if self.quiet:
+            return
+        now = time.monotonic()
+        # Sempre mostra o último passo, o resto é amostrado (saída legível em cron/log)
+        if current < total and now - self.last_progress < self.interval:
+            return
+        self.last_progress = now
+        percent = f"{current / total * 100:5.1f}%" if total else "  ?  "
+        with self.lock:
+            print(f"[{current}/{total} {percent}] {_TAG_RE.sub('', status)}", flush=True)
+
+
+def run_interruptible(job, reporter: ConsoleReporter, run=None):
+    """
+    Executa job.run() (ou `run`) na thread atual com Ctrl+C pedindo job.stop().
+    Retorna (resultado, completed); completed é False se houve Ctrl+C.
+    """
+    interrupted = []
+
+    def stop(signum, frame):
+        if interrupted:
+            raise KeyboardInterrupt
+        interrupted.append(signum)
+        reporter.log("⏹️ Stopping... (Ctrl+C again to abort)")
+        if hasattr(job, 'stop'):
+            job.stop()
+        else:
+            job.is_running = False
+
+    previous = signal.signal(signal.SIGINT, stop)
+    try:
+        result = (run or job.run)()
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    return result, not interrupted
+
+
+def run_worker(worker, reporter: ConsoleReporter, **signals) -> bool:
+    """
+    QThread que ainda não tem núcleo sem Qt (ScraperWorker/ReparseWorker): run() na
+    thread atual, `signals` mapeia nome do sinal -> callback. A conexão é direta porque
+    não há event loop Qt para entregar sinais enfileirados (o ScraperWorker emite da
+    thread do loop asyncio).
+    """
+    from utils.log_bus import connect_direct
+
+    for name, callback in signals.items():
+        connect_direct(getattr(worker, name), callback)
+    try:
+        _, completed = run_interruptible(worker, reporter)
+    finally:
+        # Na GUI quem fecha o LogBus é o sinal finished do QThread (que aqui não existe)
+        worker.log_bus.close()
+    return completed
+
+
+# ----------------------------------------------------------------------
+# Comandos
+# ----------------------------------------------------------------------
+def cmd_scrape(args, reporter):
+    from config.config_manager import ConfigManager
+    from utils.log_bus import LogLevel
+
+    config = ConfigManager()
+    if args.retry_failed:
+        config.clear_failed_items(args.site)
+
+    if args.reparse:
+        from workers.reparse_worker import ReparseWorker
+        worker = ReparseWorker(args.site, config, item_ids=args.items, parse_workers=args.parse_workers)
+    else:
+        from workers.scraper_worker import ScraperWorker
+        options = {'max_workers': args.concurrency} if args.concurrency else {}
+        worker = ScraperWorker(args.site, config, full_scan=args.full_scan, verify_stats=args.verify_stats, **options)
+        if args.parse_workers:
+            worker.parse_workers = args.parse_workers
+
+    if args.verbose:
+        worker.log_bus.level = LogLevel.DEBUG
+        worker.log_bus.unsuppress("skip")
+    elif args.quiet:
+        worker.log_bus.suppress("item", "retry")
+
+    completed = run_worker(worker, reporter,
+                           log_signal=reporter.log, progress_signal=reporter.progress)
+
+    stats = worker.stats
+    reporter.log(f"📊 {args.site}: {stats.successful_items} success, {stats.failed_items} failed, "
+                 f"{stats.not_found_items} not found")
+    return EXIT_OK if completed else EXIT_INTERRUPTED
+
+
+def scan_items(args, reporter):
+    from config.config_manager import ConfigManager
+    from core.tools.item_scanner import ItemScanner
+
+    site_types = ["essence", "main"] if args.site == "all" else [args.site]
+    scanner = ItemScanner(ConfigManager(), site_types, max_workers=args.workers,
+                          log=reporter.log, progress=reporter.progress)
+    return run_interruptible(scanner, reporter)
+
+
+def cmd_scan(args, reporter):
+    from models.validation_result import ValidationResult
+
+    problems, completed = scan_items(args, reporter)
+
+    needs_fix = [p for p in problems if p.get('needs_fix', False)]
+    reporter.log(f"📋 {len(problems)} items scanned | Needs fix: {len(needs_fix)} | "
+                 f"No scraper data: {sum(1 for p in problems if not p.get('has_scraper_data'))} | "
+                 f"No XML: {sum(1 for p in problems if not p.get('has_xml'))}")
+
+    if args.output:
+        # Só os campos do registro (scraper_data/xml_data são lazy e ficam de fora)
+        fields = [f for f in ValidationResult.__slots__ if f not in ('xml_span', 'xml_stat')]
+        records = [{field: getattr(p, field) for field in fields}
+                   for p in (problems if args.all else needs_fix)]
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        reporter.log(f"💾 {len(records)} items written to {args.output}")
+
+    return EXIT_OK if completed else EXIT_INTERRUPTED
+
+
+def cmd_fix(args, reporter):
+    from config.config_manager import ConfigManager
+    from core.database import DatabaseManager
+    from core.handlers.item_handler import ItemHandler
+    from core.handlers.scraper_handler import ScraperHandler
+    from core.handlers.skill_handler import SkillHandler
+    from core.handlers.xml_handler import XMLHandler
+    from core.tools.batch_fixer import BatchAutoFixer
+
+    problems, completed = scan_items(args, reporter)
+    if not completed:
+        return EXIT_INTERRUPTED
+
+    fixable = [p for p in problems if p.get('has_scraper_data') and (args.all or p.get('needs_fix', False))]
+    if args.items:
+        wanted = set(args.items)
+        fixable = [p for p in fixable if p['item_id'] in wanted]
+
+    if not fixable:
+        reporter.log("No items can be auto-fixed (need scraper data)")
+        return EXIT_OK
+
+    if args.dry_run:
+        for problem in fixable:
+            issues = ', '.join(str(issue) for issue in problem['issues']) or 'OK'
+            reporter.log(f"  {problem['item_id']} ({problem['site_type']}): {issues}")
+        reporter.log(f"🔎 Dry run: {len(fixable)} items would be auto-fixed")
+        return EXIT_OK
+
+    config = ConfigManager()
+    database = DatabaseManager(config)
+    xml_handler = XMLHandler()
+    scraper_handler = ScraperHandler()
+    skill_handler = SkillHandler(xml_handler=xml_handler, scraper_handler=scraper_handler, database=database)
+
+    failed = 0
+    for site_type in sorted({p['site_type'] for p in fixable}):
+        item_handler = ItemHandler(site_type, config, database, skill_handler, scraper_handler, xml_handler)
+        fixer = BatchAutoFixer(scraper_handler, skill_handler, item_handler, xml_handler,
+                               log=reporter.log if args.verbose else (lambda message: None),
+                               progress=reporter.progress)
+        summary = fixer.run([p for p in fixable if p['site_type'] == site_type])
+
+        reporter.log(f"🔧 BATCH AUTO-FIX COMPLETE ({site_type}):")
+        for line in BatchAutoFixer.format_summary(summary):
+            reporter.log(f"   {line}")
+        for error in summary['skill_errors']:
+            reporter.log(f"   ❌ {error}")
+        failed += summary['failed'] + summary['skill_failed']
+
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_relics(args, reporter):
+    from core.tools.relic_updater import RelicUpdateRunner
+
+    runner = RelicUpdateRunner(args.databases, args.xml_dir, args.version,
+                               log=reporter.log, progress=reporter.progress)
+    results, completed = run_interruptible(runner, reporter)
+    if not results:
+        return EXIT_FAILED if completed else EXIT_INTERRUPTED
+
+    statistics = results['statistics']
+    reporter.log(f"📊 Relics: {statistics['existing_relics']} -> {statistics['new_relics']} "
+                 f"(+{statistics['added_relics']}) | Collections: {statistics['existing_collections']} -> "
+                 f"{statistics['new_collections']} (+{statistics['added_collections']}) | "
+                 f"Coupon matches: {statistics['coupon_matches']}")
+    for key in ('relic', 'collection'):
+        reporter.log(f"   {Path(results['paths'][key]).name}: {results['contents'][key]}")
+    return EXIT_OK
+
+
+def cmd_skilltree(args, reporter):
+    from config.config_manager import ConfigManager
+    from core.tools.skilltree_scraper import SkillTreeScraper
+
+    scraper = SkillTreeScraper(
+        site_type=args.site.upper(),
+        class_slug=args.slug,
+        xml_folder=args.folder,
+        xml_class_name=args.xml,
+        config=ConfigManager(),
+        log=reporter.log,
+        progress=reporter.progress,
+    )
+    stats, completed = run_interruptible(scraper, reporter)
+
+    reporter.log(f"📊 {args.slug}: {stats.get('total_skills', 0)} skills "
+                 f"(XML: {stats.get('xml_total_skills', 0)}) in {stats.get('duration', 0):.1f}s")
+    return EXIT_OK if completed else EXIT_INTERRUPTED
+
+
+def cmd_index(args, reporter):
+    from config.config_manager import ConfigManager
+    from core.database import DatabaseManager
+
+    database = DatabaseManager(ConfigManager())
+    started = time.monotonic()
+    if args.rebuild:
+        reporter.log("🔄 Rebuilding DAT indexes (cache ignored)...")
+        database.rebuild_indexes()
+    else:
+        DatabaseManager.warm_indexes()
+    for name in DatabaseManager.INDEX_NAMES:
+        reporter.log(f"   {name}: {len(getattr(DatabaseManager, name) or {})} entries")
+    reporter.log(f"✅ Indexes ready in {time.monotonic() - started:.1f}s")
+
+    for site_type in args.lists or []:
+        counts = database.generate_items_lists(site_type)
+        reporter.log(f"📝 {site_type} lists: " + ", ".join(f"{key}={value}" for key, value in counts.items()))
+
+    for site_type in args.multilevel or []:
+        from core.tools.multilevel_generator import MultilevelGrouper
+        MultilevelGrouper(f"html_items_{site_type}", site_type=site_type).run()
+
+    return EXIT_OK
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="l2scraper", description="L2Wiki scraper/builder sem GUI",
+                                     epilog="scrape requer PyQt6 (só QtCore; não precisa de display)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="sem progresso nem log por item")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log detalhado (inclui itens pulados)")
+    parser.add_argument("--rebuild-index", action="store_true", help="ignora o cache binário dos .dat")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve /metrics e /metrics.json em 127.0.0.1:PORT durante a execução")
+    parser.add_argument("--metrics-json", metavar="FILE",
+                        help="grava um snapshot JSON das métricas a cada 30 s e no fim")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scrape = commands.add_parser("scrape", help="scrape de itens (main/essence)")
+    scrape.add_argument("--site", choices=("main", "essence"), required=True)
+    scrape.add_argument("--full-scan", action="store_true", help="reprocessa todos os itens da lista")
+    scrape.add_argument("--retry-failed", action="store_true", help="limpa a lista de falhas antes de começar")
+    scrape.add_argument("--verify-stats", action="store_true", help="confere os contadores com o disco no fim")
+    scrape.add_argument("--reparse", action="store_true", help="re-extrai do HTML arquivado, sem rede")
+    scrape.add_argument("--items", nargs="+", metavar="ID", help="com --reparse: só estes IDs")
+    scrape.add_argument("--parse-workers", type=int, metavar="N", help="processos de extração")
+    scrape.add_argument("--concurrency", type=int, metavar="N", help="itens simultâneos no pipeline")
+    scrape.set_defaults(handler=cmd_scrape)
+
+    for name, handler, help_text in (("scan", cmd_scan, "valida os XMLs de itens"),
+                                     ("fix", cmd_fix, "scan + Auto-Fix em lote")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--site", choices=("main", "essence", "all"), default="main")
+        command.add_argument("--workers", type=int, metavar="N", help="processos do scan (1 = serial)")
+        command.add_argument("--all", action="store_true", help="inclui itens já corretos")
+        command.set_defaults(handler=handler)
+        if name == "scan":
+            command.add_argument("--output", metavar="FILE", help="lista de problemas em JSON")
+        else:
+            command.add_argument("--items", nargs="+", metavar="ID", help="só estes IDs")
+            command.add_argument("--dry-run", action="store_true", help="só lista o que seria corrigido")
+
+    relics = commands.add_parser("relics", help="atualiza os XMLs de relics a partir dos DATs")
+    relics.add_argument("--version", choices=("Main", "Essence"), default="Main")
+    relics.add_argument("--databases", default="databases", help="pasta dos .dat (default: databases)")
+    relics.add_argument("--xml-dir", default=".", help="pasta com relics_main/ e relics_essence/")
+    relics.set_defaults(handler=cmd_relics)
+
+    skilltree = commands.add_parser("skilltree", help="scrape da skill tree de uma classe")
+    skilltree.add_argument("--site", choices=("main", "essence"), default="main")
+    skilltree.add_argument("--slug", required=True, help="slug da classe no wiki (ex: warlord)")
+    skilltree.add_argument("--folder", required=True, help="pasta do XML da classe (ex: 2ndClass)")
+    skilltree.add_argument("--xml", required=True, help="nome do XML da classe, sem .xml (ex: Warlord)")
+    skilltree.set_defaults(handler=cmd_skilltree)
+
+    index = commands.add_parser("index", help="índices dos DATs e listas de itens")
+    index.add_argument("--rebuild", action="store_true", help="reconstrói ignorando o cache")
+    index.add_argument("--lists", nargs="+", choices=("main", "essence"), metavar="SITE",
+                       help="gera as listas items_<site>_action_*.json")
+    index.add_argument("--multilevel", nargs="+", choices=("main", "essence"), metavar="SITE",
+                       help="gera multilevel_skills_<site>.json a partir do item store")
+    index.set_defaults(handler=cmd_index)
+    return parser
+
+
+def write_metrics_periodically(path, interval: float = 30.0) -> threading.Event:
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            REGISTRY.write_snapshot(path)
+
+    threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+    return stop
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    reporter = ConsoleReporter(quiet=args.quiet)
+
+    if args.rebuild_index:
+        from core.index_cache import IndexCache
+        IndexCache.request_rebuild()
+    if args.metrics_port:
+        server = start_http_server(args.metrics_port)
+        reporter.log(f"📈 Metrics: http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    snapshot_stop = write_metrics_periodically(args.metrics_json) if args.metrics_json else None
+
+    try:
+        return args.handler(args, reporter)
+    except KeyboardInterrupt:
+        reporter.log("🛑 Aborted")
+        return EXIT_INTERRUPTED
+    finally:
+        if snapshot_stop is not None:
+            snapshot_stop.set()
+            REGISTRY.write_snapshot(args.metrics_json)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
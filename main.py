@@ -3,8 +3,15 @@ import sys
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QApplication
 from main_window import MainWindow
+from core.index_cache import IndexCache
+from core.database import DatabaseManager
 
 if __name__ == "__main__":
+    # --rebuild-index: ignora o cache binário e reparseia todos os .dat
+    if "--rebuild-index" in sys.argv:
+        sys.argv.remove("--rebuild-index")
+        IndexCache.request_rebuild()
+
     app = QApplication(sys.argv)
     
     # Configurar High DPI
@@ -15,5 +22,8 @@ if __name__ == "__main__":
     
     window = MainWindow()
     window.show()
+
+    # Índices restantes sobem em background, sem segurar a abertura da janela
+    DatabaseManager.warm_indexes_async()
     
     sys.exit(app.exec())
\ No newline at end of file
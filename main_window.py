@@ -18,6 +18,7 @@ from core.handlers.skill_handler import SkillHandler
 from core.handlers.scraper_handler import ScraperHandler
 from core.handlers.xml_handler import XMLHandler
 from tabs.skill_enchant_tab import SkillEnchantTab
+from tabs.metrics_tab import MetricsTab
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -114,6 +115,7 @@ class MainWindow(QMainWindow):
         
         self.tab_list.addItem("⚡ Skill Analyser")
         self.tab_list.addItem("🪄 Enchant Exporter") # Adicione este item
+        self.tab_list.addItem("📈 Metrics")
         
         # Selecionar primeiro item clicável (Relics Builder)
         self.tab_list.setCurrentRow(1)
@@ -169,6 +171,7 @@ class MainWindow(QMainWindow):
             self.database, 
             self.skilltree_tab,
             self.scraper_handler)
+        self.metrics_tab = MetricsTab(self.app_config)
 
         # Adicionar todas as tabs ao stacked widget
         self.stacked_widget.addWidget(self.relics_builder_tab)         # Index 0
@@ -179,6 +182,7 @@ class MainWindow(QMainWindow):
         self.stacked_widget.addWidget(self.skilltree_tab)              # Index 5
         self.stacked_widget.addWidget(self.skill_analyser_tab)         # Index 6
         self.stacked_widget.addWidget(self.skill_enchant_tab) # Será o index 7
+        self.stacked_widget.addWidget(self.metrics_tab)                # Index 8
         
         content_layout.addWidget(self.stacked_widget)
         
@@ -225,6 +229,7 @@ class MainWindow(QMainWindow):
             8: 5,  # Skills Index
             11: 6, # Skill Analyser (pula spacer no index 9)
             12: 7, # ✨ Nova aba: Enchant Exporter
+            13: 8, # 📈 Metrics
         }
         
         if row in tab_mapping:
@@ -288,4 +293,7 @@ class MainWindow(QMainWindow):
         
         if hasattr(self, 'audit_window'):
             self.audit_window.close()
+
+        # Compacta o journal de status no scraper_config.json
+        self.app_config.flush()
         event.accept()
\ No newline at end of file
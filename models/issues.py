@@ -0,0 +1,110 @@
+from enum import Enum, IntEnum
+from typing import Optional
+
+
+class Severity(IntEnum):
+    """Gravidade de uma issue (ordenável: ERROR > WARNING > INFO)"""
+    INFO = 0
+    WARNING = 1
+    ERROR = 2
+
+    @property
+    def icon(self) -> str:
+        return {Severity.INFO: 'ℹ️', Severity.WARNING: '⚠️', Severity.ERROR: '❌'}[self]
+
+
+class IssueCode(Enum):
+    """Tipos de problema encontrados pela validação 1:1 (valor = gravidade padrão)"""
+
+    # Dados de entrada
+    MISSING_SCRAPER_DATA = ('missing_scraper_data', Severity.ERROR)
+    MISSING_XML = ('missing_xml', Severity.ERROR)
+    NOT_EXTRACTABLE = ('not_extractable', Severity.WARNING)
+
+    # default_action / handler
+    ACTION_MISMATCH = ('action_mismatch', Severity.WARNING)
+    HANDLER_MISMATCH = ('handler_mismatch', Severity.WARNING)
+    MISSING_DEFAULT_ACTION = ('missing_default_action', Severity.ERROR)
+    WRONG_ACTION = ('wrong_action', Severity.ERROR)
+    MISSING_HANDLER = ('missing_handler', Severity.ERROR)
+    WRONG_HANDLER = ('wrong_handler', Severity.ERROR)
+
+    # Estrutura
+    MISSING_SKILLS_TAG = ('missing_skills_tag', Severity.ERROR)
+    UNEXPECTED_SKILLS_TAG = ('unexpected_skills_tag', Severity.WARNING)
+    MISSING_CAPSULED_ITEMS = ('missing_capsuled_items', Severity.ERROR)
+    UNEXPECTED_CAPSULED_ITEMS = ('unexpected_capsuled_items', Severity.WARNING)
+    MISSING_EXTRACTABLE_COUNT = ('missing_extractable_count', Severity.ERROR)
+    UNEXPECTED_EXTRACTABLE_COUNT = ('unexpected_extractable_count', Severity.WARNING)
+    WRONG_EXTRACTABLE_COUNT = ('wrong_extractable_count', Severity.ERROR)
+    ITEM_COUNT_MISMATCH = ('item_count_mismatch', Severity.ERROR)
+    WRONG_CHANCES = ('wrong_chances', Severity.WARNING)
+
+    # Itens do capsuled_items
+    XML_ITEM_NOT_IN_JSON = ('xml_item_not_in_json', Severity.ERROR)
+    XML_ITEM_DUPLICATED = ('xml_item_duplicated', Severity.ERROR)
+    XML_ITEM_WRONG_COUNT = ('xml_item_wrong_count', Severity.WARNING)
+    JSON_ITEM_MISSING_IN_XML = ('json_item_missing_in_xml', Severity.ERROR)
+
+    # Enchant
+    MISSING_ENCHANT_LEVEL_TAG = ('missing_enchant_level_tag', Severity.ERROR)
+    WRONG_ENCHANT_LEVEL = ('wrong_enchant_level', Severity.WARNING)
+    UNEXPECTED_ENCHANT_LEVEL = ('unexpected_enchant_level', Severity.WARNING)
+    MISSING_ENCHANT_ATTRS = ('missing_enchant_attrs', Severity.ERROR)
+    UNEXPECTED_ENCHANT_ATTRS = ('unexpected_enchant_attrs', Severity.WARNING)
+    WRONG_ENCHANT_ATTRS = ('wrong_enchant_attrs', Severity.ERROR)
+    ENCHANT_RANGE_MISMATCH = ('enchant_range_mismatch', Severity.WARNING)
+    UNEXPECTED_ENCHANT_VARIANT = ('unexpected_enchant_variant', Severity.WARNING)
+    MISSING_ENCHANT_VARIANTS = ('missing_enchant_variants', Severity.WARNING)
+
+    # Skill
+    SKILL_XML_NOT_FOUND = ('skill_xml_not_found', Severity.ERROR)
+    SKILL_NO_EFFECTS = ('skill_no_effects', Severity.ERROR)
+    SKILL_MISSING_RESTORATION = ('skill_missing_restoration', Severity.ERROR)
+    SKILL_UNEXPECTED_RESTORATION = ('skill_unexpected_restoration', Severity.ERROR)
+    SKILL_RESTORATION_NO_ITEM_ID = ('skill_restoration_no_item_id', Severity.ERROR)
+    SKILL_RESTORATION_ITEM_NOT_IN_JSON = ('skill_restoration_item_not_in_json', Severity.ERROR)
+    SKILL_RESTORATION_WRONG_COUNT = ('skill_restoration_wrong_count', Severity.WARNING)
+    SKILL_RESTORATION_MISSING_ITEM = ('skill_restoration_missing_item', Severity.ERROR)
+    SKILL_MISSING_RANDOM = ('skill_missing_random', Severity.ERROR)
+    SKILL_UNEXPECTED_RANDOM = ('skill_unexpected_random', Severity.ERROR)
+    SKILL_RANDOM_NO_ITEMS = ('skill_random_no_items', Severity.ERROR)
+    SKILL_RANDOM_COUNT_MISMATCH = ('skill_random_count_mismatch', Severity.WARNING)
+    SKILL_RANDOM_NO_ITEM_ID = ('skill_random_no_item_id', Severity.ERROR)
+    SKILL_RANDOM_ITEM_NOT_IN_JSON = ('skill_random_item_not_in_json', Severity.ERROR)
+    SKILL_RANDOM_MISSING_ITEM = ('skill_random_missing_item', Severity.ERROR)
+    SKILL_VALIDATION_ERROR = ('skill_validation_error', Severity.ERROR)
+
+    def __init__(self, key: str, severity: Severity):
+        self.key = key
+        self.severity = severity
+
+
+class Issue(str):
+    """
+    Issue tipada. Continua sendo a string exibida ("❌ Falta 'handler' ...") para quem
+    só mostra/exporta o texto, mas carrega code e severity para filtros e contagens.
+    """
+
+    def __new__(cls, code: IssueCode, text: str, severity: Optional[Severity] = None):
+        severity = severity if severity is not None else code.severity
+        issue = super().__new__(cls, f"{severity.icon} {text}")
+        issue.code = code
+        issue.severity = severity
+        issue.text = text
+        return issue
+
+    def __reduce__(self):
+        return (Issue, (self.code, self.text, self.severity))
+
+
+def max_severity(issues) -> Optional[Severity]:
+    """Maior gravidade da lista (strings antigas sem code contam pelo emoji)"""
+    worst = None
+    for issue in issues:
+        severity = getattr(issue, 'severity', None)
+        if severity is None:
+            severity = Severity.ERROR if issue.startswith('❌') else Severity.WARNING
+        if worst is None or severity > worst:
+            worst = severity
+    return worst
@@ -0,0 +1,148 @@
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from models.issues import IssueCode, Severity, max_severity
+
+# Flags booleanas do ValidationResult indexadas como bitsets
+FLAG_COLUMNS = ('needs_fix', 'has_scraper_data', 'has_xml', 'xml_correct', 'has_skills')
+# Colunas categóricas (valor -> bitset)
+CATEGORY_COLUMNS = ('site_type', 'expected_handler')
+
+
+def _bitset(indexes: Iterable[int], size: int) -> int:
+    """Monta um int com os bits das linhas dadas (O(n), sem shifts de inteiros gigantes)"""
+    buf = bytearray((size + 7) // 8)
+    for i in indexes:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+class ResultTable:
+    """
+    Tabela colunar dos resultados do scan.
+
+    Cada coluna vira bitsets (int do Python, um bit por linha) montados uma única vez:
+    filtros por flag, site, handler, severidade e código de issue são AND/OR/NOT de
+    inteiros, sem percorrer os registros. O filtro de texto usa um índice pré-montado
+    com todos os item_ids numa única string.
+    """
+
+    def __init__(self, results: Iterable):
+        self.rows = list(results)
+        self.size = len(self.rows)
+        self.all = (1 << self.size) - 1
+
+        self._flags: Dict[str, int] = {}
+        self._categories: Dict[str, Dict[object, int]] = {}
+        self._codes: Dict[IssueCode, int] = {}
+        self.severity = array('b')
+
+        flag_rows = {name: [] for name in FLAG_COLUMNS}
+        category_rows = {name: {} for name in CATEGORY_COLUMNS}
+        code_rows: Dict[IssueCode, List[int]] = {}
+
+        for index, row in enumerate(self.rows):
+            for name in FLAG_COLUMNS:
+                if row.get(name):
+                    flag_rows[name].append(index)
+            for name in CATEGORY_COLUMNS:
+                category_rows[name].setdefault(row.get(name), []).append(index)
+
+            issues = row.get('issues') or []
+            for code in {getattr(issue, 'code', None) for issue in issues}:
+                if code is not None:
+                    code_rows.setdefault(code, []).append(index)
+
+            worst = max_severity(issues)
+            self.severity.append(-1 if worst is None else int(worst))
+
+        for name, indexes in flag_rows.items():
+            self._flags[name] = _bitset(indexes, self.size)
+        for name, values in category_rows.items():
+            self._categories[name] = {value: _bitset(idx, self.size) for value, idx in values.items()}
+        for code, indexes in code_rows.items():
+            self._codes[code] = _bitset(indexes, self.size)
+        self._severity_bits = {
+            level: _bitset((i for i, s in enumerate(self.severity) if s == level), self.size)
+            for level in (-1, *map(int, Severity))
+        }
+
+        # Índice de texto: "id1\nid2\n..." + início de cada linha para mapear match -> linha
+        ids = [str(row.get('item_id', '')).lower() for row in self.rows]
+        self._id_text = '\n'.join(ids)
+        self._line_starts = array('l')
+        offset = 0
+        for item_id in ids:
+            self._line_starts.append(offset)
+            offset += len(item_id) + 1
+        self._text_cache: "OrderedDict[str, int]" = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Máscaras
+    # ------------------------------------------------------------------
+    def flag(self, name: str) -> int:
+        return self._flags[name]
+
+    def where(self, column: str, value) -> int:
+        return self._categories[column].get(value, 0)
+
+    def with_code(self, code: IssueCode) -> int:
+        return self._codes.get(code, 0)
+
+    def with_severity(self, severity: Optional[Severity]) -> int:
+        """Linhas cuja issue MAIS GRAVE é exatamente `severity` (None = sem issues)"""
+        return self._severity_bits[-1 if severity is None else int(severity)]
+
+    def at_least(self, severity: Severity) -> int:
+        mask = 0
+        for level in Severity:
+            if level >= severity:
+                mask |= self._severity_bits[int(level)]
+        return mask
+
+    def invert(self, mask: int) -> int:
+        return self.all & ~mask
+
+    def text(self, query: str) -> int:
+        """Substring no item_id (case-insensitive), com cache das últimas buscas"""
+        query = query.lower()
+        if not query:
+            return self.all
+        if '\n' in query:
+            return 0
+
+        cached = self._text_cache.get(query)
+        if cached is not None:
+            self._text_cache.move_to_end(query)
+            return cached
+
+        hits = set()
+        pos = self._id_text.find(query)
+        while pos != -1:
+            hits.add(bisect_right(self._line_starts, pos) - 1)
+            pos = self._id_text.find(query, pos + 1)
+        mask = _bitset(hits, self.size)
+
+        self._text_cache[query] = mask
+        if len(self._text_cache) > 64:
+            self._text_cache.popitem(last=False)
+        return mask
+
+    # ------------------------------------------------------------------
+    # Seleção
+    # ------------------------------------------------------------------
+    def select(self, mask: int) -> List:
+        """Linhas da máscara, na ordem original"""
+        if mask == self.all:
+            return list(self.rows)
+        rows = []
+        bits = format(mask, 'b')[::-1]
+        index = bits.find('1')
+        while index != -1:
+            rows.append(self.rows[index])
+            index = bits.find('1', index + 1)
+        return rows
+
+    def count(self, mask: int) -> int:
+        return bin(mask).count('1')
@@ -0,0 +1,174 @@
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from lxml import etree
+
+# Início de cada <item ... id="N" ...> no arquivo de bloco (bytes)
+_ITEM_START_RE = re.compile(rb'<item\s[^>]*?\bid="(\d+)"')
+_ITEM_END = b'</item>'
+_NAMESPACE_RE = re.compile(r'\s+xmlns(?::[^=]+)?="[^"]*"')
+
+
+def item_spans(xml_file) -> Dict[str, Tuple[int, int]]:
+    """
+    id -> (início, fim) em bytes de cada <item> do arquivo, numa única leitura.
+    O fim inclui o whitespace até a próxima tag (o tail que o lxml põe no content).
+    """
+    with open(xml_file, 'rb') as f:
+        raw = f.read()
+
+    spans = {}
+    for match in _ITEM_START_RE.finditer(raw):
+        start = match.start()
+        end = raw.find(_ITEM_END, start)
+        if end == -1:
+            continue
+        end += len(_ITEM_END)
+        next_tag = raw.find(b'<', end)
+        if next_tag != -1 and not raw[end:next_tag].strip():
+            end = next_tag
+        spans.setdefault(match.group(1).decode(), (start, end))
+    return spans
+
+
+class ValidationResult:
+    """
+    Resultado compacto da validação de UM item (um registro por item no scan).
+
+    Guarda só flags, issues, o arquivo XML e os offsets do <item> nele. scraper_data e
+    xml_data NÃO ficam no registro: são recarregados sob demanda quando o item é aberto
+    no editor. Aceita acesso estilo dict (result['item_id'], result.get(...)) para os
+    consumidores que já trabalhavam com o dicionário antigo.
+    """
+
+    __slots__ = (
+        'item_id', 'site_type', 'validation_status', 'needs_fix',
+        'has_scraper_data', 'has_xml', 'xml_correct', 'issues',
+        'current_action', 'expected_action', 'expected_handler',
+        'has_skills', 'skill_id', 'skill_level',
+        'xml_file', 'xml_span', 'xml_stat',
+    )
+
+    LAZY_KEYS = ('scraper_data', 'xml_data')
+
+    def __init__(self, item_id: str, site_type: str, **fields):
+        self.item_id = str(item_id)
+        self.site_type = site_type
+        self.validation_status = fields.get('validation_status', 'INVALID')
+        self.needs_fix = fields.get('needs_fix', True)
+        self.has_scraper_data = fields.get('has_scraper_data', False)
+        self.has_xml = fields.get('has_xml', False)
+        self.xml_correct = fields.get('xml_correct', False)
+        self.issues: List[str] = fields.get('issues') or []
+        self.current_action = fields.get('current_action')
+        self.expected_action = fields.get('expected_action')
+        self.expected_handler = fields.get('expected_handler')
+        self.has_skills = fields.get('has_skills', False)
+        self.skill_id: Optional[str] = fields.get('skill_id')
+        self.skill_level: Optional[int] = fields.get('skill_level')
+        self.xml_file: Optional[str] = fields.get('xml_file')
+        self.xml_span: Optional[Tuple[int, int]] = fields.get('xml_span')
+        self.xml_stat: Optional[Tuple[int, int]] = fields.get('xml_stat')
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any], spans: Optional[Dict[str, Tuple[int, int]]] = None,
+                    xml_stat: Optional[Tuple[int, int]] = None) -> 'ValidationResult':
+        """Converte o dict da validação (com árvores e JSON) no registro compacto"""
+        item_id = str(result['item_id'])
+        scraper_data = result.get('scraper_data') or {}
+        scraping_info = scraper_data.get('scraping_info', {})
+        skill_data = scraper_data.get('skill_data') or {}
+        xml_data = result.get('xml_data')
+
+        skill_id = skill_data.get('skill_id')
+        skill_level = skill_data.get('skill_level')
+        fields = {key: result[key] for key in cls.__slots__
+                  if key in result and key not in ('item_id', 'site_type')}
+        fields.update(
+            has_skills=scraping_info.get('has_skills', False),
+            skill_id=str(skill_id) if skill_id is not None else None,
+            skill_level=int(skill_level) if skill_level is not None else None,
+            xml_file=xml_data['file'] if xml_data else None,
+            xml_span=spans.get(item_id) if (xml_data and spans) else None,
+            xml_stat=xml_stat if xml_data else None,
+        )
+        return cls(item_id, result.get('site_type'), **fields)
+
+    # ------------------------------------------------------------------
+    # Reidratação sob demanda
+    # ------------------------------------------------------------------
+    @property
+    def scraper_data(self) -> Optional[Dict[str, Any]]:
+        if not self.has_scraper_data:
+            return None
+        from core.handlers.scraper_handler import ScraperHandler
+        return ScraperHandler().load_scraper_data(self.item_id, self.site_type)
+
+    @property
+    def xml_data(self) -> Optional[Dict[str, Any]]:
+        """
+        {'file', 'content'} do item. Se o arquivo não mudou desde o scan, lê só o trecho
+        do <item> pelos offsets; senão (ou se o trecho falhar) recorre ao XMLHandler.
+        """
+        if not self.has_xml:
+            return None
+
+        content = self._content_from_span()
+        if content is not None:
+            return {'file': self.xml_file, 'content': content}
+
+        from core.handlers.xml_handler import XMLHandler
+        xml_data = XMLHandler().load_xml_data(self.item_id, self.site_type)
+        if not xml_data:
+            return None
+        return {'file': xml_data['file'], 'content': xml_data['content']}
+
+    def _content_from_span(self) -> Optional[str]:
+        if not (self.xml_file and self.xml_span and self.xml_stat):
+            return None
+        try:
+            stat = os.stat(self.xml_file)
+            if (stat.st_mtime_ns, stat.st_size) != tuple(self.xml_stat):
+                return None
+
+            start, end = self.xml_span
+            with open(self.xml_file, 'rb') as f:
+                f.seek(start)
+                raw = f.read(end - start)
+
+            parser = etree.XMLParser(remove_blank_text=False, remove_comments=False)
+            elem = etree.fromstring(raw, parser)
+            if elem.get('id') != self.item_id:
+                return None
+            # Mesmo formato do load_xml_data: elemento + tail, sem namespace
+            elem.tail = raw[len(raw.rstrip()):].decode('utf-8')
+            content = etree.tostring(elem, encoding='unicode', method='xml', pretty_print=False)
+            return _NAMESPACE_RE.sub('', content)
+        except Exception:
+            return None
+
+    # ------------------------------------------------------------------
+    # Compatibilidade com o dict antigo
+    # ------------------------------------------------------------------
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__ or key in self.LAZY_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ or key in self.LAZY_KEYS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return (f"ValidationResult(item_id={self.item_id!r}, site_type={self.site_type!r}, "
+                f"status={self.validation_status!r}, issues={len(self.issues)})")
@@ -13,7 +13,11 @@ from typing import Optional, TYPE_CHECKING
 
 # Imports locais
 from workers.scanner_worker import ItemBuilderWorker
+from core.xml_cache import XMLTreeCache
+from models.issues import Severity
+from models.result_table import ResultTable
 from core.handlers.item_handler import ItemHandler
+from core.tools.batch_fixer import BatchAutoFixer
 from models.problem_model import ProblemModel
 from ui.multilevel_dialog import MultilevelSkillDialog 
 
@@ -63,6 +67,8 @@ class ItemBuilderTab(QWidget):
         self.skill_problems = []
         self.filtered_box_problems = []
         self.filtered_skill_problems = []
+        self.box_table = ResultTable([])
+        self.skill_table = ResultTable([])
         
         self.current_problem: Optional[ProblemModel] = None
         self.current_selection_type = "box"  # "box" ou "skill"
@@ -97,7 +103,8 @@ class ItemBuilderTab(QWidget):
         controls_layout.addWidget(self.filter_edit)
         
         self.filter_combo = QComboBox()
-        self.filter_combo.addItems(["All Issues", "No Scraper Data", "No XML", "XML Incorrect", "Has Data"])
+        self.filter_combo.addItems(["All Issues", "No Scraper Data", "No XML", "XML Incorrect", "Has Data",
+                                    "Errors", "Warnings Only"])
         self.filter_combo.currentTextChanged.connect(self.filter_items)
         self.filter_combo.setMaximumWidth(150)
         controls_layout.addWidget(self.filter_combo)
@@ -367,6 +374,7 @@ class ItemBuilderTab(QWidget):
         self.box_problems = []
         self.skill_problems = []
         self.filtered_problems = []
+        self.rebuild_result_tables()
         self.clear_editor()
         self.box_count_label.setText("0 boxes")
         self.skills_count_label.setText("0 skills")
@@ -419,21 +427,13 @@ class ItemBuilderTab(QWidget):
         self.skill_problems = []
         
         for problem in problems:
-            scraper_data = problem.get('scraper_data', {})
-            has_skills = False
-            skill_id = None
-            
-            if scraper_data:
-                scraping_info = scraper_data.get('scraping_info', {})
-                has_skills = scraping_info.get('has_skills', False)
-                skill_id = self.scraper_handler.get_skill_id(scraper_data)
-            
-            # ✅ SEPARA CORRETAMENTE
-            if has_skills and skill_id:
+            # ✅ SEPARA CORRETAMENTE (flags do ValidationResult, sem recarregar o JSON)
+            if problem['has_skills'] and problem['skill_id']:
                 self.skill_problems.append(problem)
             else:
                 self.box_problems.append(problem)
         
+        self.rebuild_result_tables()
         self.filtered_box_problems = self.box_problems.copy()
         self.filtered_skill_problems = self.skill_problems.copy()  # ✅ COPIA TODAS
         self.filtered_problems = self.box_problems + self.skill_problems
@@ -491,17 +491,11 @@ class ItemBuilderTab(QWidget):
         skills_grouped = {}
         
         for problem in self.filtered_skill_problems:
-            scraper_data = problem.get('scraper_data', {})
-            if not scraper_data: 
+            if not problem['has_scraper_data']:
                 continue
             
-            skill_id = self.scraper_handler.get_skill_id(scraper_data)
-            
-            skill_level = None
-            skill_data = scraper_data.get('skill_data', {})
-            if skill_data:
-                sl = skill_data.get('skill_level')
-                skill_level = int(sl) if sl is not None else None
+            skill_id = problem['skill_id']
+            skill_level = problem['skill_level']
             
             if not skill_id or skill_level is None: 
                 continue
@@ -567,47 +561,44 @@ class ItemBuilderTab(QWidget):
         # Atualizar após fechar
         self.filter_items()
 
+    def rebuild_result_tables(self):
+        """Reindexa as listas (bitsets por coluna + índice de texto) para o filtro"""
+        self.box_table = ResultTable(self.box_problems)
+        self.skill_table = ResultTable(self.skill_problems)
+
+    def build_filter_mask(self, table: ResultTable, text_filter: str, type_filter: str, skills: bool) -> int:
+        """Traduz os filtros da UI em uma máscara da ResultTable"""
+        mask = table.text(text_filter)
+        
+        # Filtro de tipo
+        if type_filter == "No Scraper Data":
+            mask &= table.invert(table.flag('has_scraper_data'))
+        elif type_filter == "No XML":
+            mask &= table.invert(table.flag('has_xml'))
+        elif type_filter == "XML Incorrect":
+            if skills:
+                mask &= table.flag('has_xml') & table.invert(table.flag('xml_correct'))
+            else:
+                mask &= table.invert(table.flag('has_xml') & table.flag('xml_correct'))
+        elif type_filter == "Has Data":
+            mask &= table.flag('has_scraper_data') & table.flag('has_xml')
+        elif type_filter == "Errors":
+            mask &= table.with_severity(Severity.ERROR)
+        elif type_filter == "Warnings Only":
+            mask &= table.with_severity(Severity.WARNING)
+        
+        return mask
+
     def filter_items(self):
         """Filtra ambas as listas de itens"""
         text_filter = self.filter_edit.text().lower()
         type_filter = self.filter_combo.currentText()
         
-        # Filtrar box problems
-        self.filtered_box_problems = []
-        for problem in self.box_problems:
-            if text_filter and text_filter not in problem['item_id'].lower():
-                continue
-            
-            # Filtro de tipo
-            if type_filter == "No Scraper Data" and problem['has_scraper_data']:
-                continue
-            elif type_filter == "No XML" and problem['has_xml']:
-                continue
-            elif type_filter == "XML Incorrect" and (problem['has_xml'] and problem['xml_correct']):
-                continue
-            elif type_filter == "Has Data" and not (problem['has_scraper_data'] and problem['has_xml']):
-                continue
-                
-            self.filtered_box_problems.append(problem)
-
-        # Filtrar skill problems
-        self.filtered_skill_problems = []
-        for problem in self.skill_problems:
-            if text_filter and text_filter not in problem['item_id'].lower():
-                continue
-            
-            # Filtro de tipo
-            if type_filter == "No Scraper Data" and problem['has_scraper_data']:
-                continue
-            elif type_filter == "No XML" and problem['has_xml']:
-                continue
-            elif type_filter == "XML Incorrect" and (not problem['has_xml'] or problem['xml_correct']):
-                continue
-            elif type_filter == "Has Data" and not (problem['has_scraper_data'] and problem['has_xml']):
-                continue
-                
-            self.filtered_skill_problems.append(problem)
-            self.filtered_problems = self.filtered_box_problems + self.filtered_skill_problems
+        self.filtered_box_problems = self.box_table.select(
+            self.build_filter_mask(self.box_table, text_filter, type_filter, skills=False))
+        self.filtered_skill_problems = self.skill_table.select(
+            self.build_filter_mask(self.skill_table, text_filter, type_filter, skills=True))
+        self.filtered_problems = self.filtered_box_problems + self.filtered_skill_problems
         
         self.populate_box_items_list()
         self.populate_skills_list()
@@ -849,6 +840,7 @@ class ItemBuilderTab(QWidget):
             content = re.sub(r'(?<!\s)/>', ' />', content)
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(content)
+            XMLTreeCache.invalidate(output_file)
             
             QMessageBox.information(
                 self, 
@@ -867,6 +859,7 @@ class ItemBuilderTab(QWidget):
                 if prob['item_id'] == item_id and prob['site_type'] == site_type:
                     self.box_problems.pop(i)
                     break
+            self.rebuild_result_tables()
             
             # Atualizar UI
             self.filter_items()
@@ -881,65 +874,13 @@ class ItemBuilderTab(QWidget):
             import traceback
             traceback.print_exc()
 
-    def edit_item_inplace_lxml(self, item_elem, scraper_data: dict, item_id: str, site_type: str = "main"):
-        """
-        Edita item in-place usando LXML
-        Preserva formatação original COMPLETAMENTE
-        """
-        scraping_info = scraper_data.get('scraping_info', {})
-        item_type = scraping_info.get('item_type', '')
-        has_skills = scraping_info.get('has_skills', False)
-        skill_id = self.scraper_handler.get_skill_id(scraper_data)
+    def make_batch_fixer(self, progress=None):
+        return BatchAutoFixer(self.scraper_handler, self.skill_handler, self.item_handler,
+                              self.xml_handler, progress=progress)
 
-        print(f"  📝 Editando item {item_id} in-place...")
-
-        # Determinar action correta
-        if has_skills and skill_id:
-            correct_action = item_type  # SKILL_REDUCE*
-        else:
-            correct_action = 'PEEL'
-
-        # Atualizar default_action
-        self.skill_handler._update_or_add_set_tag_lxml(item_elem, 'default_action', correct_action)
-        
-        # Atualizar handler
-        if has_skills and skill_id:
-            self.skill_handler._update_or_add_set_tag_lxml(item_elem, 'handler', 'ItemSkills')
-            
-            # Guardar tail do capsuled_items antes de remover
-            capsuled_tail = '\n\t'
-            for capsuled in item_elem.xpath('./capsuled_items'):
-                if capsuled.tail:
-                    capsuled_tail = capsuled.tail
-                item_elem.remove(capsuled)
-            
-            # Remover extractableCount
-            for tag in item_elem.xpath("./set[@name='extractableCountMin']"):
-                item_elem.remove(tag)
-            for tag in item_elem.xpath("./set[@name='extractableCountMax']"):
-                item_elem.remove(tag)
-            
-            # Atualizar skills COM TAIL ORIGINAL
-            self.skill_handler._update_or_create_skills_lxml(item_elem, skill_id, site_type, capsuled_tail)
-            
-        else:
-            self.skill_handler._update_or_add_set_tag_lxml(item_elem, 'handler', 'ExtractableItems')
-            
-            # Guardar tail do skills antes de remover
-            skills_tail = '\n\t'
-            for skills in item_elem.xpath('./skills'):
-                if skills.tail:
-                    skills_tail = skills.tail
-                item_elem.remove(skills)
-            
-            # Atualizar capsuled_items COM TAIL ORIGINAL
-            box_data = scraper_data.get('box_data', {})
-            self.item_handler._update_capsuled_items_lxml(item_elem, box_data, item_id, skills_tail)
-            
-            # Atualizar extractableCount
-            self.item_handler._update_extractable_count_lxml(item_elem, box_data)
-        
-        print(f"  ✅ Item {item_id} editado com sucesso")
+    def edit_item_inplace_lxml(self, item_elem, scraper_data: dict, item_id: str, site_type: str = "main"):
+        """Edita item in-place usando LXML (lógica em BatchAutoFixer.edit_item)"""
+        self.make_batch_fixer().edit_item(item_elem, scraper_data, item_id, site_type)
 
     def auto_fix_item(self):
         if not self.current_problem or not self.current_problem.has_scraper_data:
@@ -1319,165 +1260,22 @@ class ItemBuilderTab(QWidget):
             self.run_batch_auto_fix(fixable_items)
     
     def run_batch_auto_fix(self, items_to_fix):
-        """Batch processing com LXML - com filtro multilevel"""
+        """Batch processing com LXML - com filtro multilevel (core/tools/batch_fixer.py)"""
         self.progress_bar.setVisible(True)
         self.progress_bar.setMaximum(len(items_to_fix))
 
-        # ✅ Carregar multilevel skills set (se não tiver sido carregado)
-        if not hasattr(self, 'multilevel_skills_set'):
-            self.multilevel_skills_set = set()
-            if self.site_type == "main":
-                json_filename = f"multilevel_skills_main.json"
-                if os.path.exists(json_filename):
-                    try:
-                        with open(json_filename, 'r', encoding='utf-8') as f:
-                            multilevel_data = json.load(f)
-                            self.multilevel_skills_set = set(multilevel_data.keys())
-                            print(f"✅ Carregadas {len(self.multilevel_skills_set)} skills multilevel para filtro")
-                    except Exception as e:
-                        print(f"⚠️ Erro ao carregar multilevel JSON: {e}")
+        def progress(current, total, status):
+            self.progress_bar.setValue(current)
+            self.status_label.setText(status)
 
-        skill_errors = []
-        
-        # Agrupar por arquivo
-        items_by_file = {}
-        for problem in items_to_fix:
-            if not problem.get('xml_data'):
-                continue
-            
-            file_path = problem['xml_data']['file']
-            if file_path not in items_by_file:
-                items_by_file[file_path] = []
-            items_by_file[file_path].append(problem)
-        
-        success_count = 0
-        failed_count = 0
-        skill_success = 0
-        skill_failed = 0
-        skill_skipped = 0
-        
-        # Processar cada arquivo
-        for file_path, problems in items_by_file.items():
-            print(f"\n{'='*80}")
-            print(f"📄 Processando {Path(file_path).name} ({len(problems)} items)")
-            print(f"{'='*80}")
-            
-            site_type = problems[0]['site_type']
-            output_dir = Path("output_items_essence" if site_type == "essence" else "output_items_main")
-            output_dir.mkdir(exist_ok=True)
-            output_file = output_dir / Path(file_path).name
-            
-            file_to_load = output_file if output_file.exists() else file_path
-            
-            try:
-                # ✅ CARREGAR COM LXML
-                parser = etree.XMLParser(remove_blank_text=False, remove_comments=False)
-                tree = etree.parse(str(file_to_load), parser)
-                root = tree.getroot()
-                
-                # Processar cada item
-                for i, problem in enumerate(problems, 1):
-                    item_id = problem['item_id']
-                    self.progress_bar.setValue(success_count + failed_count + 1)
-                    self.status_label.setText(f"Processing {item_id} ({i}/{len(problems)})...")
-                    
-                    print(f"\n[{i}/{len(problems)}] Item {item_id}")
-                    
-                    try:
-                        # Encontrar item
-                        items = root.xpath(f".//item[@id='{item_id}'][@name][@type]")
-                        if not items:
-                            print(f"  ❌ Item não encontrado")
-                            failed_count += 1
-                            continue
-                        
-                        item_elem = items[0]
-
-                        # Editar
-                        self.edit_item_inplace_lxml(item_elem, problem['scraper_data'], item_id, site_type)
-                        success_count += 1
-                        
-                        # Skill (COM FILTRO MULTILEVEL)
-                        scraper_data = problem.get('scraper_data', {})
-                        scraping_info = scraper_data.get('scraping_info', {})
-                        if scraping_info.get('has_skills', False):
-                            skill_id = self.scraper_handler.get_skill_id(scraper_data)
-                            if skill_id:
-                                # ✅ PULA skills que estão no JSON multilevel
-                                if str(skill_id) in self.multilevel_skills_set:
-                                    print(f"  ⏭️  Skill {skill_id} é MULTILEVEL (no JSON), PULANDO")
-                                    skill_skipped += 1
-                                    continue
-                                
-                                try:
-                                    skill_level = scraper_data.get('skill_data', {}).get('skill_level', 1)
-                                    print(f"  🔧 Processando skill {skill_id} (level {skill_level})...")
-                                    
-                                    fixed_skill = self.skill_handler.generate_fixed_skill_xml_single_level(
-                                        skill_id, 
-                                        skill_level,
-                                        scraper_data,
-                                        site_type
-                                    )
-                                    
-                                    if fixed_skill:
-                                        self.xml_handler.save_skill_xml_internal(
-                                            skill_id, 
-                                            fixed_skill, 
-                                            site_type, 
-                                            skip_confirmation=True
-                                        )
-                                        skill_success += 1
-                                        print(f"    ✅ Skill {skill_id} salva")
-                                    else:
-                                        skill_failed += 1
-                                        error_msg = f"Item {item_id} | Skill {skill_id} | Não gerou XML da skill"
-                                        skill_errors.append(error_msg)
-                                        print(f"    ❌ Não gerou XML da skill {skill_id}")
-                                        
-                                except Exception as e:
-                                    skill_failed += 1
-                                    error_msg = f"Item {item_id} | Skill {skill_id} | Erro: {str(e)}"
-                                    skill_errors.append(error_msg)
-                                    print(f"    ❌ Erro na skill {skill_id}: {e}")
-                    
-                    except Exception as e:
-                        print(f"  ❌ Erro no item {item_id}: {e}")
-                        failed_count += 1
-                
-                # ✅ SALVAR COM LXML (APÓS processar TODOS os itens)
-                tree.write(
-                    str(output_file),
-                    encoding='utf-8',
-                    xml_declaration=True,
-                    pretty_print=False
-                )
-
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                content = re.sub(r'(?<!\s)/>', ' />', content)
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
-
-                print(f"\n💾 Arquivo salvo: {output_file}")
-                
-            except Exception as e:
-                print(f"❌ Erro no arquivo {file_path}: {e}")
-                failed_count += len(problems)
+        result = self.make_batch_fixer(progress).run(items_to_fix)
         
         self.progress_bar.setVisible(False)
         self.filter_items()
 
-        if skill_failed > 0:
-            self.show_skill_errors_window(skill_errors)
-        
-        summary = [
-            "BATCH AUTO-FIX COMPLETE:",
-            "",
-            f"Items: ✅ {success_count} | ❌ {failed_count}",
-        ]
+        if result['skill_failed'] > 0:
+            self.show_skill_errors_window(result['skill_errors'])
         
-        if skill_success or skill_failed or skill_skipped:
-            summary.append(f"Skills: ✅ {skill_success} | ❌ {skill_failed} | ⏭️ {skill_skipped} (multilevel)")
+        summary = ["BATCH AUTO-FIX COMPLETE:", ""] + BatchAutoFixer.format_summary(result)
         
         QMessageBox.information(self, "Complete", "\n".join(summary))
\ No newline at end of file
@@ -1,14 +1,18 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
-                           QPushButton, QLabel, QProgressBar, QTextEdit,
+                           QPushButton, QLabel, QProgressBar, QPlainTextEdit,
                            QGroupBox, QGridLayout, QCheckBox, QFrame)
 from PyQt6.QtCore import pyqtSignal, Qt
 from PyQt6.QtGui import QTextCursor
 from workers.scraper_worker import ScraperWorker
+from workers.reparse_worker import ReparseWorker
 from utils.scraping_stats import ScrapingStats
+from utils.stats_aggregator import StatsAggregator
 
 class MainTab(QWidget):
     stats_updated = pyqtSignal()
     worker_created = pyqtSignal(object, str)
+
+    LOG_MAX_LINES = 5000
     
     def __init__(self, config, database):
         super().__init__()
@@ -51,6 +55,8 @@ class MainTab(QWidget):
         self.pause_btn = QPushButton("⏸️ Pause")
         self.stop_btn = QPushButton("🛑 Stop")
         self.retry_btn = QPushButton("🔄 Retry Failed")
+        self.reparse_btn = QPushButton("♻️ Reparse HTML")
+        self.reparse_btn.setToolTip("Rebuild data.json from the archived HTML (offline, no network)")
         
         self.pause_btn.setEnabled(False)
         self.stop_btn.setEnabled(False)
@@ -60,6 +66,7 @@ class MainTab(QWidget):
         controls_layout.addWidget(self.pause_btn)
         controls_layout.addWidget(self.stop_btn)
         controls_layout.addWidget(self.retry_btn)
+        controls_layout.addWidget(self.reparse_btn)
         controls_layout.addStretch()
         
         # Progresso
@@ -144,7 +151,10 @@ class MainTab(QWidget):
         # Log
         log_group = QGroupBox("Log")
         log_layout = QVBoxLayout(log_group)
-        self.log_text = QTextEdit()
+        # Ring buffer: o Qt descarta as linhas mais antigas além do limite
+        self.log_text = QPlainTextEdit()
+        self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(self.LOG_MAX_LINES)
         self.log_text.setMaximumHeight(300)
         log_layout.addWidget(self.log_text)
         
@@ -163,6 +173,7 @@ class MainTab(QWidget):
         self.pause_btn.clicked.connect(self.toggle_pause)
         self.stop_btn.clicked.connect(self.stop_scraping)
         self.retry_btn.clicked.connect(self.retry_failed)
+        self.reparse_btn.clicked.connect(self.start_reparse)
 
     # 🆕 NOVO MÉTODO: Generate Items Lists
     def generate_items_lists(self):
@@ -233,15 +244,39 @@ class MainTab(QWidget):
         self.start_scraping()
         self.log("🔄 Retrying failed items for Main site...")
         
+    def start_reparse(self):
+        """Re-extrai os itens a partir do HTML arquivado, sem rede"""
+        if self.scraper_worker and self.scraper_worker.isRunning():
+            return
+        self.scraper_worker = ReparseWorker(self.site_type, self.config)
+
+        self.scraper_worker.log_signal.connect(self.log)
+        self.scraper_worker.progress_signal.connect(self.update_progress)
+        self.scraper_worker.stats_signal.connect(self.update_stats)
+        self.scraper_worker.finished.connect(self.reparse_finished)
+
+        self.worker_created.emit(self.scraper_worker, self.site_type)
+
+        self.scraper_worker.start()
+        self.update_controls(True)
+        self.log("♻️ Reparsing archived HTML...")
+
+    def reparse_finished(self):
+        self.update_controls(False)
+        self.status_label.setText("Reparse finished")
+        self.stats_updated.emit()
+
     def update_controls(self, running):
         self.start_btn.setEnabled(not running)
         self.pause_btn.setEnabled(running)
         self.stop_btn.setEnabled(running)
         self.retry_btn.setEnabled(not running)
+        self.reparse_btn.setEnabled(not running)
         self.generate_items_btn.setEnabled(not running)  # 🆕 Desabilita durante scraping
         
     def log(self, message):
-        self.log_text.append(message)
+        # Um bloco por frame do LogBus (várias linhas num append só)
+        self.log_text.appendPlainText(message)
         scrollbar = self.log_text.verticalScrollBar()
         if scrollbar is not None and scrollbar.value() == scrollbar.maximum():
             cursor = self.log_text.textCursor()
@@ -302,64 +337,11 @@ class MainTab(QWidget):
         self.stats_updated.emit()
 
     def update_site_stats(self):
-        """Varre JSONs e atualiza estatísticas REAIS da UI"""
-        import json
-        from pathlib import Path
-        
+        """Lê estatísticas REAIS do item store (uma consulta no SQLite) e atualiza a UI"""
         try:
-            self.log(f"📊 Scanning JSON statistics for {self.site_type.upper()}...")
-            
-            # Diretório base dos items
-            items_dir = Path(f"html_items_{self.site_type}")
-            
-            if not items_dir.exists():
-                self.log(f"⚠️ Directory not found: {items_dir}")
-                return
-            
-            # Contadores
-            stats = {
-                'item_box_found': 0,
-                'skill_box_found': 0,
-                'item_guaranteed': 0,
-                'item_random': 0,
-                'item_possible': 0,
-                'skill_guaranteed': 0,
-                'skill_random': 0,
-                'skill_possible': 0,
-            }
-            
-            # Varrer todos os JSONs
-            json_files = list(items_dir.glob('*/data.json'))
+            self.log(f"📊 Loading item statistics for {self.site_type.upper()}...")
             
-            for json_file in json_files:
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # Verificar se é item ou skill box
-                    scraping_info = data.get('scraping_info', {})
-                    has_skills = scraping_info.get('has_skills', False)
-                    
-                    box_data = data.get('box_data', {})
-                    guaranteed = len(box_data.get('guaranteed_items', []))
-                    random_items = len(box_data.get('random_items', []))
-                    possible = len(box_data.get('possible_items', []))
-                    
-                    # Contabilizar
-                    if has_skills:
-                        stats['skill_box_found'] += 1
-                        stats['skill_guaranteed'] += guaranteed
-                        stats['skill_random'] += random_items
-                        stats['skill_possible'] += possible
-                    else:
-                        stats['item_box_found'] += 1
-                        stats['item_guaranteed'] += guaranteed
-                        stats['item_random'] += random_items
-                        stats['item_possible'] += possible
-                    
-                except Exception as e:
-                    self.log(f"⚠️ Error reading {json_file.name}: {e}")
-                    continue
+            stats = StatsAggregator(self.config, self.site_type).seed()
             
             # Atualizar ScrapingStats
             self.stats.item_box_found = stats['item_box_found']
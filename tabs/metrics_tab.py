@@ -0,0 +1,219 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                           QGroupBox, QTableWidget, QTableWidgetItem, QHeaderView, QSplitter)
+from PyQt6.QtCore import Qt, QTimer
+
+import time
+
+from core.metrics import REGISTRY, quantile, start_http_server
+
+# Endpoint local (/metrics no formato Prometheus, /metrics.json)
+METRICS_PORT = 9464
+REFRESH_MS = 1000
+
+# Histogramas mostrados na tabela de latência: nome -> título
+LATENCY_METRICS = {
+    'l2scraper_slot_wait_seconds': "Slot wait",
+    'l2scraper_parse_seconds': "Parse",
+    'l2scraper_disk_write_seconds': "Disk write",
+}
+
+
+def _samples(snapshot, name):
+    return snapshot['metrics'].get(name, {}).get('samples', [])
+
+
+def _labels_text(labels):
+    return ", ".join(f"{key}={value}" for key, value in labels.items())
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.1f} ms"
+
+
+class MetricsTab(QWidget):
+    """
+    Painel do registry de métricas (core/metrics.py): requests por endpoint, latências
+    (slot do RateLimiter, parse por aba, disco) e filas do pipeline. Atualiza uma vez
+    por segundo, só enquanto a aba está visível.
+    """
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+        self.previous = None
+        self.setup_ui()
+
+        self.endpoint = self.start_endpoint()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(REFRESH_MS)
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        # ===== RESUMO + AÇÕES =====
+        header = QHBoxLayout()
+        self.summary_label = QLabel("Sem dados ainda")
+        self.summary_label.setStyleSheet("font-weight: bold;")
+        header.addWidget(self.summary_label, 1)
+
+        self.endpoint_label = QLabel()
+        self.endpoint_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        header.addWidget(self.endpoint_label)
+
+        snapshot_btn = QPushButton("💾 Snapshot JSON")
+        snapshot_btn.clicked.connect(self.save_snapshot)
+        header.addWidget(snapshot_btn)
+
+        reset_btn = QPushButton("🗑️ Reset")
+        reset_btn.clicked.connect(self.reset_metrics)
+        header.addWidget(reset_btn)
+        layout.addLayout(header)
+
+        # ===== TABELAS =====
+        splitter = QSplitter(Qt.Orientation.Vertical)
+
+        self.endpoints_table = self.make_table(
+            splitter, "🌐 Requests por endpoint",
+            ["Endpoint", "Requests", "Errors", "Cache", "MB", "Avg", "p50", "p95"])
+        self.latency_table = self.make_table(
+            splitter, "⏱️ Latências",
+            ["Metric", "Labels", "Count", "Total", "Avg", "p50", "p95"])
+        self.counters_table = self.make_table(
+            splitter, "📊 Filas, retries e itens",
+            ["Metric", "Labels", "Value"])
+
+        layout.addWidget(splitter, 1)
+
+    def make_table(self, parent, title, columns):
+        group = QGroupBox(title)
+        group_layout = QVBoxLayout(group)
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        group_layout.addWidget(table)
+        parent.addWidget(group)
+        return table
+
+    def start_endpoint(self):
+        try:
+            server = start_http_server(METRICS_PORT)
+        except OSError as e:
+            self.endpoint_label.setText(f"⚠️ Endpoint off ({e.strerror})")
+            return None
+        host, port = server.server_address[:2]
+        self.endpoint_label.setText(f"http://{host}:{port}/metrics")
+        return server
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+    def refresh(self):
+        if not self.isVisible():
+            return
+        snapshot = REGISTRY.snapshot()
+        self.update_summary(snapshot)
+        self.fill_endpoints(snapshot)
+        self.fill_latencies(snapshot)
+        self.fill_counters(snapshot)
+
+    def update_summary(self, snapshot):
+        requests = sum(s['value'] for s in _samples(snapshot, 'l2scraper_http_requests_total'))
+        downloaded = sum(s['value'] for s in _samples(snapshot, 'l2scraper_http_response_bytes_total'))
+        retries = sum(s['value'] for s in _samples(snapshot, 'l2scraper_retries_total'))
+        items = sum(s['value'] for s in _samples(snapshot, 'l2scraper_items_total'))
+
+        # Taxa desde o último refresh (throughput "agora", não a média da sessão)
+        rate = 0.0
+        now = snapshot['timestamp']
+        if self.previous is not None:
+            elapsed = now - self.previous[0]
+            if elapsed > 0:
+                rate = max(0, requests - self.previous[1]) / elapsed
+        self.previous = (now, requests)
+
+        uptime = int(now - snapshot['started_at'])
+        self.summary_label.setText(
+            f"⏳ {uptime // 60}m{uptime % 60:02d}s | Requests: {requests:.0f} ({rate:.1f}/s) | "
+            f"Downloaded: {downloaded / 1024 / 1024:.1f} MB | Retries: {retries:.0f} | Items: {items:.0f}"
+        )
+
+    def fill_endpoints(self, snapshot):
+        endpoints = {}
+        for sample in _samples(snapshot, 'l2scraper_http_requests_total'):
+            entry = endpoints.setdefault(sample['labels']['endpoint'], {'requests': 0, 'errors': 0, 'cache': 0})
+            status = sample['labels']['status']
+            entry['requests'] += sample['value']
+            if status == 'cache':
+                entry['cache'] += sample['value']
+            elif not status.isdigit() or int(status) >= 400:
+                entry['errors'] += sample['value']
+        sizes = {s['labels']['endpoint']: s['value'] for s in _samples(snapshot, 'l2scraper_http_response_bytes_total')}
+        latencies = {s['labels']['endpoint']: s for s in _samples(snapshot, 'l2scraper_http_request_seconds')}
+
+        rows = []
+        for endpoint, entry in sorted(endpoints.items(), key=lambda kv: -kv[1]['requests']):
+            latency = latencies.get(endpoint)
+            count = latency['count'] if latency else 0
+            rows.append([
+                endpoint, f"{entry['requests']:.0f}", f"{entry['errors']:.0f}", f"{entry['cache']:.0f}",
+                f"{sizes.get(endpoint, 0) / 1024 / 1024:.2f}",
+                _ms(latency['sum'] / count) if count else "-",
+                _ms(quantile(latency['buckets'], 0.5)) if count else "-",
+                _ms(quantile(latency['buckets'], 0.95)) if count else "-",
+            ])
+        self.set_rows(self.endpoints_table, rows)
+
+    def fill_latencies(self, snapshot):
+        rows = []
+        for name, title in LATENCY_METRICS.items():
+            for sample in sorted(_samples(snapshot, name), key=lambda s: -s['sum']):
+                count = sample['count']
+                rows.append([
+                    title, _labels_text(sample['labels']), str(count), f"{sample['sum']:.2f} s",
+                    _ms(sample['sum'] / count) if count else "-",
+                    _ms(quantile(sample['buckets'], 0.5)),
+                    _ms(quantile(sample['buckets'], 0.95)),
+                ])
+        self.set_rows(self.latency_table, rows)
+
+    def fill_counters(self, snapshot):
+        rows = []
+        for name in ('l2scraper_queue_depth', 'l2scraper_retries_total', 'l2scraper_items_total'):
+            short_name = name.replace('l2scraper_', '')
+            for sample in sorted(_samples(snapshot, name), key=lambda s: _labels_text(s['labels'])):
+                rows.append([short_name, _labels_text(sample['labels']), f"{sample['value']:.0f}"])
+        for sample in _samples(snapshot, 'l2scraper_disk_write_batch_size'):
+            if sample['count']:
+                rows.append(["disk_write_batch_size (avg)", "", f"{sample['sum'] / sample['count']:.1f}"])
+        self.set_rows(self.counters_table, rows)
+
+    def set_rows(self, table, rows):
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column, value in enumerate(row):
+                item = table.item(row_index, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if column > 0:
+                        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                    table.setItem(row_index, column, item)
+                item.setText(value)
+        table.setUpdatesEnabled(True)
+
+    # ------------------------------------------------------------------
+    # Ações
+    # ------------------------------------------------------------------
+    def save_snapshot(self):
+        path = self.config.root_path / "databases" / ".metrics" / f"metrics-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        REGISTRY.write_snapshot(path)
+        self.summary_label.setText(f"💾 Snapshot salvo em {path}")
+
+    def reset_metrics(self):
+        REGISTRY.reset()
+        self.previous = None
+        self.refresh()
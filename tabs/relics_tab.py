@@ -6,10 +6,10 @@ from PyQt6.QtCore import pyqtSignal, Qt, QThread
 from PyQt6.QtGui import QTextCursor, QFont, QSyntaxHighlighter, QTextCharFormat, QColor
 import re
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 from pathlib import Path
 from collections import defaultdict
 from difflib import SequenceMatcher
+from core.tools.relic_updater import RelicUpdateRunner
 
 
 # ============================================================================
@@ -48,924 +48,7 @@ class XMLHighlighter(QSyntaxHighlighter):
 
 
 # ============================================================================
-# RELIC XML UPDATER CORE
-# ============================================================================
-class RelicXMLUpdater:
-    
-    GRADE_MAP = {
-        1: 'COMMON', 2: 'ENHANCED', 3: 'SUPERIOR', 4: 'RARE',
-        5: 'HEROIC', 6: 'LEGENDARY', 7: 'MYTHIC'
-    }
-    
-    PATTERNS = {
-        'COMMON': {
-            1: {'summonChance': '660000000', 'compound': '0.65000', 'upgrade': '1.08333'},
-            2: {'summonChance': '420000000', 'compound': '0.75000', 'upgrade': '1.25000'},
-            3: {'summonChance': '70000000', 'compound': '0.95000', 'upgrade': '1.58333'},
-            4: {'summonChance': '30000000', 'compound': '1.50000', 'upgrade': '2.50000'}
-        },
-        'ENHANCED': {
-            1: {'summonChance': '396000000', 'compound': '0.35000', 'upgrade': '0.58333'},
-            2: {'summonChance': '252000000', 'compound': '0.40000', 'upgrade': '0.66667'},
-            3: {'summonChance': '43200000', 'compound': '0.45000', 'upgrade': '0.75000'},
-            4: {'summonChance': '11250000', 'compound': '0.50000', 'upgrade': '0.83333'},
-            5: {'summonChance': '3600000', 'compound': '0.55000', 'upgrade': '0.91667'}
-        },
-        'SUPERIOR': {
-            1: {'summonChance': '33250000', 'compound': '0.07500', 'upgrade': '0.12500'},
-            2: {'summonChance': '20125000', 'compound': '0.08000', 'upgrade': '0.13333'},
-            3: {'summonChance': '3587500', 'compound': '0.08500', 'upgrade': '0.14167'},
-            4: {'summonChance': '350000', 'compound': '0.09000', 'upgrade': '0.15000'}
-        },
-        'RARE': {
-            1: {'summonChance': '5273400', 'compound': '0.00950', 'upgrade': '0.01583'},
-            2: {'summonChance': '2726000', 'compound': '0.01000', 'upgrade': '0.01667'},
-            3: {'summonChance': '517000', 'compound': '0.01500', 'upgrade': '0.02500'},
-            4: {'summonChance': '47000', 'compound': '0.02000', 'upgrade': '0.03333'}
-        },
-        'HEROIC': {
-            1: {'summonChance': '330000', 'compound': '0.00035', 'upgrade': '0.00058'},
-            2: {'summonChance': '118500', 'compound': '0.00040', 'upgrade': '0.00067'},
-            3: {'summonChance': '24000', 'compound': '0.00045', 'upgrade': '0.00075'}
-        },
-        'LEGENDARY': {
-            1: {'summonChance': '1', 'compound': '3.30000', 'upgrade': '5.50000'}
-        },
-        'MYTHIC': {
-            1: {'summonChance': '1', 'compound': '3.30000', 'upgrade': '5.50000'}
-        }
-    }
-    
-    def __init__(self):
-        self.relics = []  # De DATs
-        self.collections = []  # De DATs
-        self.items_lookup = {}  # De items-essence.dat
-        self.existing_relics = {}  # Do XML existente {id: element}
-        self.existing_collections = {}  # Do XML existente {id: element}
-        self.existing_coupons = {}  # Do XML existente {itemId: element}
-    
-    @staticmethod
-    def infer_tier(relic_id):
-        if relic_id <= 10:
-            return 1
-        elif relic_id <= 30:
-            return 2
-        elif relic_id <= 90:
-            return 3
-        elif relic_id <= 120:
-            return 4
-        return 2
-    
-    def load_existing_xmls(self, relic_xml_path, collection_xml_path, coupon_xml_path):
-        """Carrega XMLs existentes para edição incremental"""
-        try:
-            # Carregar RelicData.xml existente
-            tree = ET.parse(relic_xml_path)
-            root = tree.getroot()
-            
-            # Mapear relics existentes
-            self.existing_relics = {}
-            for relic_elem in root.findall('relic'):
-                relic_id = int(relic_elem.get('id'))
-                self.existing_relics[relic_id] = relic_elem
-            
-            # Carregar RelicCollectionData.xml
-            tree = ET.parse(collection_xml_path)
-            root = tree.getroot()
-            
-            self.existing_collections = {}
-            for col_elem in root.findall('relicCollection'):
-                col_id = int(col_elem.get('id'))
-                self.existing_collections[col_id] = col_elem
-            
-            # Carregar RelicCouponData.xml
-            tree = ET.parse(coupon_xml_path)
-            root = tree.getroot()
-            
-            self.existing_coupons = {}
-            self.existing_simple_coupons = {}  # Apenas cupons simples
-            self.existing_complex_coupons = []  # Cupons complexos
-            
-            for coupon_elem in root.findall('coupon'):
-                item_id = coupon_elem.get('itemId')
-                relic_id = coupon_elem.get('relicId')
-                
-                # Verificar se é cupom SIMPLES (tem relicId e NÃO tem elementos filhos)
-                if relic_id and len(coupon_elem) == 0:
-                    # Cupom simples: relicId + itemId, sem elementos filhos
-                    self.existing_simple_coupons[relic_id] = {
-                        'item_id': item_id,
-                        'element': coupon_elem
-                    }
-                else:
-                    # Cupom complexo (tem chanceGroups, disabledDolls, etc)
-                    self.existing_complex_coupons.append(coupon_elem)
-                
-                if item_id:
-                    self.existing_coupons[item_id] = coupon_elem
-            
-            print(f"DEBUG: {len(self.existing_simple_coupons)} cupons simples")
-            print(f"DEBUG: {len(self.existing_complex_coupons)} cupons complexos")
-            
-            return True
-            
-        except Exception as e:
-            print(f"Erro ao carregar XMLs existentes: {e}")
-            return False
-    
-    def parse_relics_main(self, filepath):
-        """Parse relic_main.dat - CORRIGIDO PARA MYTHIC"""
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        self.relics = []
-        
-        # CADA LINHA É UMA RELIC COMPLETA
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line or 'relics_main_begin' not in line:
-                continue
-            
-            current_relic = {}
-            
-            # ID da relic
-            match = re.search(r'relics_id=(\d+)', line)
-            if match:
-                current_relic['id'] = int(match.group(1))
-            
-            # ID do item (Doll)
-            match = re.search(r'item_id=(\d+)', line)
-            if match:
-                current_relic['item_id'] = int(match.group(1))
-            
-            # Grade
-            match = re.search(r'grade=(\d+)', line)
-            if match:
-                grade_num = int(match.group(1))
-                current_relic['grade'] = self.GRADE_MAP.get(grade_num, 'COMMON')
-            
-            # Skills - CORREÇÃO AQUI PARA MYTHIC
-            # Formato Mythic: {{50579;6;72};{50579;7;72};{50579;8;72};{50579;9;72}}
-            # Formato normal: {{50578;1;1}}
-            match = re.search(r'skill_id=\{\{([^}]+(?:\};[^}]+)*)\}\}', line)
-            if match:
-                skills_text = match.group(1)
-                current_relic['skills'] = []
-                
-                # Split por };{ para pegar múltiplos skills
-                skill_parts = skills_text.split('};{')
-                
-                for skill_part in skill_parts:
-                    # Limpar chaves
-                    skill_part = skill_part.replace('{', '').replace('}', '')
-                    parts = skill_part.split(';')
-                    if len(parts) >= 3:
-                        current_relic['skills'].append({
-                            'id': int(parts[0]),
-                            'level': int(parts[1]),
-                            'combatPower': int(parts[2])
-                        })
-            
-            # Level
-            match = re.search(r'level=(\d+)', line)
-            if match:
-                current_relic['level'] = int(match.group(1))
-            
-            # Adicionar se tiver dados mínimos
-            if 'id' in current_relic and 'skills' in current_relic:
-                self.relics.append(current_relic)
-                
-                # DEBUG
-                if current_relic.get('grade') == 'MYTHIC':
-                    print(f"DEBUG MYTHIC: ID={current_relic['id']}, Skills={len(current_relic['skills'])}")
-        
-        print(f"✅ Parseadas {len(self.relics)} relics")
-        
-        # Contar Mythics
-        mythic_count = sum(1 for r in self.relics if r.get('grade') == 'MYTHIC')
-        print(f"📊 Mythic relics: {mythic_count}")
-        
-        return self.relics
-    
-    def parse_collection(self, filepath):
-        """Parse relic_collection.dat - CORRIGIDO"""
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        self.collections = []
-        
-        # CADA LINHA É UMA COLLECTION COMPLETA
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line or 'relics_collection_begin' not in line:
-                continue
-            
-            current_collection = {}
-            
-            # ID da collection
-            match = re.search(r'relics_collection_id=(\d+)', line)
-            if match:
-                current_collection['id'] = int(match.group(1))
-            
-            # Categoria
-            match = re.search(r'category=(\d+)', line)
-            if match:
-                current_collection['category'] = int(match.group(1))
-            
-            # Nome da collection
-            match = re.search(r'relics_collection_name=\[([^\]]+)\]', line)
-            if match:
-                current_collection['name'] = match.group(1)
-            
-            # Option ID
-            match = re.search(r'option_id=(\d+)', line)
-            if match:
-                current_collection['optionId'] = int(match.group(1))
-            
-            # Relics necessárias - formato: {{1;0};{3;0};{5;0}}
-            match = re.search(r'need_relics=\{\{([^}]+(?:\};[^}]+)*)\}\}', line)
-            if match:
-                relics_text = match.group(1)
-                current_collection['relics'] = []
-                
-                # Split por };{ para pegar múltiplos pares
-                relic_parts = relics_text.split('};{')
-                
-                for relic_part in relic_parts:
-                    # Limpar chaves
-                    relic_part = relic_part.replace('{', '').replace('}', '')
-                    parts = relic_part.split(';')
-                    if len(parts) >= 2:
-                        current_collection['relics'].append({
-                            'id': int(parts[0]),
-                            'enchantLevel': int(parts[1])
-                        })
-            
-            # Adicionar se tiver dados mínimos
-            if 'id' in current_collection and 'relics' in current_collection:
-                self.collections.append(current_collection)
-        
-        print(f"✅ Parseadas {len(self.collections)} collections")
-        return self.collections
-    
-    def get_relic_name_for_comment(self, relic_id):
-        """Obtém o nome da Doll para usar nos comentários"""
-        # Primeiro, procurar nos relics já parseados
-        for relic in self.relics:
-            if relic['id'] == relic_id:
-                item_id = relic.get('item_id')
-                if item_id:
-                    full_name = self.items_lookup.get(item_id, "")
-                    if full_name:
-                        # Extrair nome limpo
-                        doll_name = self.extract_doll_name(full_name)
-                        
-                        # Adicionar grade
-                        grade = relic.get('grade', 'COMMON')
-                        grade_display = "Mythic" if grade == "MYTHIC" else grade.capitalize()
-                        
-                        return f"{grade_display} {doll_name} Doll"
-        
-        return f"Relic {relic_id}"
-    
-    def parse_items_essence(self, filepath):
-        """Parse items-essence.dat - CORRIGIDO PARA FORMATO TABULAR"""
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        self.items_lookup = {}
-        
-        # CADA LINHA É UM ITEM COMPLETO
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line or 'item_name_begin' not in line:
-                continue
-            
-            # Extrair id e name da mesma linha
-            id_match = re.search(r'id=(\d+)', line)
-            name_match = re.search(r'name=\[([^\]]+)\]', line)
-            
-            if id_match and name_match:
-                item_id = int(id_match.group(1))
-                item_name = name_match.group(1)
-                self.items_lookup[item_id] = item_name
-        
-        return self.items_lookup
-    
-    def parse_etcitemgrp(self, filepath):
-        """Parse etcitemgrp.dat para obter material_type dos itens"""
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        self.item_materials = {}  # item_id -> material_type
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line or 'item_begin' not in line:
-                continue
-            
-            current_item = {}
-            
-            # Object ID (item ID)
-            match = re.search(r'object_id=(\d+)', line)
-            if match:
-                item_id = int(match.group(1))
-            
-            # Material Type
-            match = re.search(r'material_type=(\w+)', line)
-            if match:
-                material = match.group(1)
-                self.item_materials[item_id] = material
-        
-        print(f"✅ Parseados {len(self.item_materials)} materiais de itens")
-        
-        # DEBUG: Verificar alguns coupons
-        coupon_count = 0
-        liquid_coupons = 0
-        
-        for item_id in self.item_materials:
-            item_name = self.items_lookup.get(item_id, "")
-            if 'coupon' in item_name.lower() and 'doll' in item_name.lower():
-                coupon_count += 1
-                if self.item_materials[item_id] == 'liquid':
-                    liquid_coupons += 1
-        
-        print(f"DEBUG: {coupon_count} coupons Doll encontrados")
-        print(f"DEBUG: {liquid_coupons} com material_type='liquid'")
-        
-        return self.item_materials
-    
-    def extract_doll_name(self, full_name):
-        """Extrai nome da doll removendo sufixos - VERSÃO MELHORADA"""
-        if not full_name:
-            return ""
-        
-        name = full_name.strip()
-        
-        # Remove " Doll" no final (case insensitive)
-        name = re.sub(r'\s+Doll\s*$', '', name, flags=re.IGNORECASE)
-        
-        # Remove conteúdo entre parênteses
-        name = re.sub(r'\s*\([^)]*\)', '', name)
-        
-        # Remove prefixos de grade
-        name = re.sub(r'^(Common|Enhanced|Superior|Rare|Heroic|Legendary|Mythic)\s+', 
-                    '', name, flags=re.IGNORECASE)
-        
-        # Remove números no final (ex: "Anais 1" -> "Anais")
-        name = re.sub(r'\s+\d+$', '', name)
-        
-        return name.strip()
-    
-    def get_base_relic_id(self, relic_id):
-        """Encontra o ID base da família (menor ID com mesmo primeiro skill)"""
-        # Encontrar a relic atual
-        current_relic = next((r for r in self.relics if r['id'] == relic_id), None)
-        if not current_relic or not current_relic.get('skills'):
-            return relic_id
-        
-        # Pegar o primeiro skill ID
-        first_skill_id = current_relic['skills'][0]['id']
-        
-        # Encontrar todas as relics com mesmo primeiro skill
-        same_family = []
-        for relic in self.relics:
-            if relic.get('skills') and relic['skills'][0]['id'] == first_skill_id:
-                same_family.append(relic)
-        
-        # Retornar o menor ID da família
-        if same_family:
-            return min(relic['id'] for relic in same_family)
-        
-        return relic_id
-    
-    def update_relic_data_xml(self, output_path):
-        # Tenta método simples primeiro
-        result = self.update_relic_data_xml_simple(output_path)
-        if "Erro" in result:
-            # Se falhar, usa fallback
-            return self.update_relic_data_xml_fallback(output_path)
-        return result
-
-    def update_collection_xml(self, output_path):
-        # Tenta método simples primeiro
-        result = self.update_collection_xml_simple(output_path)
-        if "Erro" in result:
-            # Se falhar, usa fallback
-            return self.update_collection_xml_fallback(output_path)
-        return result
-        
-    def update_relic_data_xml_fallback(self, output_path):
-        """
-        FALLBACK: recria XML completo (só usar se o método simples falhar)
-        """
-        try:
-            # Carregar XML existente para preservar estrutura
-            tree = ET.parse(output_path)
-            root = tree.getroot()
-            
-            # Mapear relics existentes
-            existing_relics = {}
-            for relic_elem in root.findall('relic'):
-                relic_id = int(relic_elem.get('id'))
-                existing_relics[relic_id] = relic_elem
-            
-            # Adicionar novas relics
-            added_count = 0
-            for relic_data in sorted(self.relics, key=lambda x: x['id']):
-                relic_id = relic_data['id']
-                
-                if relic_id not in existing_relics:
-                    # Criar nova relic
-                    relic = ET.SubElement(root, 'relic')
-                    relic.set('id', str(relic_id))
-                    relic.set('grade', relic_data['grade'])
-                    
-                    tier = self.infer_tier(relic_id)
-                    pattern = self.PATTERNS.get(relic_data['grade'], {}).get(tier) or \
-                            self.PATTERNS[relic_data['grade']][1]
-                    
-                    relic.set('summonChance', pattern['summonChance'])
-                    relic.set('baseRelicId', str(self.get_base_relic_id(relic_id)))
-                    relic.set('compoundChanceModifier', pattern['compound'])
-                    relic.set('compoundUpGradeChanceModifier', pattern['upgrade'])
-                    
-                    for skill in relic_data.get('skills', []):
-                        stat = ET.SubElement(relic, 'relicStat')
-                        stat.set('enchantLevel', '0')
-                        stat.set('skillId', str(skill['id']))
-                        stat.set('skillLevel', str(skill['level']))
-                        stat.set('combatPower', str(skill['combatPower']))
-                    
-                    added_count += 1
-            
-            # Salvar com pretty print
-            xml_str = minidom.parseString(ET.tostring(root)).toprettyxml(indent='\t')
-            
-            # Preservar header original (<?xml version="1.0" encoding="UTF-8"?>)
-            lines = xml_str.split('\n')
-            if len(lines) > 1 and '<?xml' in lines[0]:
-                # Já tem header, manter
-                final_xml = xml_str
-            else:
-                # Adicionar header
-                final_xml = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_str
-            
-            Path(output_path).write_text(final_xml, encoding='utf-8')
-            
-            return f"Fallback: adicionadas {added_count} novas relics (XML recriado)"
-            
-        except Exception as e:
-            return f"Erro no fallback: {str(e)}"
-
-
-    def update_collection_xml_fallback(self, output_path):
-        """
-        FALLBACK: recria XML completo (só usar se o método simples falhar)
-        """
-        try:
-            # Carregar XML existente
-            tree = ET.parse(output_path)
-            root = tree.getroot()
-            
-            # Mapear collections existentes
-            existing_collections = {}
-            for col_elem in root.findall('relicCollection'):
-                col_id = int(col_elem.get('id'))
-                existing_collections[col_id] = col_elem
-            
-            # Adicionar novas collections
-            added_count = 0
-            for col_data in sorted(self.collections, key=lambda x: x['id']):
-                col_id = col_data['id']
-                
-                if col_id not in existing_collections:
-                    # Criar nova collection
-                    collection = ET.SubElement(root, 'relicCollection')
-                    collection.set('id', str(col_id))
-                    collection.set('optionId', str(col_data['optionId']))
-                    collection.set('category', str(col_data['category']))
-                    collection.set('completeCount', str(len(col_data['relics'])))
-                    collection.set('combatPower', '0')
-                    
-                    for relic_ref in col_data['relics']:
-                        relic = ET.SubElement(collection, 'relic')
-                        relic.set('id', str(relic_ref['id']))
-                        relic.set('enchantLevel', str(relic_ref['enchantLevel']))
-                    
-                    added_count += 1
-            
-            # Salvar
-            xml_str = minidom.parseString(ET.tostring(root)).toprettyxml(indent='\t')
-            
-            lines = xml_str.split('\n')
-            if len(lines) > 1 and '<?xml' in lines[0]:
-                final_xml = xml_str
-            else:
-                final_xml = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_str
-            
-            Path(output_path).write_text(final_xml, encoding='utf-8')
-            
-            return f"Fallback: adicionadas {added_count} novas collections (XML recriado)"
-            
-        except Exception as e:
-            return f"Erro no fallback: {str(e)}"
-        
-    def update_relic_data_xml_simple(self, output_path):
-        """
-        Atualização SIMPLES: só adiciona novas relics, nunca modifica existentes
-        """
-        try:
-            # 1. Ler XML existente linha por linha
-            with open(output_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # 2. Encontrar quais relics já existem no XML
-            existing_relic_ids = set()
-            for line in lines:
-                if '<relic id="' in line:
-                    match = re.search(r'id="(\d+)"', line)
-                    if match:
-                        existing_relic_ids.add(int(match.group(1)))
-            
-            # 3. Encontrar novas relics (que estão nos DATs mas não no XML)
-            new_relics = []
-            for relic in self.relics:
-                if relic['id'] not in existing_relic_ids:
-                    new_relics.append(relic)
-            
-            if not new_relics:
-                return "Nenhuma nova relic para adicionar"
-            
-            # 4. Encontrar onde inserir (antes do </list>)
-            insert_position = -1
-            for i, line in enumerate(lines):
-                if line.strip() == '</list>':
-                    insert_position = i
-                    break
-            
-            if insert_position == -1:
-                return "Erro: não encontrou </list> no XML"
-            
-            # 5. Preparar novas relics para inserção
-            new_lines = []
-            for relic in sorted(new_relics, key=lambda x: x['id']):
-                tier = self.infer_tier(relic['id'])
-                pattern = self.PATTERNS.get(relic['grade'], {}).get(tier) or \
-                        self.PATTERNS[relic['grade']][1]
-                
-                base_id = self.get_base_relic_id(relic['id'])
-                
-                # Obter nome da Doll para comentário
-                doll_name = ""
-                if relic.get('item_id'):
-                    doll_name = self.items_lookup.get(relic['item_id'], "")
-                    if doll_name:
-                        doll_name = self.extract_doll_name(doll_name)
-                
-                # Formatar EXATAMENTE como no XML original
-                indent = '\t'
-                
-                # Adicionar linha em branco antes (exceto primeira)
-                if new_lines:
-                    new_lines.append('\n')
-                
-                # Linha do relic com comentário
-                grade_name = relic['grade']  # Já é "MYTHIC"
-                grade_display_name = "Mythic" if grade_name == "MYTHIC" else grade_name.capitalize()
-                
-                if doll_name:
-                    new_lines.append(f'{indent}<relic id="{relic["id"]}" grade="{grade_name}" summonChance="{pattern["summonChance"]}" baseRelicId="{base_id}" compoundChanceModifier="{pattern["compound"]}" compoundUpGradeChanceModifier="{pattern["upgrade"]}"> <!-- {grade_display_name} {doll_name} Doll -->\n')
-                else:
-                    new_lines.append(f'{indent}<relic id="{relic["id"]}" grade="{grade_name}" summonChance="{pattern["summonChance"]}" baseRelicId="{base_id}" compoundChanceModifier="{pattern["compound"]}" compoundUpGradeChanceModifier="{pattern["upgrade"]}">\n')
-                
-                # **CORREÇÃO: Para MYTHIC, usar os 4 skills do array**
-                skills = relic.get('skills', [])
-                
-                if relic['grade'] == 'MYTHIC':
-                    # Mythic: usar os 4 skills que já vêm no array
-                    # Os 4 skills já têm os níveis corretos: 6, 7, 8, 9
-                    # E correspondem a enchantLevel 0, 1, 2, 3
-                    for i, skill in enumerate(skills[:4]):  # Pega apenas os 4 primeiros
-                        if i == 0:
-                            comment = f'{doll_name} Doll Lv. {skill["level"]}'
-                        else:
-                            comment = f'+{i} {doll_name} Doll'
-                        
-                        new_lines.append(f'{indent}\t<relicStat enchantLevel="{i}" skillId="{skill["id"]}" skillLevel="{skill["level"]}" combatPower="{skill["combatPower"]}" /> <!-- {comment} -->\n')
-                else:
-                    # Grades normais: apenas um skill
-                    if skills:
-                        skill = skills[0]  # Primeiro e único skill
-                        comment = f'{doll_name} Doll Lv. {skill["level"]}' if doll_name else f'Level {skill["level"]}'
-                        new_lines.append(f'{indent}\t<relicStat enchantLevel="0" skillId="{skill["id"]}" skillLevel="{skill["level"]}" combatPower="{skill["combatPower"]}" /> <!-- {comment} -->\n')
-                
-                new_lines.append(f'{indent}</relic>\n')
-            
-            # 6. Inserir no local correto
-            lines[insert_position:insert_position] = new_lines
-            
-            # 7. Salvar
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
-            
-            return f"Adicionadas {len(new_relics)} novas relics ao XML"
-            
-        except Exception as e:
-            return f"Erro: {str(e)}"
-
-    def update_collection_xml_simple(self, output_path):
-        """
-        Atualização SIMPLES: só adiciona novas collections, nunca modifica existentes
-        """
-        try:
-            # 1. Ler XML existente linha por linha
-            with open(output_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # 2. Encontrar quais collections já existem no XML
-            existing_collection_ids = set()
-            for line in lines:
-                if '<relicCollection id="' in line:
-                    match = re.search(r'id="(\d+)"', line)
-                    if match:
-                        existing_collection_ids.add(int(match.group(1)))
-            
-            # 3. Encontrar novas collections (que estão nos DATs mas não no XML)
-            new_collections = []
-            for collection in self.collections:
-                if collection['id'] not in existing_collection_ids:
-                    new_collections.append(collection)
-            
-            if not new_collections:
-                return "Nenhuma nova collection para adicionar"
-            
-            # 4. Encontrar onde inserir (antes do </list>)
-            insert_position = -1
-            for i, line in enumerate(lines):
-                if line.strip() == '</list>':
-                    insert_position = i
-                    break
-            
-            if insert_position == -1:
-                return "Erro: não encontrou </list> no XML"
-            
-            # 5. Preparar novas collections para inserção
-            new_lines = []
-            for collection in sorted(new_collections, key=lambda x: x['id']):
-                indent = '\t'
-                
-
-                
-                # Linha da collection com comentário
-                collection_name = collection.get('name', '')
-                if collection_name:
-                    new_lines.append(f'{indent}<relicCollection id="{collection["id"]}" optionId="{collection["optionId"]}" category="{collection["category"]}" completeCount="{len(collection["relics"])}" combatPower="0"> <!-- {collection_name} -->\n')
-                else:
-                    new_lines.append(f'{indent}<relicCollection id="{collection["id"]}" optionId="{collection["optionId"]}" category="{collection["category"]}" completeCount="{len(collection["relics"])}" combatPower="0">\n')
-                
-                # Relics com comentários
-                for relic in collection.get('relics', []):
-                    relic_id = relic['id']
-                    relic_name = self.get_relic_name_for_comment(relic_id)
-                    new_lines.append(f'{indent}\t<relic id="{relic_id}" enchantLevel="{relic["enchantLevel"]}" /> <!-- {relic_name} -->\n')
-                
-                new_lines.append(f'{indent}</relicCollection>\n')
-            
-            # 6. Inserir no local correto
-            lines[insert_position:insert_position] = new_lines
-            
-            # 7. Salvar
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
-            
-            return f"Adicionadas {len(new_collections)} novas collections ao XML"
-            
-        except Exception as e:
-            return f"Erro: {str(e)}"
-
-    def find_coupon_suggestions(self, max_suggestions=50):
-        """Versão SIMPLES e FUNCIONAL"""
-        suggestions = {}
-        
-        # Palavras-chave obrigatórias
-        REQUIRED_KEYWORDS = ['doll', 'summon', 'coupon']
-        
-        # 1. Quais relics já têm cupons
-        relics_with_coupon = set(self.existing_simple_coupons.keys())
-        
-        # 2. Procurar cupons
-        for relic in self.relics:
-            relic_id = str(relic['id'])
-            
-            # Pular se já tem cupom
-            if relic_id in relics_with_coupon:
-                continue
-            
-            item_id = relic.get('item_id')
-            if not item_id:
-                continue
-            
-            item_name = self.items_lookup.get(item_id)
-            if not item_name:
-                continue
-            
-            relic_grade = relic.get('grade', 'COMMON')
-            doll_name = self.extract_doll_name(item_name)
-            
-            # Buscar cupons da MESMA grade
-            same_grade_matches = []
-            
-            for coupon_item_id, coupon_name in self.items_lookup.items():
-                coupon_lower = coupon_name.lower()
-                
-                # Filtros básicos
-                if not all(kw in coupon_lower for kw in REQUIRED_KEYWORDS):
-                    continue
-                
-                if doll_name.lower() not in coupon_lower:
-                    continue
-                
-                if 'package:' in coupon_lower or 'sealed' in coupon_lower:
-                    continue  # Ignorar packages/sealed
-                
-                # VERIFICAÇÃO DE GRADE (case-insensitive)
-                relic_grade_lower = relic_grade.lower()  # "enhanced"
-                if relic_grade_lower not in coupon_lower:
-                    continue  # ❌ Grade diferente
-                
-                # Cupom válido!
-                same_grade_matches.append((coupon_item_id, coupon_name, 1.0))
-            
-            # Se encontrou cupom da mesma grade
-            if same_grade_matches:
-                suggestions[relic_id] = {
-                    'doll_name': doll_name,
-                    'original_name': item_name,
-                    'item_id': item_id,
-                    'grade': relic_grade,
-                    'matches': same_grade_matches[:max_suggestions]  # Limitar
-                }
-        
-        print(f"\n✅ {len(suggestions)} relics com cupons da mesma grade encontrados")
-        
-        # DEBUG: Mostrar quais Enhanced foram encontrados
-        enhanced_found = [(rid, data['doll_name']) for rid, data in suggestions.items() 
-                        if data['grade'] == 'ENHANCED']
-        
-        if enhanced_found:
-            print(f"  Enhanced encontrados: {len(enhanced_found)}")
-            for rid, doll in enhanced_found:
-                print(f"    - Relic {rid}: {doll}")
-        
-        return suggestions
-    
-    def find_coupon_matches(self):
-        """Encontra coupons correspondentes para cada relic"""
-        coupon_matches = {}
-        
-        for relic in self.relics:
-            relic_id = relic['id']
-            item_id = relic.get('item_id')
-            
-            if not item_id:
-                continue
-            
-            # 1. Pegar nome da Doll
-            doll_name = self.items_lookup.get(item_id)
-            if not doll_name:
-                continue
-            
-            # 2. Extrair nome limpo (sem "Doll", etc.)
-            clean_name = self.extract_doll_name(doll_name)
-            
-            # 3. Buscar coupons no items_lookup
-            matches = []
-            for coupon_item_id, coupon_name in self.items_lookup.items():
-                # Filtro: deve conter "summon" e "coupon" no nome
-                coupon_lower = coupon_name.lower()
-                if 'summon' not in coupon_lower or 'coupon' not in coupon_lower:
-                    continue
-                
-                # Verificar se o nome da Doll está no nome do coupon
-                if clean_name.lower() in coupon_lower:
-                    matches.append((coupon_item_id, coupon_name))
-            
-            if matches:
-                coupon_matches[relic_id] = {
-                    'doll_name': clean_name,
-                    'original_name': doll_name,
-                    'item_id': item_id,
-                    'matches': matches  # Lista de (item_id, item_name)
-                }
-        
-        return coupon_matches
-    
-    def generate_coupon_xml(self, output_path, coupon_mapping):
-        """Atualiza RelicCouponData.xml - APENAS cupons SIMPLES"""
-        if not coupon_mapping:
-            return "Nenhum mapeamento para adicionar"
-        
-        try:
-            # 1. Ler o XML como TEXTO
-            with open(output_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # 2. Encontrar onde inserir (ANTES do primeiro cupom complexo OU antes do </list>)
-            insert_position = -1
-            found_simple_section_end = False
-            
-            for i, line in enumerate(lines):
-                # Procurar pelo primeiro cupom complexo (que tem > no final da tag)
-                if '<coupon itemId="' in line and '>' in line and not '/>' in line:
-                    insert_position = i
-                    found_simple_section_end = True
-                    print(f"DEBUG: Encontrado cupom complexo na linha {i}")
-                    break
-            
-            # Se não encontrou cupom complexo, inserir antes do </list>
-            if not found_simple_section_end:
-                for i, line in enumerate(lines):
-                    if line.strip() == '</list>':
-                        insert_position = i
-                        break
-            
-            if insert_position == -1:
-                return "Erro: não encontrou onde inserir"
-            
-            # 3. Coletar quais cupons/relics já existem
-            existing_coupon_items = set()
-            relics_with_coupon = set()
-            
-            for line in lines:
-                if '<coupon itemId=' in line and '/>' in line:  # Apenas cupons simples
-                    # Pegar itemId
-                    match = re.search(r'itemId="(\d+)"', line)
-                    if match:
-                        existing_coupon_items.add(match.group(1))
-                    
-                    # Pegar relicId
-                    relic_match = re.search(r'relicId="(\d+)"', line)
-                    if relic_match:
-                        relics_with_coupon.add(int(relic_match.group(1)))
-            
-            print(f"DEBUG: {len(existing_coupon_items)} cupons simples já existem")
-            print(f"DEBUG: {len(relics_with_coupon)} relics já têm cupons")
-            
-            # 4. Preparar NOVOS cupons para inserção
-            new_lines = []
-            added_count = 0
-            skipped_count = 0
-            
-            for relic_id, coupon_data in sorted(coupon_mapping.items()):
-                coupon_id = str(coupon_data['coupon_id'])
-                relic_id_int = int(relic_id)
-                
-                # Pular se o cupom ITEM já existe
-                if coupon_id in existing_coupon_items:
-                    print(f"DEBUG: Cupom item {coupon_id} já existe, pulando")
-                    skipped_count += 1
-                    continue
-                
-                # Pular se a RELIC já tem cupom
-                if relic_id_int in relics_with_coupon:
-                    print(f"DEBUG: Relic {relic_id} já tem cupom, pulando")
-                    skipped_count += 1
-                    continue
-                
-                # Obter nome do cupom para comentário
-                coupon_name = self.items_lookup.get(int(coupon_id), f"Cupom {coupon_id}")
-                
-                # Formatar
-                indent = '\t'
-                
-                if new_lines:
-                    new_lines.append('\n')
-                
-                new_lines.append(f'{indent}<coupon itemId="{coupon_id}" relicId="{relic_id}" summonCount="1" /> <!-- {coupon_name} -->\n')
-                added_count += 1
-            
-            print(f"DEBUG: {added_count} novos, {skipped_count} pulados")
-            
-            # 5. Inserir no local correto se houver algo novo
-            if new_lines:
-                lines[insert_position:insert_position] = new_lines
-                
-                # 6. Salvar
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.writelines(lines)
-                
-                return f"Adicionados {added_count} novos cupons SIMPLES ao XML ({skipped_count} já existiam)"
-            else:
-                return "Nenhum cupom novo para adicionar (todos já existem)"
-                
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return f"Erro: {str(e)}"
-
-# ============================================================================
-# WORKER THREAD
+# WORKER THREAD (o trabalho fica em core/tools/relic_updater.py, sem Qt)
 # ============================================================================
 class XMLUpdaterWorker(QThread):
     progress = pyqtSignal(int, int, str)
@@ -974,150 +57,11 @@ class XMLUpdaterWorker(QThread):
     
     def __init__(self, databases_dir, xml_files_dir, version = str):
         super().__init__()
-        self.databases_dir = Path(databases_dir)
-        self.xml_files_dir = Path(xml_files_dir)
-        self.version = version  # "Main" ou "Essence"
-
-    def get_file_paths(self):
-        """Retorna os caminhos dos arquivos baseado na versão"""
-
-        if not hasattr(self, 'version'):
-            self.version = "Main"  # Default se não estiver definido
-
-        suffix = "_main" if self.version == "Main" else "_essence"
-        xml_folder = "relics_main" if self.version == "Main" else "relics_essence"
-        
-        return {
-            'relic_main': self.databases_dir / f"relic_main{suffix}.dat",
-            'relic_collection': self.databases_dir / f"relic_collection{suffix}.dat",
-            'items': self.databases_dir / f"items{suffix}.dat",
-            'etcitemgrp': self.databases_dir / f"etcitemgrp{suffix}.dat",
-            'relic_xml': self.xml_files_dir / xml_folder / "RelicData.xml",
-            'collection_xml': self.xml_files_dir / xml_folder / "RelicCollectionData.xml",
-            'coupon_xml': self.xml_files_dir / xml_folder / "RelicCouponData.xml"
-        }
+        self.runner = RelicUpdateRunner(databases_dir, xml_files_dir, version,
+                                        log=self.log.emit, progress=self.progress.emit)
 
     def run(self):
-        try:
-            updater = RelicXMLUpdater()
-            paths = self.get_file_paths()
-            
-            if not hasattr(self, 'version'):
-                self.version = "Main"                
-
-            # VERIFICAÇÃO DE ARQUIVOS
-            missing_files = []
-            for key, path in paths.items():
-                if not path.exists():
-                    missing_files.append(f"{key}: {path.name}")
-            
-            if missing_files:
-                raise FileNotFoundError(
-                    f"Arquivos não encontrados ({self.version}):\n" + 
-                    "\n".join(missing_files)
-                )
-            
-            self.log.emit(f"📁 Processando versão: {self.version}")
-            
-            # 1. Carregar XMLs existentes
-            self.log.emit("📁 Carregando XMLs existentes...")
-            success = updater.load_existing_xmls(
-                str(paths['relic_xml']), 
-                str(paths['collection_xml']), 
-                str(paths['coupon_xml'])
-            )
-            
-            if not success:
-                raise Exception("Falha ao carregar XMLs existentes")
-            
-            self.progress.emit(1, 9, "✓ XMLs carregados")
-            
-            # 2. Parsear DATs
-            self.log.emit("📁 Parseando relic_data.dat...")
-            relics = updater.parse_relics_main(str(paths['relic_main']))
-            self.progress.emit(2, 9, f"✓ {len(relics)} relics carregadas")
-            
-            self.log.emit("📁 Parseando relic_collection.dat...")
-            collections = updater.parse_collection(str(paths['relic_collection']))
-            self.progress.emit(3, 9, f"✓ {len(collections)} collections carregadas")
-            
-            self.log.emit("📁 Parseando items.dat...")
-            items_lookup = updater.parse_items_essence(str(paths['items']))
-            self.progress.emit(4, 9, f"✓ {len(items_lookup)} items carregados")
-            
-            # 3. Parsear etcitemgrp (opcional)
-            if paths['etcitemgrp'].exists():
-                self.log.emit("📁 Parseando etcitemgrp.dat...")
-                materials = updater.parse_etcitemgrp(str(paths['etcitemgrp']))
-                self.progress.emit(5, 9, f"✓ {len(materials)} materiais carregados")
-            else:
-                self.log.emit("⏭️ etcitemgrp.dat não encontrado, usando filtros básicos")
-                self.progress.emit(5, 9, "⏭️ etcitemgrp.dat não encontrado")
-            
-            # 4. Encontrar coupons
-            self.log.emit("🔍 Buscando coupons existentes...")
-            coupon_suggestions = updater.find_coupon_suggestions()
-            self.progress.emit(6, 9, f"✓ {len(coupon_suggestions)} sugestões encontradas")
-            
-            # 5. Atualizar XMLs
-            self.log.emit("⚙️ Atualizando RelicData.xml...")
-            relic_result = updater.update_relic_data_xml(str(paths['relic_xml']))  # CORREÇÃO AQUI
-            self.progress.emit(7, 9, "✓ RelicData.xml atualizado")
-            
-            self.log.emit("⚙️ Atualizando RelicCollectionData.xml...")
-            collection_result = updater.update_collection_xml(str(paths['collection_xml']))  # CORREÇÃO AQUI
-            self.progress.emit(8, 9, "✓ RelicCollectionData.xml atualizado")
-            
-            # 6. Ler conteúdo do coupon XML
-            self.log.emit("⚙️ Preparando RelicCouponData.xml...")
-            coupon_content = Path(paths['coupon_xml']).read_text(encoding='utf-8')  # CORREÇÃO AQUI
-            self.progress.emit(9, 9, "✅ Todos os XMLs processados")
-            
-            self.log.emit("✅ Processo concluído com sucesso!")
-            
-            # Calcular estatísticas
-            existing_relic_count = len(updater.existing_relics)
-            new_relic_count = len(relics)
-            added_relics = new_relic_count - existing_relic_count
-            
-            existing_collection_count = len(updater.existing_collections)
-            new_collection_count = len(collections)
-            added_collections = new_collection_count - existing_collection_count
-            
-            self.finished.emit({
-                'relics': relics,
-                'collections': collections,
-                'items_lookup': items_lookup,
-                'coupon_suggestions': coupon_suggestions,
-                'updater': updater,
-                'paths': {
-                    'relic': str(paths['relic_xml']),
-                    'collection': str(paths['collection_xml']),
-                    'coupon': str(paths['coupon_xml'])
-                },
-                'contents': {
-                    'relic': relic_result,
-                    'collection': collection_result,
-                    'coupon': coupon_content
-                },
-                'statistics': {
-                    'existing_relics': existing_relic_count,
-                    'new_relics': new_relic_count,
-                    'added_relics': added_relics,
-                    'existing_collections': existing_collection_count,
-                    'new_collections': new_collection_count,
-                    'added_collections': added_collections,
-                    'total_items': len(items_lookup),
-                    'coupon_matches': len(coupon_suggestions)
-                },
-                'version': self.version  # Adicionar versão aos resultados
-            })
-            
-        except Exception as e:
-            self.log.emit(f"❌ Erro na versão {getattr(self, 'version', 'N/A')}: {str(e)}")
-            import traceback
-            self.log.emit(traceback.format_exc())
-            self.finished.emit({})
+        self.finished.emit(self.runner.run())
 
 
 # ============================================================================
@@ -1,14 +1,16 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTextEdit, QHBoxLayout, QLineEdit, QLabel, QProgressBar, QComboBox
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
-from bs4 import BeautifulSoup
+from core.html_extract import make_soup
+from core.metrics import ITEMS, PARSE_SECONDS
 import asyncio
 import re
 from pathlib import Path
 import json
+from core.wiki_session import BASE_URL, WikiSession
 
 
 class EnchantScraperWorker(QThread):
-    """Worker thread para buscar dados de enchantment usando o motor existente"""
+    """Worker thread para buscar dados de enchantment pela WikiSession compartilhada"""
     log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(dict)
     
@@ -20,28 +22,18 @@ class EnchantScraperWorker(QThread):
         self.skill_class_slug = skill_class_slug
         self.scraper_handler = scraper_handler
         self.site_type = site_type
-        
-        class DummyConfig:
-            def update_stats_from_files(self, site_type):
-                return {}
-            def get_site_stats(self, site_type):
-                return {'total_in_dat': 0, 'extractable_count': 0}
-        
-        dummy_config = DummyConfig()
-        self.scraper = scraper_handler(site_type, dummy_config, initial_stats={}, full_scan=False, max_workers=1)
-        self.base_url = self.scraper.base_url
+        self.base_url = BASE_URL
         
     def run(self):
         try:
-            asyncio.run(self.fetch_enchantment_data())
+            # Loop/client compartilhados: consultas curtas reaproveitam as conexões abertas
+            WikiSession.run(self.fetch_enchantment_data())
         except Exception as e:
             self.log_signal.emit(f"❌ Erro crítico: {e}")
             self.finished_signal.emit({})
-        finally:
-            asyncio.run(self.scraper.client.aclose())
     
     async def fetch_enchantment_data(self):
-        """Busca os dados de enchantment da skill usando o client HTTP existente"""
+        """Busca os dados de enchantment da skill usando a WikiSession compartilhada"""
         
         # Monta a URL do enchantment usando o slug da classe
         url = f"{self.base_url}/{self.site_type}/tabs/skills/enchantment/?id={self.skill_id}_{self.skill_level}_{self.skill_sublevel}&class={self.skill_class_slug}"
@@ -49,21 +41,27 @@ class EnchantScraperWorker(QThread):
         self.log_signal.emit(f"🔍 Buscando: {url}")
         
         try:
-            async with self.scraper.semaphore:
-                response = await self.scraper.client.get(url)
+            async with WikiSession.acquire() as session:
+                response = await session.get(url, retries=2)
             
             if response.status_code != 200:
+                ITEMS.inc(site='enchant', outcome=f'http_{response.status_code}')
                 self.log_signal.emit(f"❌ HTTP {response.status_code}")
                 self.finished_signal.emit({})
                 return
             
             if len(response.text) < 500:
+                ITEMS.inc(site='enchant', outcome='empty')
                 self.log_signal.emit(f"⚠️ Resposta muito curta ({len(response.text)} bytes)")
                 self.finished_signal.emit({})
                 return
             
-            # Parse do HTML
-            enchant_data = self.parse_enchantment_page(response.text)
+            # Parse do HTML numa thread (fora do loop compartilhado com os scrapers)
+            def parse():
+                with PARSE_SECONDS.time(page='enchantment'):
+                    return self.parse_enchantment_page(response.text)
+            enchant_data = await asyncio.to_thread(parse)
+            ITEMS.inc(site='enchant', outcome='done' if enchant_data else 'empty')
             
             if enchant_data:
                 self.log_signal.emit(f"✅ Encontrados {len(enchant_data)} níveis de enchant")
@@ -73,12 +71,13 @@ class EnchantScraperWorker(QThread):
                 self.finished_signal.emit({})
                 
         except Exception as e:
+            ITEMS.inc(site='enchant', outcome='failed')
             self.log_signal.emit(f"❌ Erro na requisição: {e}")
             self.finished_signal.emit({})
     
     def parse_enchantment_page(self, html):
         """Extrai os dados de enchantment do HTML incluindo TODOS os custos - parser resiliente"""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         enchant_data = {}
         
         # Verifica se a skill pode ser encantada
@@ -0,0 +1,161 @@
+"""
+Teste diferencial: o LxmlExtractor (caminho rápido) tem que devolver exatamente o
+mesmo que o SoupExtractor (oráculo, a lógica original com html.parser) nos HTMLs
+salvos em tests/fixtures/html. Os parsers de skilltree/enchant, que seguem no
+BeautifulSoup, têm que dar o mesmo resultado com o builder lxml e com o html.parser.
+"""
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from core import html_extract
+from core.html_extract import LxmlExtractor, SoupExtractor, extract_pages
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+BOX_FIXTURES = sorted(p.name for p in FIXTURES.glob("box_*.html"))
+SKILL_FIXTURES = sorted(p.name for p in FIXTURES.glob("skills*.html"))
+
+
+def load(name):
+    return (FIXTURES / name).read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize("fixture", BOX_FIXTURES)
+def test_box_items_identical(fixture):
+    html = load(fixture)
+    expected = SoupExtractor().box_items(html)
+    assert expected, "fixture sem itens não prova nada"
+    assert LxmlExtractor().box_items(html) == expected
+
+
+@pytest.mark.parametrize("fixture", SKILL_FIXTURES)
+def test_skill_ref_identical(fixture):
+    html = load(fixture)
+    assert LxmlExtractor().skill_ref(html) == SoupExtractor().skill_ref(html)
+
+
+def test_tricky_cases_are_covered():
+    items = {item['id']: item for item in LxmlExtractor().box_items(load("box_random_tricky.html"))}
+    # Comentário dentro do link do nome entra no nome, como no soup (Comment é texto)
+    assert items['91000']['name'] == "icon Sealed Necklace"
+    # Enchant em spans aninhados
+    assert items['91001']['enchant'] == 10
+    assert items['91001']['name'] == "+10 Draconic Bow"
+    # +N com texto solto antes e depois do span
+    assert items['91002']['enchant'] == 7
+    assert items['91002']['name'] == "Dragon +7 Slayer (PvP)"
+    assert 'grade' not in items['91002']
+    # Sem coluna de count
+    assert items['91003']['count'] == "1"
+    # Enchant não numérico fica como texto
+    assert items['91004']['enchant'] == "?"
+    # Descartados: sem data-item, sem link, "Not available"
+    assert not {'91005', '91006'} & items.keys()
+    assert items['91007'] == {'id': '91007', 'name': "Elixir of Life", 'count': "12", 'grade': "C"}
+
+
+def test_skill_ref_first_skill_link():
+    assert LxmlExtractor().skill_ref(load("skills.html")) == {
+        'skill_id': '4540', 'skill_level': '1', 'skill_sublevel': '1'}
+    assert LxmlExtractor().skill_ref(load("skills_none.html")) is None
+
+
+def test_extract_pages_identical():
+    pages = {
+        'skills': load("skills.html").encode('utf-8'),
+        'guaranteed': load("box_guaranteed.html").encode('utf-8'),
+        'random': load("box_random_tricky.html").encode('utf-8'),
+        'possible': None,
+    }
+    soup = extract_pages(SoupExtractor.name, pages)
+    fast = extract_pages(LxmlExtractor.name, pages)
+    assert soup.pop('timings').keys() == fast.pop('timings').keys()
+    assert fast == soup
+
+
+@pytest.mark.parametrize("html", ["", "<div class='item-wrap' data-item='1'></div>"])
+def test_short_pages_have_no_items(html):
+    assert LxmlExtractor().box_items(html) == SoupExtractor().box_items(html) == []
+
+
+def parse_with_both_builders(monkeypatch, parse):
+    """(html.parser, lxml): o mesmo parse com cada builder do make_soup"""
+    results = []
+    for builder in ('html.parser', 'lxml'):
+        monkeypatch.setattr(html_extract, 'SOUP_BUILDER', builder)
+        results.append(parse())
+    return results
+
+
+class FixtureSession:
+    """Responde às URLs da skill tree com as fixtures (level-ui, aba Removed Skills)"""
+
+    async def get(self, url, retries=0):
+        if 'replaceable' in url:
+            name = "skilltree_replaceable.html"
+        elif '/skills/10_' in url:
+            name = "skilltree_level.html"
+        else:
+            name = "skilltree_single.html"
+        return SimpleNamespace(status_code=200, text=load(name))
+
+
+@pytest.fixture
+def skilltree():
+    from core.tools.skilltree_scraper import SkillTreeScraper
+    scraper = SkillTreeScraper('main', 'warlord', '2ndClass', 'Warlord', log=lambda message: None)
+    scraper.session = FixtureSession()
+    return scraper
+
+
+def test_skilltree_index_same_with_both_builders(monkeypatch, skilltree):
+    html = load("skilltree_index.html")
+    reference, fast = parse_with_both_builders(monkeypatch, lambda: skilltree.extract_skills_from_html(html))
+    assert fast == reference
+    assert {category: [s['skill_id'] for s in skills] for category, skills in fast.items()} == {
+        'physical_attack_defense3': ['10', '1001'], 'toggles': ['2002']}
+
+
+@pytest.mark.parametrize("href", ["/main/skills/10_2_0.html", "/main/skills/2002_1_0.html"])
+def test_skilltree_levels_same_with_both_builders(monkeypatch, skilltree, href):
+    def parse():
+        return asyncio.run(skilltree.process_all_levels('toggles', {'skill_id': '10', 'href': href}))
+
+    reference, fast = parse_with_both_builders(monkeypatch, parse)
+    assert fast == reference
+    if '10_' in href:
+        assert [level['level'] for level in fast] == ['2', '1', '3']
+        assert fast[0]['full_class_name'] == ['Warlord', 'Dreadnought', 'Gladiator']
+        assert fast[0]['required_level'] == '40'
+        assert fast[0]['sp_consumption'] == '12000'
+        assert fast[0]['autoget'] is True
+        assert fast[0]['consume_items'] == [{'item_id': '3031', 'item_name': 'Spirit Ore'},
+                                            {'item_id': '57', 'item_name': 'Adena'}]
+        assert fast[0]['removed_skills_names'] == ['Mortal Blow', 'Triple Slash', 'Sonic Blaster']
+    else:
+        assert fast == [{'skill_id': '10', 'href': href, 'level': '1', 'sublevel': '0',
+                         'name': 'Toggle', 'full_class_name': ['All classes']}]
+
+
+@pytest.mark.parametrize("fixture", ["enchant.html", "enchant_cannot.html"])
+def test_enchant_same_with_both_builders(monkeypatch, fixture):
+    from tabs.skill_enchant_tab import EnchantScraperWorker
+    worker = EnchantScraperWorker('10', '1', '0', 'warlord', scraper_handler=None)
+    html = load(fixture)
+
+    reference, fast = parse_with_both_builders(monkeypatch, lambda: worker.parse_enchantment_page(html))
+    assert fast == reference
+    if fixture == "enchant.html":
+        assert sorted(fast) == [1, 2, 4]
+        assert fast[1] == {
+            'sublevel': 1001, 'success_rate': 50, 'enchant_level': 1, 'enchant_xp': 1500,
+            'enchant_xp_on_fail': 750,
+            'required_items': [{'item_id': '57', 'name': 'Adena', 'count': 1000000},
+                               {'item_id': '3031', 'name': 'Spirit Ore', 'count': 1}],
+        }
+        # Link sem _N_N: o sublevel sai do último _N do href
+        assert fast[2]['sublevel'] == 1 and fast[2]['enchant_xp'] is None
+    else:
+        assert fast == {}
@@ -0,0 +1,46 @@
+import os
+import sqlite3
+import time
+
+from core.http_cache import HTTPCache
+
+
+def accessed_at(cache_file, url):
+    conn = sqlite3.connect(str(cache_file))
+    try:
+        return conn.execute("SELECT accessed_at FROM pages WHERE url = ?", (url,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_lookup_does_not_write_until_close(tmp_path):
+    cache_file = tmp_path / "pages.sqlite3"
+    cache = HTTPCache(cache_file)
+    cache.store("http://wiki/a", b"<html>a</html>", etag='"a"')
+    stored_at = accessed_at(cache_file, "http://wiki/a")
+
+    time.sleep(0.01)
+    page = cache.lookup("http://wiki/a")
+    assert page.body == b"<html>a</html>"
+    assert page.validators() == {'If-None-Match': '"a"'}
+    assert accessed_at(cache_file, "http://wiki/a") == stored_at
+
+    cache.close()
+    assert accessed_at(cache_file, "http://wiki/a") > stored_at
+
+
+def test_eviction_sees_pending_hits(tmp_path):
+    body = os.urandom(4000)  # incompressível: o tamanho guardado é previsível
+    cache = HTTPCache(tmp_path / "pages.sqlite3", max_bytes=9000)
+    cache.store("http://wiki/old", body)
+    time.sleep(0.01)
+    cache.store("http://wiki/newer", body)
+    time.sleep(0.01)
+
+    # Hit na página mais antiga: ela vira a mais recente no LRU mesmo sem commit
+    assert cache.lookup("http://wiki/old") is not None
+    cache.store("http://wiki/third", body)
+
+    assert cache.lookup("http://wiki/old") is not None
+    assert cache.lookup("http://wiki/newer") is None
+    cache.close()
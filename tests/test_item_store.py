@@ -0,0 +1,80 @@
+import pytest
+
+from core.html_archive import HtmlArchive
+from core.item_store import FileItemStore, ItemStore, SQLiteItemStore, content_hash
+
+SKILL = {"skill_id": "45401", "skill_level": "2", "skill_sublevel": "1001"}
+
+RECORDS = [
+    # Extraível com skill: skill_data no topo
+    {"item_id": "100", "skill_data": SKILL,
+     "scraping_info": {"is_extractable": True, "has_skills": True, "item_type": "SKILL_REDUCE"},
+     "box_data": {"guaranteed_items": [], "random_items": [], "possible_items": []}},
+    # Não extraível com skill: skill_data dentro de scraping_info
+    {"item_id": "101",
+     "scraping_info": {"is_extractable": False, "has_skills": True, "skill_data": SKILL}},
+    # Sem skill
+    {"item_id": "102", "skill_data": None,
+     "scraping_info": {"is_extractable": True, "has_skills": False, "item_type": "PEEL"},
+     "box_data": {"guaranteed_items": [{"id": "57", "name": "Adena", "count": 10, "enchant": 0}],
+                  "random_items": [], "possible_items": []}},
+    # skill_id inválido não conta como skill
+    {"item_id": "103", "skill_data": {"skill_id": "abc"},
+     "scraping_info": {"is_extractable": True, "has_skills": True}},
+]
+
+
+@pytest.fixture(params=["files", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "files":
+        store = FileItemStore(tmp_path)
+    else:
+        store = SQLiteItemStore(tmp_path / "items.sqlite3")
+    for data in RECORDS:
+        store.put("main", data)
+    yield store
+    store.close()
+
+
+def test_with_skills_same_predicate_on_both_backends(store):
+    ids = sorted(str(data["item_id"]) for data in store.iter_items("main", with_skills=True))
+    assert ids == ["100", "101"]
+
+
+def test_iter_items_returns_everything_without_filter(store):
+    assert len(list(store.iter_items("main"))) == len(RECORDS)
+
+
+@pytest.mark.parametrize("data", [
+    # Só duas listas no box e entradas com None explícito
+    {"item_id": "200", "skill_data": None,
+     "scraping_info": {"is_extractable": True, "has_skills": False, "item_type": "PEEL"},
+     "box_data": {"guaranteed_items": [{"id": "57", "name": "Adena", "count": 10, "enchant": 0, "grade": None}],
+                  "random_items": []}},
+    # Tipos que as colunas não preservam: id numérico, grade numérico, count bool, chave a mais
+    {"item_id": 201,
+     "box_data": {"random_items": [{"id": 57, "name": "Adena", "count": True, "grade": 3, "chance": "50%"}],
+                  "possible_items": [{"name": None}]}},
+    # box_data vazio ou ausente
+    {"item_id": "202", "box_data": {}},
+    {"item_id": "203", "scraping_info": {"is_extractable": False}},
+])
+def test_put_get_round_trip(store, data):
+    store.put("main", data)
+    assert store.get("main", data["item_id"]) == data
+    assert content_hash(store.get("main", data["item_id"])) == content_hash(data)
+
+
+def test_incomplete_backends_fail_on_construction():
+    class PartialStore(ItemStore):
+        def get(self, site_type, item_id):
+            return None
+
+    class PartialArchive(HtmlArchive):
+        def put(self, site_type, item_id, name, body, url=None):
+            pass
+
+    with pytest.raises(TypeError):
+        PartialStore()
+    with pytest.raises(TypeError):
+        PartialArchive()
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Roda o CLI num processo novo com o PyQt6 bloqueado
+NO_QT = """
+import sys
+sys.path.insert(0, {root!r})
+
+class BlockQt:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] == 'PyQt6':
+            raise ImportError('PyQt6 bloqueado: ' + name)
+
+sys.meta_path.insert(0, BlockQt())
+import l2scraper
+code = l2scraper.main({argv!r})
+assert not [name for name in sys.modules if name.startswith('tabs')], 'importou tabs/'
+print('exit', code)
+"""
+
+
+def run_cli(tmp_path, *argv):
+    script = NO_QT.format(root=str(ROOT), argv=list(argv))
+    return subprocess.run([sys.executable, '-c', script], cwd=tmp_path,
+                          capture_output=True, text=True, timeout=120)
+
+
+def test_relics_runs_without_qt(tmp_path):
+    result = run_cli(tmp_path, 'relics', '--databases', str(tmp_path))
+    assert result.returncode == 0, result.stderr
+    assert 'Arquivos não encontrados (Main)' in result.stdout
+    assert 'exit 1' in result.stdout
+
+
+def test_scan_runs_without_qt(tmp_path):
+    (tmp_path / 'items_main').mkdir()
+    result = run_cli(tmp_path, 'scan', '--site', 'main', '--workers', '1')
+    assert result.returncode == 0, result.stderr
+    assert '📋 0 items scanned' in result.stdout
+    assert 'exit 0' in result.stdout
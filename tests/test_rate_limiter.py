@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from core.rate_limiter import RateLimiter, RetryableHTTPError
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Stand-in do wiki: /throttle responde 429 (Retry-After) uma vez e depois 200; /slow demora"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hits = server.hits[self.path]
+        try:
+            if self.path.startswith('/slow'):
+                time.sleep(0.05)
+            if self.path.startswith('/throttle') and hits == 1:
+                self.send_response(429)
+                self.send_header('Retry-After', '3')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = b'ok'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.active = server.max_active = 0
+    server.hits = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run(coro_fn, *args):
+    async def main():
+        async with httpx.AsyncClient(limits=httpx.Limits(max_connections=32)) as client:
+            return await coro_fn(client, *args)
+    return asyncio.run(main())
+
+
+def test_429_raises_retryable_and_halves_limit_and_rate(server):
+    limiter = RateLimiter(initial_limit=8, rate=20.0, cooldown=0)
+
+    async def scenario(client):
+        with pytest.raises(RetryableHTTPError) as error:
+            await limiter.get(client, f"{server.url}/throttle")
+        return error.value
+
+    error = run(scenario)
+    assert error.reason == "HTTP 429"
+    assert error.retry_after == 3.0
+    controller = limiter.controller(server.url)
+    assert controller.limit == 4
+    assert controller.bucket.rate == 10.0
+    assert controller.throttled == 1
+
+
+def test_retry_after_is_honoured_before_retrying(server, monkeypatch):
+    limiter = RateLimiter(initial_limit=8, rate=20.0)
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, 'sleep', fake_sleep)
+
+    async def scenario(client):
+        return await limiter.get(client, f"{server.url}/throttle", retries=1)
+
+    response = run(scenario)
+    assert response.status_code == 200
+    assert server.hits['/throttle'] == 2
+    assert delays and max(delays) >= 3.0
+
+
+def test_additive_increase_after_limit_successes(server):
+    limiter = RateLimiter(initial_limit=4, max_limit=16, rate=10.0, rate_step=1.0)
+
+    async def scenario(client):
+        for _ in range(4):
+            await limiter.get(client, f"{server.url}/ok")
+
+    run(scenario)
+    controller = limiter.controller(server.url)
+    assert controller.limit == 5
+    assert controller.bucket.rate == 11.0
+
+
+def test_slot_never_exceeds_limit(server):
+    limiter = RateLimiter(initial_limit=3, max_limit=3, rate=1000.0, max_rate=1000.0)
+    controller = limiter.controller(server.url)
+    observed = []
+
+    async def scenario(client):
+        async def watch():
+            while True:
+                observed.append(controller.active)
+                await asyncio.sleep(0.001)
+
+        watcher = asyncio.create_task(watch())
+        await asyncio.gather(*[limiter.get(client, f"{server.url}/slow?{i}") for i in range(20)])
+        watcher.cancel()
+
+    run(scenario)
+    assert sum(server.hits.values()) == 20
+    assert server.max_active <= 3
+    assert max(observed) <= 3
@@ -0,0 +1,157 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import config.config_manager as config_manager
+from core.wiki_session import WikiSession
+from core.work_ledger import WorkLedger
+
+ITEM_IDS = [str(item_id) for item_id in range(500, 506)]
+
+MAIN_PAGE = (
+    '<html><!--' + 'x' * 600 + '-->'
+    '<nav class="outer-tabs-menu"><a href="/main/tabs/items/box/?id=1">Box</a></nav>'
+    '<div class="tab-wrapper"></div><div class="item-description">d</div></html>'
+)
+BOX_PAGE = '<html><body>' + ''.join(
+    f'<div class="item-wrap" data-item="{i}"><div class="name" data-rank="S">'
+    f'<a href="/main/items/{i}.html"><span class="enchant">+3</span> Item {i}</a></div>'
+    f'<div class="count-col"><div>{i}</div></div></div>'
+    for i in range(3)
+) + '</body></html>'
+
+
+class WikiStandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if '/box/' in self.path:
+            body = BOX_PAGE
+        elif '/skills/' in self.path:
+            body = '<html>' + 'y' * 200 + '</html>'
+        else:
+            body = MAIN_PAGE
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def wiki():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), WikiStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """ConfigManager de verdade com a raiz do projeto num diretório temporário"""
+    monkeypatch.setattr(config_manager, '__file__', str(tmp_path / 'config' / 'config_manager.py'))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(WikiSession, 'use_cache', False)
+    (tmp_path / 'items_main_action_peel.json').write_text(
+        json.dumps([{'id': item_id, 'default_action': 'PEEL'} for item_id in ITEM_IDS]))
+    config = config_manager.ConfigManager()
+    yield config
+    config.flush()
+
+
+def make_worker(config, wiki):
+    from workers.scraper_worker import ScraperWorker
+    worker = ScraperWorker('main', config, full_scan=True, max_workers=4)
+    worker.base_url = wiki
+    return worker
+
+
+def test_pipeline_bookkeeping_stays_off_the_event_loop(config, wiki, monkeypatch):
+    calls = []
+
+    def recording(original, name):
+        def wrapper(*args, **kwargs):
+            calls.append((name, threading.current_thread().name))
+            return original(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(WorkLedger, 'mark', recording(WorkLedger.mark, 'ledger.mark'))
+    monkeypatch.setattr(WorkLedger, 'checkpoint', recording(WorkLedger.checkpoint, 'ledger.checkpoint'))
+    for name in ('add_processed_item', 'add_not_found_item', 'add_failed_item', 'save_config', 'save_stats'):
+        monkeypatch.setattr(config, name, recording(getattr(config, name), f'config.{name}'))
+
+    worker = make_worker(config, wiki)
+    worker.run()
+    worker.log_bus.close()
+
+    assert set(config.data['main']['processed_items']) == set(ITEM_IDS)
+    assert worker.ledger.counts()['done'] == len(ITEM_IDS)
+    assert ('config.add_processed_item', 'write-behind') in calls
+    assert not [call for call in calls if call[1] == 'wiki-session']
+
+
+def test_headless_logs_from_the_loop_thread_reach_the_reporter(config, capsys):
+    from l2scraper import ConsoleReporter
+    from utils.log_bus import connect_direct
+
+    reporter = ConsoleReporter(interval=0)
+    worker = make_worker(config, 'http://127.0.0.1:9')
+    # Mesmas conexões que o run_worker do CLI faz
+    connect_direct(worker.log_signal, reporter.log)
+    connect_direct(worker.progress_signal, reporter.progress)
+
+    async def pipeline_step():
+        worker.thread_safe_log("✅ Success: 100 from the loop")
+        worker.log_bus.progress(1, 2, "Processando 100")
+        return threading.current_thread().name
+
+    assert WikiSession.run(pipeline_step()) == 'wiki-session'
+    worker.log_bus.close()
+
+    output = capsys.readouterr().out
+    assert "✅ Success: 100 from the loop" in output
+    assert "[1/2  50.0%] Processando 100" in output
+
+
+def test_reparse_keeps_records_without_archived_html(config, wiki):
+    from workers.reparse_worker import ReparseWorker
+
+    worker = make_worker(config, wiki)
+    worker.run()
+    worker.log_bus.close()
+
+    stored = {'item_id': '999', 'skill_data': {'skill_id': '45401', 'skill_level': '1'},
+              'scraping_info': {'is_extractable': True, 'has_skills': True, 'item_type': 'SKILL_REDUCE'},
+              'box_data': {'guaranteed_items': [{'id': '57', 'name': 'Adena', 'count': 10, 'enchant': 0}]}}
+    worker.item_store.put('main', stored)
+
+    reparse = ReparseWorker('main', config, item_ids=['999', '500'])
+    reparse.run()
+    reparse.log_bus.close()
+
+    assert reparse.missing_count == 1
+    assert reparse.unchanged_count == 1
+    assert reparse.changed_count == 0
+    assert reparse.item_store.get('main', '999') == stored
+
+
+def test_stats_come_from_the_sqlite_store_without_item_directories(config, tmp_path):
+    from core.item_store import DB_FILENAME, SQLiteItemStore
+
+    store = SQLiteItemStore(tmp_path / DB_FILENAME)
+    store.put('main', {'item_id': '100', 'scraping_info': {'is_extractable': True, 'item_type': 'PEEL'},
+                       'box_data': {'guaranteed_items': [{'id': '57', 'count': 1}], 'random_items': [],
+                                    'possible_items': []}})
+    store.close()
+    assert not (tmp_path / 'html_items_main').exists()
+
+    stats = config.update_stats_from_files('main')
+    assert stats['processed_items'] == 1
+    assert config.data['main']['stats'] == stats
@@ -0,0 +1,99 @@
+import json
+import time
+
+from core import work_ledger
+from core.item_store import FileItemStore, SQLiteItemStore
+from core.work_ledger import WorkLedger
+
+JOBS = [{'id': str(item_id), 'default_action': 'PEEL'} for item_id in range(100, 110)]
+
+
+def test_checkpoint_writes_states_only(tmp_path, monkeypatch):
+    ledger = WorkLedger(tmp_path, 'main')
+    ledger.plan(JOBS)
+
+    written = []
+    original = WorkLedger._write_json
+    monkeypatch.setattr(WorkLedger, '_write_json',
+                        staticmethod(lambda path, data: (written.append(path.name), original(path, data))))
+    for job in JOBS[:4]:
+        ledger.mark(job['id'], work_ledger.DONE)
+    ledger.checkpoint()
+    ledger.close()
+
+    assert written == ['main.json']
+    snapshot = json.loads((tmp_path / WorkLedger.ledger_dir / 'main.json').read_text())
+    assert 'jobs' not in snapshot
+
+    resumed = WorkLedger(tmp_path, 'main')
+    assert resumed.is_resumable()
+    assert [job['id'] for job in resumed.pending_jobs()] == [job['id'] for job in JOBS[4:]]
+    assert resumed.counts()[work_ledger.DONE] == 4
+    resumed.close()
+
+
+def test_journal_transitions_survive_crash(tmp_path):
+    ledger = WorkLedger(tmp_path, 'main')
+    ledger.plan(JOBS)
+    ledger.mark('100', work_ledger.NOT_FOUND)
+    ledger.mark('101', work_ledger.IN_FLIGHT)
+    ledger.journal.close()  # "crash": sem checkpoint no close()
+
+    resumed = WorkLedger(tmp_path, 'main')
+    assert resumed.states['100'] == work_ledger.NOT_FOUND
+    assert resumed.states['101'] == work_ledger.IN_FLIGHT
+    resumed.close()
+
+
+def test_plan_and_states_from_different_runs_are_discarded(tmp_path):
+    ledger = WorkLedger(tmp_path, 'main')
+    ledger.plan(JOBS)
+    ledger.close()
+
+    # Crash depois de gravar o plano novo e antes do primeiro checkpoint dele
+    jobs_file = tmp_path / WorkLedger.ledger_dir / 'main.jobs.json'
+    jobs_file.write_text(json.dumps({'run_id': 'other-run', 'jobs': JOBS[:2]}))
+
+    resumed = WorkLedger(tmp_path, 'main')
+    assert not resumed.is_resumable()
+    assert resumed.jobs == []
+    resumed.close()
+
+
+def record(item_id, last_updated):
+    return {'item_id': item_id, 'schema_version': 1,
+            'scraping_info': {'last_updated': last_updated, 'is_extractable': False}}
+
+
+def test_reconcile_looks_up_only_in_flight_items(tmp_path, monkeypatch):
+    store = FileItemStore(tmp_path)
+    ledger = WorkLedger(tmp_path, 'main')
+    ledger.plan(JOBS)
+    ledger.mark('100', work_ledger.IN_FLIGHT)
+    ledger.mark('101', work_ledger.IN_FLIGHT)
+
+    store.put('main', record('100', time.strftime("%Y-%m-%d %H:%M:%S")))   # gravado nesta execução
+    store.put('main', record('105', time.strftime("%Y-%m-%d %H:%M:%S")))   # não estava in_flight
+
+    def no_full_index(*args):
+        raise AssertionError("resume não pode carregar o índice inteiro")
+
+    monkeypatch.setattr(FileItemStore, '_load_index', no_full_index)
+    in_flight = list(ledger.items_in(work_ledger.IN_FLIGHT))
+    entries = store.index_entries('main', in_flight)
+    assert set(entries) == {'100'}
+
+    assert ledger.reconcile(entries) == ['100']
+    assert ledger.states['100'] == work_ledger.DONE
+    assert ledger.states['101'] == work_ledger.QUEUED
+    ledger.close()
+
+
+def test_sqlite_index_entries(tmp_path):
+    store = SQLiteItemStore(tmp_path / 'items.sqlite3')
+    for item_id in ('100', '101', '102'):
+        store.put('main', record(item_id, '2026-01-01 00:00:00'))
+    entries = store.index_entries('main', ['100', '102', '999'])
+    assert set(entries) == {'100', '102'}
+    assert entries['100'][1] == '2026-01-01 00:00:00'
+    store.close()
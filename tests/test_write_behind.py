@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from core.html_archive import PackHtmlArchive
+from core.item_store import SQLiteItemStore
+from core.write_behind import AtomicBatch, WriteBehindWriter, atomic_write, on_commit
+
+RECORD = {"item_id": "100", "scraping_info": {"is_extractable": False}}
+
+
+@pytest.fixture
+def writer():
+    writer = WriteBehindWriter(name="test-writer")
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def backends(tmp_path):
+    store = SQLiteItemStore(tmp_path / "items.sqlite3")
+    archive = PackHtmlArchive(tmp_path / "html_archive")
+    yield store, archive
+    store.close()
+    archive.close()
+
+
+def write_item(tmp_path, store, archive, counters, fail=False):
+    """O write_item_record do scraper em miniatura: arquivo + pack + SQLite + contador"""
+    atomic_write(tmp_path / "100" / "skills.html", b"<html></html>")
+    archive.put("main", "100", "skills.html", b"<html></html>")
+    store.put("main", RECORD)
+    on_commit(lambda: counters.append("100"))
+    if fail:
+        raise RuntimeError("parse quebrou depois do put")
+
+
+def test_failed_task_leaves_no_side_effects(tmp_path, writer, backends):
+    store, archive = backends
+    counters = []
+    future = writer.submit(write_item, tmp_path, store, archive, counters, fail=True)
+
+    with pytest.raises(RuntimeError):
+        future.result(timeout=10)
+    assert store.get("main", "100") is None
+    assert archive.names("main", "100") == []
+    assert counters == []
+    assert not (tmp_path / "100" / "skills.html").exists()
+
+
+def test_failed_publish_leaves_no_side_effects(tmp_path, writer, backends, monkeypatch):
+    store, archive = backends
+    counters = []
+
+    def broken_publish(self):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(AtomicBatch, "publish", broken_publish)
+    future = writer.submit(write_item, tmp_path, store, archive, counters)
+
+    with pytest.raises(OSError):
+        future.result(timeout=10)
+    assert store.get("main", "100") is None
+    assert archive.names("main", "100") == []
+    assert counters == []
+
+
+def test_callback_error_fails_only_its_task(tmp_path, writer, backends):
+    store, archive = backends
+    counters = []
+
+    def broken():
+        on_commit(lambda: 1 / 0)
+
+    # Segura a thread do writer para as duas tasks entrarem no mesmo batch
+    gate = threading.Event()
+    writer.submit(gate.wait)
+    failing = writer.submit(broken)
+    ok = writer.submit(write_item, tmp_path, store, archive, counters)
+    gate.set()
+
+    with pytest.raises(ZeroDivisionError):
+        failing.result(timeout=10)
+    ok.result(timeout=10)
+    assert store.get("main", "100") == RECORD
+    assert archive.names("main", "100") == ["skills.html"]
+    assert counters == ["100"]
@@ -11,6 +11,7 @@ from core.handlers.scraper_handler import ScraperHandler
 from core.handlers.xml_handler import XMLHandler
 from core.handlers.skill_handler import SkillHandler
 from core.database import DatabaseManager
+from core.xml_cache import XMLTreeCache
 
 # Se você quiser gerar o JSON na hora se ele não existir:
 from core.tools.multilevel_generator import MultilevelGrouper 
@@ -300,6 +301,7 @@ class MultilevelSkillDialog(QDialog):
                     content = re.sub(r'(?<!\s)/>', ' />', content)
                     with open(out_path, 'w', encoding='utf-8') as f:
                         f.write(content)
+                    XMLTreeCache.invalidate(out_path)
                         
                     print(f"💾 Itens salvos em: {out_path.name}")
 
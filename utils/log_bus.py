@@ -0,0 +1,127 @@
+import threading
+from collections import Counter, deque
+from enum import IntEnum
+from typing import Optional
+
+from PyQt6.QtCore import QCoreApplication, QObject, Qt, QTimer, pyqtSignal
+
+
+def connect_direct(signal, slot):
+    """
+    Conexão que sempre chama o slot na thread que emitiu. Sem QCoreApplication
+    não há event loop para entregar sinais enfileirados: com AutoConnection o
+    que for emitido de outra thread (ex.: o loop asyncio do WikiSession) se perde.
+    """
+    signal.connect(slot, Qt.ConnectionType.DirectConnection)
+
+
+class LogLevel(IntEnum):
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+
+class LogBus(QObject):
+    """
+    Canal worker -> GUI com coalescência por frame.
+
+    log()/progress()/stats() podem ser chamados de qualquer thread e só guardam o
+    valor; um QTimer na thread da GUI publica a cada interval_ms:
+    - batch_signal: todas as linhas do intervalo num único texto (um append só);
+    - progress_signal / stats_signal: só o ÚLTIMO valor do intervalo.
+
+    Mensagens abaixo de `level` ou de categorias suprimidas (suppress()) não vão
+    para a GUI, só são contadas e resumidas no close(). Se a GUI ficar para trás,
+    as linhas mais antigas além de max_pending são descartadas (e contadas).
+
+    Sem QCoreApplication (uso headless) não há timer: tudo é publicado na hora.
+    """
+
+    batch_signal = pyqtSignal(str)
+    progress_signal = pyqtSignal(int, int, str)
+    stats_signal = pyqtSignal(dict)
+
+    interval_ms = 100
+    max_pending = 5000
+
+    def __init__(self, level: LogLevel = LogLevel.INFO, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.level = level
+        self.suppressed = set()
+        self.suppressed_counts = Counter()
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._lines = deque()
+        self._progress = None
+        self._stats = None
+
+        self.immediate = QCoreApplication.instance() is None
+        self._timer = None
+        if not self.immediate:
+            self._timer = QTimer(self)
+            self._timer.setInterval(self.interval_ms)
+            self._timer.timeout.connect(self.flush)
+            self._timer.start()
+
+    def suppress(self, *categories: str):
+        self.suppressed.update(categories)
+
+    def unsuppress(self, *categories: str):
+        self.suppressed.difference_update(categories)
+
+    def log(self, message: str, level: LogLevel = LogLevel.INFO, category: Optional[str] = None):
+        if level < self.level or (category is not None and category in self.suppressed):
+            with self._lock:
+                self.suppressed_counts[category or level.name.lower()] += 1
+            return
+
+        with self._lock:
+            self._lines.append(message)
+            if len(self._lines) > self.max_pending:
+                self._lines.popleft()
+                self.dropped += 1
+        if self.immediate:
+            self.flush()
+
+    def progress(self, current: int, total: int, status: str):
+        with self._lock:
+            self._progress = (current, total, status)
+        if self.immediate:
+            self.flush()
+
+    def stats(self, stats: dict):
+        with self._lock:
+            self._stats = dict(stats)
+        if self.immediate:
+            self.flush()
+
+    def flush(self):
+        """Publica o que acumulou desde o último frame (thread da GUI)"""
+        with self._lock:
+            lines, self._lines = self._lines, deque()
+            progress, self._progress = self._progress, None
+            stats, self._stats = self._stats, None
+            dropped, self.dropped = self.dropped, 0
+
+        if dropped:
+            lines.appendleft(f"… {dropped} log lines dropped (GUI behind)")
+        if lines:
+            self.batch_signal.emit("\n".join(lines))
+        if progress is not None:
+            self.progress_signal.emit(*progress)
+        if stats is not None:
+            self.stats_signal.emit(stats)
+
+    def close(self):
+        """Último frame + resumo do que foi suprimido"""
+        if self._timer is not None:
+            self._timer.stop()
+        with self._lock:
+            counts, self.suppressed_counts = self.suppressed_counts, Counter()
+        if counts:
+            summary = ", ".join(f"{count} {category}" for category, count in counts.most_common())
+            with self._lock:
+                self._lines.append(f"🔇 Suppressed messages: {summary}")
+        self.flush()
@@ -0,0 +1,147 @@
+# stats_aggregator.py
+import time
+import threading
+from typing import Dict, Optional, Tuple
+from core.item_store import ItemStore, get_item_store
+
+# Ordem dos campos de cada contribuição por item
+_FIELDS = (
+    "successful_items",
+    "not_found_items",
+    "item_box_found",
+    "skill_box_found",
+    "total_guaranteed_items",
+    "total_random_items",
+    "total_possible_items",
+    "item_guaranteed",
+    "item_random",
+    "item_possible",
+    "skill_guaranteed",
+    "skill_random",
+    "skill_possible",
+)
+
+
+class StatsAggregator:
+    """
+    Estatísticas do scraper mantidas em memória.
+
+    Faz UMA varredura do item store no início (seed) e depois só aplica
+    deltas quando cada item termina, em vez de reler todos os data.json a cada item.
+    Cada item guarda sua contribuição, então reprocessar um item (full scan) troca
+    a contribuição antiga pela nova sem contar duas vezes.
+    """
+
+    def __init__(self, config, site_type: str, persist_interval: float = 5.0,
+                 verify_with_disk: bool = False, item_store: Optional[ItemStore] = None):
+        self.config = config
+        self.site_type = site_type
+        self.persist_interval = persist_interval
+        self.verify_with_disk = verify_with_disk
+        self.item_store = item_store or get_item_store(config.root_path)
+
+        self.lock = threading.Lock()
+
+        self._totals = dict.fromkeys(_FIELDS, 0)
+        self._contrib: Dict[str, Tuple[int, ...]] = {}
+        self._last_persist = 0.0
+
+    @staticmethod
+    def contribution_from_counts(is_extractable: bool, item_type: str,
+                                 guaranteed: int, random_items: int, possible: int) -> Tuple[int, ...]:
+        """Quanto um item soma em cada contador (mesma regra do antigo update_stats_from_files)"""
+        values = dict.fromkeys(_FIELDS, 0)
+        if not is_extractable:
+            values["not_found_items"] = 1
+            return tuple(values.values())
+
+        values["successful_items"] = 1
+        values["total_guaranteed_items"] = guaranteed
+        values["total_random_items"] = random_items
+        values["total_possible_items"] = possible
+
+        prefix = "item" if item_type == "PEEL" else "skill"
+        values[f"{prefix}_box_found"] = 1
+        values[f"{prefix}_guaranteed"] = guaranteed
+        values[f"{prefix}_random"] = random_items
+        values[f"{prefix}_possible"] = possible
+        return tuple(values.values())
+
+    @classmethod
+    def contribution(cls, data: Optional[dict]) -> Tuple[int, ...]:
+        if not data:
+            return tuple(dict.fromkeys(_FIELDS, 0).values())
+
+        scraping_info = data.get('scraping_info', {})
+        box_data = data.get('box_data', {})
+        return cls.contribution_from_counts(
+            scraping_info.get('is_extractable', False),
+            scraping_info.get('item_type', ''),
+            len(box_data.get("guaranteed_items", [])),
+            len(box_data.get("random_items", [])),
+            len(box_data.get("possible_items", [])),
+        )
+
+    def seed(self) -> Dict:
+        """Varredura única do item store (uma consulta no SQLite); a partir daqui só deltas"""
+        contrib = {
+            item_id: self.contribution_from_counts(*counts)
+            for item_id, counts in self.item_store.item_counts(self.site_type).items()
+        }
+        with self.lock:
+            self._contrib = contrib
+            self._totals = dict.fromkeys(_FIELDS, 0)
+            for values in contrib.values():
+                for field, value in zip(_FIELDS, values):
+                    self._totals[field] += value
+        return self.snapshot()
+
+    def record_item(self, item_id: str, data: Optional[dict]):
+        """Aplica o delta de um item recém gravado (substitui a contribuição anterior)"""
+        item_id = str(item_id)
+        new = self.contribution(data)
+        with self.lock:
+            old = self._contrib.get(item_id)
+            if old is not None:
+                for field, value in zip(_FIELDS, old):
+                    self._totals[field] -= value
+            for field, value in zip(_FIELDS, new):
+                self._totals[field] += value
+            self._contrib[item_id] = new
+
+    def snapshot(self) -> Dict:
+        site_data = self.config.data[self.site_type]
+        with self.lock:
+            stats = dict(self._totals)
+            stats["processed_items"] = len(self._contrib)
+
+        stats["total_items"] = site_data.get("extractable_count", 0)
+        # Falhas e not found seguem as listas conhecidas do config
+        stats["failed_items"] = len(site_data["failed_items"])
+        stats["not_found_items"] = len(site_data["not_found_items"])
+        return stats
+
+    def maybe_persist(self, stats: Optional[Dict] = None, force: bool = False) -> bool:
+        """Grava no config no máximo a cada persist_interval segundos"""
+        now = time.monotonic()
+        if not force and now - self._last_persist < self.persist_interval:
+            return False
+
+        self._last_persist = now
+        stats = stats if stats is not None else self.snapshot()
+        self.config.save_current_state(self.site_type, stats)
+        self.config.save_stats(self.site_type, stats)
+        return True
+
+    def verify(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Confere os totais em memória contra uma nova varredura do item store.
+        Retorna {campo: (memória, disco)} das divergências e ressincroniza.
+        """
+        before = self.snapshot()
+        after = self.seed()
+        return {
+            key: (before[key], after[key])
+            for key in after
+            if before.get(key) != after[key]
+        }
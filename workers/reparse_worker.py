@@ -0,0 +1,174 @@
+import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+
+from core.html_archive import PAGE_TABS
+from core.html_extract import extract_pages
+from core.item_store import content_hash
+from core.metrics import ITEMS
+from core.write_behind import on_commit
+from utils.log_bus import LogLevel
+from workers.scraper_worker import ScraperWorker
+
+
+class ReparseWorker(ScraperWorker):
+    """
+    Re-extração offline: refaz data.json + auditoria a partir do HTML já arquivado
+    (skills.html / box_*.html no HtmlArchive), sem nenhuma requisição ao wiki.
+
+    Usa o mesmo caminho do scraper (extract_pages no process pool + parse_item_pages),
+    então uma mudança na extração ou no formato do registro vira um job local de CPU.
+    Só regrava os registros cujo conteúdo mudou (content_hash do índice do item store).
+    IDs sem nenhuma página arquivada são pulados: o registro salvo nunca é trocado
+    pelo resultado de um conjunto de páginas vazio.
+    """
+
+    # Itens extraídos à frente do loop de escrita, por processo do pool
+    WINDOW_PER_WORKER = 4
+
+    def __init__(self, site_type, config, item_ids=None, parse_workers=None):
+        super().__init__(site_type, config)
+        self.item_ids = item_ids
+        if parse_workers:
+            self.parse_workers = parse_workers
+        self.changed_count = 0
+        self.unchanged_count = 0
+        self.error_count = 0
+        self.missing_count = 0
+        self.index = {}
+
+    def run(self):
+        started = time.monotonic()
+        self.aggregator.seed()
+
+        item_ids = self.item_ids if self.item_ids is not None else self.html_archive.item_ids(self.site_type)
+        total = len(item_ids)
+        if total == 0:
+            self.thread_safe_log(f"No archived HTML for {self.site_type}, nothing to reparse")
+            return
+
+        dat_actions = self.load_dat_actions()
+        self.index = self.item_store.index(self.site_type)
+        self.thread_safe_log(f"♻️ Reparsing {total} items from archived HTML ({self.site_type})...")
+
+        self.parse_pool = self.start_parse_pool(total)
+        try:
+            for index, (item_id, pages, extracted) in enumerate(self.iter_extracted(item_ids), 1):
+                try:
+                    self.reparse_item(item_id, pages, extracted, dat_actions)
+                except Exception as e:
+                    self.error_count += 1
+                    self.thread_safe_log(f"  💥 Error reparsing {item_id}: {e}", LogLevel.ERROR)
+
+                self.log_bus.progress(index, total, f"Reparsing {self.site_type}: {index}/{total}")
+        finally:
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown(wait=True, cancel_futures=True)
+                self.parse_pool = None
+            # Registros ainda na fila do writer entram antes dos stats finais
+            self.writer.flush()
+            self.recalculate_stats()
+            self.aggregator.maybe_persist(force=True)
+            self.config.flush()
+
+        elapsed = time.monotonic() - started
+        self.thread_safe_log(
+            f"✅ Reparse finished in {elapsed:.1f}s: {self.changed_count} updated, "
+            f"{self.unchanged_count} unchanged, {self.missing_count} without archived HTML, "
+            f"{self.error_count} errors"
+        )
+
+    def load_dat_actions(self):
+        """item_id -> default_action do DAT (listas de itens); fallback no registro salvo"""
+        try:
+            items = self.config.get_items_to_process(self.site_type, full_scan=True)
+        except FileNotFoundError:
+            items = []
+        return {str(item['id']): item.get('default_action') for item in items}
+
+    def load_pages(self, item_id):
+        """Páginas arquivadas no formato do fetch: aba -> bytes"""
+        return {PAGE_TABS[name]: body
+                for name, body in self.html_archive.item_pages(self.site_type, item_id).items()
+                if name in PAGE_TABS}
+
+    def iter_extracted(self, item_ids):
+        """
+        (item_id, páginas, extração) na ordem dos IDs. Mantém uma janela limitada de
+        extrações em voo no pool para não carregar o arquivo inteiro na memória.
+        """
+        window = deque()
+        max_window = max(1, self.parse_workers * self.WINDOW_PER_WORKER)
+
+        for item_id in item_ids:
+            if not self.is_running:
+                return
+            pages = self.load_pages(item_id)
+            future = self.submit_extract(pages)
+            window.append((item_id, pages, future))
+            if len(window) >= max_window:
+                yield self.resolve_extract(*window.popleft())
+
+        while window and self.is_running:
+            yield self.resolve_extract(*window.popleft())
+
+    def submit_extract(self, pages):
+        if self.parse_pool is None or not pages:
+            return None
+        try:
+            return self.parse_pool.submit(extract_pages, self.extractor.name, pages)
+        except BrokenProcessPool as e:
+            self.thread_safe_log(f"⚠️ Process pool de parse falhou ({e}), continuando na thread...")
+            self.parse_pool = None
+            return None
+
+    def resolve_extract(self, item_id, pages, future):
+        if not pages:
+            return item_id, pages, None
+        if future is not None:
+            try:
+                return item_id, pages, future.result()
+            except BrokenProcessPool as e:
+                self.thread_safe_log(f"⚠️ Process pool de parse falhou ({e}), continuando na thread...")
+                self.parse_pool = None
+        return item_id, pages, extract_pages(self.extractor.name, pages)
+
+    def reparse_item(self, item_id, pages, extracted, dat_actions):
+        if not pages:
+            self.missing_count += 1
+            ITEMS.inc(site=self.site_type, outcome='reparse_missing')
+            self.thread_safe_log(f"  ⚠️ {item_id}: no archived HTML, keeping the stored record", LogLevel.WARNING)
+            return
+
+        dat_action = dat_actions.get(item_id)
+        if dat_action is None:
+            stored = self.item_store.get(self.site_type, item_id)
+            if stored:
+                dat_action = stored.get('audit_data', {}).get('default_action', {}).get('dat')
+
+        parsed = self.parse_item_pages({'id': item_id, 'default_action': dat_action}, pages, extracted)
+        record = parsed['record']
+
+        entry = self.index.get(item_id)
+        if entry is not None and entry[2] == content_hash(record):
+            self.unchanged_count += 1
+            ITEMS.inc(site=self.site_type, outcome='reparse_unchanged')
+        else:
+            # O HTML já está no arquivo: só o registro e os contadores mudam
+            future = self.writer.submit(self.store_record, item_id, record)
+            future.add_done_callback(lambda f, item_id=item_id: self.store_failed(item_id, f))
+            self.changed_count += 1
+            ITEMS.inc(site=self.site_type, outcome='reparse_changed')
+
+        self.emit_audit_data(item_id, parsed['audit_data'], parsed['is_extractable'])
+
+    def store_record(self, item_id, record):
+        self.item_store.put(self.site_type, record)
+        on_commit(lambda: self.aggregator.record_item(item_id, record))
+
+    def store_failed(self, item_id, future):
+        error = future.exception()
+        if error is not None:
+            self.error_count += 1
+            self.thread_safe_log(f"  💥 Error saving {item_id}: {error}", LogLevel.ERROR)
+
@@ -6,10 +6,33 @@ import re
 from pathlib import Path
 import json
 import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
+from utils.log_bus import LogBus, LogLevel, connect_direct
 from utils.scraping_stats import ScrapingStats
+from utils.stats_aggregator import StatsAggregator
+from core.html_archive import PAGE_TABS, get_html_archive
+from core.html_extract import extract_pages, get_extractor
+from core.item_store import SCHEMA_VERSION, get_item_store
+from core.metrics import ITEMS, PARSE_SECONDS, QUEUE_DEPTH, RETRIES
+from core.rate_limiter import RetryableHTTPError, RetryState
+from core.wiki_session import BASE_URL, WikiSession
+from core import work_ledger
+from core.work_ledger import WorkLedger
+from core.write_behind import WriteBehindWriter, atomic_write, on_commit
 import threading
-from asyncio import Semaphore
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Abaixo disso não compensa subir o process pool de parse
+PARALLEL_MIN_ITEMS = 20
+
+# Assinaturas da página principal do item (tabs/items/?id=N)
+_NOT_FOUND_PAGE_RE = re.compile(r"<div[^>]*\bclass=[\"'][^\"']*\bnot-found-page\b")
+_TABS_MENU_RE = re.compile(r"<nav[^>]*\bclass=[\"'][^\"']*\bouter-tabs-menu\b[^>]*>")
+_TAB_LINK_RE = re.compile(r"<a[^>]*\bhref=[\"'][^\"']*tabs/items/")
+_TAB_WRAPPER_RE = re.compile(r"<div[^>]*\bclass=[\"'][^\"']*\btab-wrapper\b")
+_CONTENT_RE = re.compile(r"<(?:div|p|table)\b[^>]*\bclass=[\"'][^\"']*(?:description|list-wrap|list-row|item-icon)", re.I)
 
 
 class ScraperWorker(QThread):
@@ -19,107 +42,68 @@ class ScraperWorker(QThread):
     site_stats_signal = pyqtSignal(dict)
     audit_signal = pyqtSignal(dict)
 
-    def __init__(self, site_type, config, initial_stats=None, full_scan=False, max_workers=5):
+    def __init__(self, site_type, config, initial_stats=None, full_scan=False, max_workers=15, verify_stats=False):
         super().__init__()
         self.site_type = site_type
         self.config = config
         self.is_running = True
         self.is_paused = False
-        self.failed_attempts = 0
         self.full_scan = full_scan
         self.max_workers = max_workers
+        self.verify_stats = verify_stats
 
         self.stats_mutex = QMutex()
-        self.log_mutex = QMutex()
+        # Log/progresso/stats vão para a GUI em lotes (um frame a cada 100 ms)
+        self.log_bus = LogBus()
+        self.log_bus.suppress("skip")
+        # Repasse direto: headless o bus publica da thread que logou (loop do WikiSession)
+        connect_direct(self.log_bus.batch_signal, self.log_signal)
+        connect_direct(self.log_bus.progress_signal, self.progress_signal)
+        connect_direct(self.log_bus.stats_signal, self.stats_signal)
+        self.finished.connect(self.log_bus.close)
 
         self.stats = ScrapingStats()
+        self.item_store = get_item_store(config.root_path)
+        # HTML cru das abas (arquivos soltos ou packs comprimidos, ver core/html_archive.py)
+        self.html_archive = get_html_archive(config.root_path)
+        self.aggregator = StatsAggregator(config, site_type, verify_with_disk=verify_stats, item_store=self.item_store)
         if initial_stats:
             for key, value in initial_stats.items():
                 if hasattr(self.stats, key):
                     setattr(self.stats, key, value)
 
-        self.base_url = "https://l2wiki.com"
+        self.base_url = BASE_URL
         self.processed_count = 0
         self.count_lock = threading.Lock()
 
-        self.client = httpx.AsyncClient(
-            http2=True,
-            timeout=15.0,
-            limits=httpx.Limits(max_connections=16, max_keepalive_connections=7),
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Referer": "https://l2wiki.com/",
-                "Origin": "https://l2wiki.com",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-                "Sec-Fetch-Dest": "document",
-                "Sec-Fetch-Mode": "navigate",
-                "Sec-Fetch-Site": "same-origin",
-            },
-            follow_redirects=True,
-            transport=httpx.AsyncHTTPTransport(retries=1)
-      )
-
-        self.semaphore = Semaphore(15)
-
-    def thread_safe_log(self, message):
-        #if any(x in message for x in ["Using local", "Skills"]):
-            #return
-        self.log_mutex.lock()
-        try:
-            self.log_signal.emit(message)
-        finally:
-            self.log_mutex.unlock()
-
-    def needs_json_update(self, item_dir, item_id):
-        json_file = item_dir / "data.json"
-        
-        if not json_file.exists():
-            return True
-        
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            needs_update = False
-            
-            if 'box_data' in data:
-                for box_type in ['guaranteed_items', 'random_items', 'possible_items']:
-                    for item in data['box_data'].get(box_type, []):
-                        if 'enchant' not in item:
-                            needs_update = True
-                            self.thread_safe_log(f"    Missing 'enchant' in {box_type}")
-                            break
-                    if needs_update:
-                        break
-            
-            if 'audit_data' not in data:
-                needs_update = True
-                self.thread_safe_log("    Missing 'audit_data'")
-                
-            scraping_info = data.get('scraping_info', {})
-            if 'is_extractable' not in scraping_info:
-                needs_update = True
-                self.thread_safe_log("    Outdated scraping_info")
-
-            if scraping_info.get('has_skills') and 'skill_data' not in data:
-                needs_update = True
-                self.thread_safe_log("    Missing 'skill_data'")
-
-            return needs_update
-            
-        except Exception as e:
-            self.thread_safe_log(f"    Error reading JSON: {e}")
-            return True
+        # Itens simultâneos no pipeline (requests/taxa ficam com o RateLimiter da WikiSession)
+        self.fetch_concurrency = max_workers
+        self.max_retries = 10
+        # Página principal + abas em paralelo (existência decidida depois)
+        self.speculative_fetch = True
+        # Extração dos HTMLs (lxml rápido; SoupExtractor fica como referência)
+        self.extractor = get_extractor()
+        # Processos para a extração dos HTMLs (fora do event loop)
+        self.parse_workers = min(4, os.cpu_count() or 1)
+        self.parse_pool = None
+        self.session = None
+        # Plano/estado da execução em disco (retomada instantânea depois de crash/stop)
+        self.ledger = None
+        # Gravações (HTML + data.json) fora do event loop, em batches atômicos
+        self.writer = WriteBehindWriter.default()
+        self.max_pending_writes = 128
+
+    def thread_safe_log(self, message, level=LogLevel.INFO, category=None):
+        """Categorias: skip/plan (planejamento), item (resultado por item), retry"""
+        self.log_bus.log(message, level, category)
 
     def run(self):
-        self.thread_safe_log(f"Starting scraper with {self.max_workers} workers")
+        self.thread_safe_log(f"Starting scraper with {self.fetch_concurrency} fetch workers")
         
         self.thread_safe_log("Loading stats...")
-        file_stats = self.config.update_stats_from_files(self.site_type)
+        # Uma varredura só; depois disso os stats andam por delta
+        file_stats = self.aggregator.seed()
+        self.aggregator.maybe_persist(file_stats, force=True)
         
         for key, value in file_stats.items():
             if hasattr(self.stats, key):
@@ -132,313 +116,566 @@ class ScraperWorker(QThread):
         self.site_stats_signal.emit(site_stats)
         self.thread_safe_log(f"{self.site_type} - Total in dat: {site_stats['total_in_dat']}, Extractable: {site_stats['extractable_count']}")
         self.thread_safe_log(f"Stats: {self.stats.successful_items} {self.stats.failed_items} {self.stats.not_found_items}")
-        self.thread_safe_log(f"Using at {self.max_workers} simultaneous workers")
+        self.thread_safe_log(f"Using up to {self.fetch_concurrency} items in flight "
+                             f"(requests limited per host by the RateLimiter)")
 
         try:
-            asyncio.run(self.scrape_site_async())
+            items_to_process = self.prepare_run()
+            if items_to_process:
+                WikiSession.run(self.scrape_site_async(items_to_process))
         except Exception as e:
             self.thread_safe_log(f"Critical error: {e}")
         finally:
-            asyncio.run(self.client.aclose())
+            # Transições do ledger/config ainda na fila do writer entram antes do close
+            self.writer.flush()
+            if self.ledger is not None:
+                self.ledger.close()
+            if self.verify_stats:
+                mismatches = self.aggregator.verify()
+                for key, (memory, disk) in mismatches.items():
+                    self.thread_safe_log(f"Stats mismatch {key}: memory={memory}, disk={disk}")
+            self.aggregator.maybe_persist(force=True)
+            self.config.flush()
             self.thread_safe_log("Scraping finalized")
 
-    async def scrape_site_async(self):
+    def prepare_run(self):
+        """
+        Ledger + plano da execução na thread do worker: listas do DAT, índice do item
+        store e checkpoints não rodam no loop compartilhado (que atende todos os scrapers).
+        """
+        self.ledger = WorkLedger(self.config.root_path, self.site_type)
+        if self.ledger.is_resumable(self.full_scan):
+            return self.resume_run()
+        return self.plan_run()
+
+    async def scrape_site_async(self, items_to_process):
+        self.processed_count = 0
+        async with WikiSession.acquire() as self.session:
+            await self.run_pipeline(items_to_process)
+
+    def resume_run(self):
+        """Retoma a execução interrompida direto do ledger (sem listas, sem varrer diretórios)"""
+        # Só os in_flight precisam do item store: um registro por ID, não o índice inteiro
+        in_flight = list(self.ledger.items_in(work_ledger.IN_FLIGHT))
+        recovered = self.ledger.reconcile(self.item_store.index_entries(self.site_type, in_flight))
+
+        # Crash entre o ledger e o config: o config alcança o que o ledger já concluiu
+        for item_id in self.ledger.items_in(work_ledger.DONE):
+            self.config.add_processed_item(self.site_type, item_id)
+        for item_id in self.ledger.items_in(work_ledger.NOT_FOUND):
+            self.config.add_not_found_item(self.site_type, item_id)
+
+        pending = self.ledger.pending_jobs()
+        counts = self.ledger.counts()
+        self.thread_safe_log(
+            f"♻️ Resuming run from {self.ledger.created_at}: {len(pending)} pending, "
+            f"{counts[work_ledger.DONE]} done, {counts[work_ledger.NOT_FOUND]} not found, "
+            f"{counts[work_ledger.FAILED]} failed"
+        )
+        if recovered:
+            self.thread_safe_log(f"    {len(recovered)} in-flight items were already saved, marked as done")
+        return pending
+
+    def plan_run(self):
+        """Nova execução: listas do DAT + índice do item store -> ledger com tudo queued"""
         items = self.load_items()
         total_items = len(items)
         
         if total_items == 0:
             self.thread_safe_log("No items to proccess!")
-            return
+            return []
         
         self.thread_safe_log(f"Initializing scrape of {total_items} extractable items...")
         
         output_dir = Path(f"html_items_{self.site_type}")
         output_dir.mkdir(exist_ok=True)
         
+        # (schema_version, last_updated, hash) de todos os itens numa leitura só
+        try:
+            index = self.item_store.index(self.site_type)
+        except Exception as e:
+            self.thread_safe_log(f"    Error reading item index: {e}")
+            index = {}
+
         items_to_process = []
         for item_data in items:
             if not self.is_running:
                 break
                 
             item_id = item_data['id']
-            item_dir = output_dir / item_id
-            json_file = item_dir / "data.json"
+            entry = index.get(str(item_id))
             
-            if json_file.exists():
-                if not self.needs_json_update(item_dir, item_id):
-                    self.thread_safe_log(f"JSON up-to-date: {item_id}")
+            if entry is not None:
+                if entry[0] >= SCHEMA_VERSION:
+                    self.thread_safe_log(f"JSON up-to-date: {item_id}", LogLevel.DEBUG, "skip")
                     continue
                 else:
-                    self.thread_safe_log(f"JSON needs update: {item_id}")
+                    self.thread_safe_log(f"JSON needs update: {item_id} (schema v{entry[0]} < v{SCHEMA_VERSION})",
+                                        LogLevel.DEBUG, "plan")
             else:
-                self.thread_safe_log(f"First time processing: {item_id}")
+                self.thread_safe_log(f"First time processing: {item_id}", LogLevel.DEBUG, "plan")
             
             items_to_process.append(item_data)
         
         total_to_process = len(items_to_process)
         self.thread_safe_log(f"{total_to_process} items to process (skipped {total_items - total_to_process} updated items)")
         
-        if total_to_process == 0:
-            return
-        
-        self.processed_count = 0
-        
-        for i in range(0, total_to_process, 50):
+        if self.is_running:
+            self.ledger.plan(items_to_process, self.full_scan)
+        return items_to_process
+
+    async def run_pipeline(self, items_to_process):
+        """
+        Pipeline produtor/consumidor: fetch (N workers) -> parse -> write.
+
+        As filas são limitadas (backpressure) e um retry não dorme dentro do slot do
+        worker: o job volta para a fila de fetch depois do delay, então os N fetchers
+        ficam ocupados o tempo todo mesmo com itens em backoff.
+        """
+        total = len(items_to_process)
+        depth = self.fetch_concurrency * 2
+        self.fetch_queue = asyncio.Queue(maxsize=depth)
+        self.parse_queue = asyncio.Queue(maxsize=depth)
+        self.write_queue = asyncio.Queue(maxsize=depth)
+        self.outstanding = total
+        self.pipeline_done = asyncio.Event()
+        self.retry_tasks = set()
+        self.write_tasks = set()
+
+        self.parse_pool = self.start_parse_pool(total)
+
+        producer = asyncio.create_task(self.produce_jobs(items_to_process, total))
+        fetchers = [asyncio.create_task(self.fetch_stage()) for _ in range(self.fetch_concurrency)]
+        # Parsers suficientes para manter todos os processos do pool ocupados
+        parsers = [asyncio.create_task(self.parse_stage()) for _ in range(max(1, self.parse_workers * 2))]
+        writer = asyncio.create_task(self.write_stage())
+
+        try:
+            while self.is_running and not self.pipeline_done.is_set():
+                self.sample_queues()
+                try:
+                    await asyncio.wait_for(self.pipeline_done.wait(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Para a entrada e deixa parse/write escoarem o que já foi baixado
+            for task in [producer, *fetchers, *self.retry_tasks]:
+                task.cancel()
+            await asyncio.gather(producer, *fetchers, *self.retry_tasks, return_exceptions=True)
+            for _ in parsers:
+                await self.parse_queue.put(None)
+            await asyncio.gather(*parsers, return_exceptions=True)
+            await self.write_queue.put(None)
+            await asyncio.gather(writer, return_exceptions=True)
+        finally:
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown(wait=False, cancel_futures=True)
+                self.parse_pool = None
+            self.sample_queues()
+
+    def sample_queues(self):
+        """Profundidade de cada estágio no painel de métricas (mostra onde o pipeline trava)"""
+        depths = {
+            'fetch': self.fetch_queue.qsize(),
+            'parse': self.parse_queue.qsize(),
+            'write': self.write_queue.qsize(),
+            'pending_writes': len(self.write_tasks),
+            'writer': self.writer.queue.qsize(),
+            'retry_backoff': len(self.retry_tasks),
+        }
+        for queue_name, depth in depths.items():
+            QUEUE_DEPTH.set(depth, site=self.site_type, queue=queue_name)
+
+    async def produce_jobs(self, items_to_process, total):
+        for index, item_data in enumerate(items_to_process, 1):
             if not self.is_running:
                 break
-            batch = items_to_process[i:i+50]
-            tasks = []
-            for idx, item_data in enumerate(batch):
-                tasks.append(self.process_item_with_retry_async(item_data, i + idx + 1, total_to_process))
-            await asyncio.gather(*tasks)
+            await self.fetch_queue.put({
+                'item': item_data, 'index': index, 'total': total,
+                'retry': RetryState(max_attempts=self.max_retries),
+            })
+
+    def finish_job(self):
+        self.outstanding -= 1
+        if self.outstanding <= 0:
+            self.pipeline_done.set()
+
+    def schedule_retry(self, job, error=None):
+        """Reagenda o job na fila de fetch depois do backoff, sem ocupar um worker"""
+        if not self.is_running:
+            self.finish_job()
+            return
+        retry = job['retry']
+        item_id = job['item']['id']
+        if retry.exhausted:
+            self.thread_safe_log(f"  Max retries reached for {item_id}", LogLevel.ERROR, "retry")
+            self.enqueue_outcome({'kind': 'failed', 'job': job, 'error': "Max retries reached"})
+            return
 
-    async def process_item_with_retry_async(self, item_data, current, total):
-        item_id = item_data['id']
-        retry_delay = 5
-        max_retries = 10
-        
-        for retry_count in range(max_retries):
-            if not self.is_running:
-                return False, False
-                    
-            while self.is_paused:
-                await asyncio.sleep(0.5)
+        self.submit_outcome(item_id, work_ledger.QUEUED)
+        RETRIES.inc(source=self.site_type,
+                    reason=getattr(error, 'reason', None) or (type(error).__name__ if error else "unknown"))
+        retry_delay = retry.next_delay(getattr(error, 'retry_after', None))
+        reason = f" ({error})" if error else ""
+        self.thread_safe_log(f"  Temporary Fail{reason}, retry in {retry_delay:.0f}s... ({retry.attempts}/{self.max_retries})",
+                             LogLevel.WARNING, "retry")
+
+        async def requeue():
+            await asyncio.sleep(retry_delay)
+            await self.fetch_queue.put(job)
+
+        task = asyncio.create_task(requeue())
+        self.retry_tasks.add(task)
+        task.add_done_callback(self.retry_tasks.discard)
+
+    def enqueue_outcome(self, outcome):
+        task = asyncio.create_task(self.write_queue.put(outcome))
+        self.retry_tasks.add(task)
+        task.add_done_callback(self.retry_tasks.discard)
+
+    async def fetch_stage(self):
+        while True:
+            job = await self.fetch_queue.get()
+            try:
+                while self.is_paused and self.is_running:
+                    await asyncio.sleep(0.5)
                 if not self.is_running:
-                    return False, False
-                    
-            self.progress_signal.emit(current, total, f"Processando {item_id}")
-            
-            async with self.semaphore:
-                success, is_found = await self.process_single_item_async(item_data)
-            
-            if success:
-                self.failed_attempts = 0
-                self.config.add_processed_item(self.site_type, item_id)
-                with self.count_lock:
-                    self.processed_count += 1
-                self.thread_safe_log(f"Success {item_id} ({current}/{total})")
-                self.recalculate_stats()
-                return True, is_found
-                
-            elif not is_found:
-                self.config.add_not_found_item(self.site_type, item_id)
-                with self.count_lock:
-                    self.processed_count += 1
-                self.thread_safe_log(f"Not found: {item_id} ({current}/{total})")
-                self.recalculate_stats()
-                return False, False
-                
+                    return
+
+                item_id = job['item']['id']
+                self.submit_outcome(item_id, work_ledger.IN_FLIGHT)
+                self.log_bus.progress(job['index'], job['total'], f"Processando {item_id}")
+                try:
+                    pages = await self.fetch_item_pages_async(item_id)
+                except Exception as e:
+                    self.schedule_retry(job, e)
+                    continue
+
+                if pages is None:
+                    await self.write_queue.put({'kind': 'not_found', 'job': job})
+                else:
+                    await self.parse_queue.put((job, pages))
+            finally:
+                self.fetch_queue.task_done()
+
+    async def parse_stage(self):
+        while True:
+            entry = await self.parse_queue.get()
+            if entry is None:
+                return
+            job, pages = entry
+            try:
+                extracted = await self.extract_pages_async(pages)
+                # Monta o registro fora do loop (check_xml_action lê o XML do bloco)
+                parsed = await asyncio.to_thread(self.parse_item_pages, job['item'], pages, extracted)
+            except Exception as e:
+                self.thread_safe_log(f"  💥 Critical error in {job['item']['id']}: {e}", LogLevel.ERROR)
+                self.schedule_retry(job, e)
+                continue
+            await self.write_queue.put({'kind': 'done', 'job': job, 'parsed': parsed})
+
+    async def extract_pages_async(self, pages):
+        """Extração (CPU) no process pool; sem pool, numa thread, nunca no event loop"""
+        if self.parse_pool is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self.parse_pool, extract_pages, self.extractor.name, pages)
+            except BrokenProcessPool as e:
+                self.thread_safe_log(f"⚠️ Process pool de parse falhou ({e}), continuando em threads...")
+                self.parse_pool = None
+        return await asyncio.to_thread(extract_pages, self.extractor.name, pages)
+
+    def start_parse_pool(self, total):
+        if total < PARALLEL_MIN_ITEMS or self.parse_workers < 2:
+            return None
+        # spawn: o filho só importa core.html_extract (sem Qt, sem SQLite do item store)
+        ctx = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=ctx)
+
+    async def write_stage(self):
+        """
+        Despacha as gravações para o WriteBehindWriter sem esperar o disco; cada item
+        é concluído (ledger, config, stats) quando o batch dele for publicado. Ledger e
+        config também vão pela thread do writer (record_outcome): nenhum fsync no loop.
+        """
+        while True:
+            outcome = await self.write_queue.get()
+            if outcome is None:
+                break
+            job = outcome['job']
+            item_id = job['item']['id']
+            progress = f"({job['index']}/{job['total']})"
+
+            if outcome['kind'] == 'done':
+                # Backpressure: no máximo max_pending_writes itens esperando o disco
+                while len(self.write_tasks) >= self.max_pending_writes:
+                    await asyncio.wait(set(self.write_tasks), return_when=asyncio.FIRST_COMPLETED)
+                future = self.writer.submit(self.write_item_record, outcome['parsed'])
+                task = asyncio.create_task(self.complete_write(job, future))
+                self.write_tasks.add(task)
+                task.add_done_callback(self.write_tasks.discard)
+            elif outcome['kind'] == 'not_found':
+                ITEMS.inc(site=self.site_type, outcome='not_found')
+                self.thread_safe_log(f"Not found: {item_id} {progress}", category="item")
+                self.item_finished(item_id, work_ledger.NOT_FOUND)
             else:
-                self.failed_attempts += 1
-                retry_delay = min(300, 5 * (2 ** self.failed_attempts))
-                self.thread_safe_log(f"  Temporary Fail, retry in {retry_delay}s... ({retry_count + 1}/{max_retries})")
-                await asyncio.sleep(retry_delay)
-                
-        self.thread_safe_log(f"  Max retries reached for {item_id}")
-        self.save_failed_item(item_id, "Max retries reached")
-        self.config.add_failed_item(self.site_type, item_id)
-        return False, True
+                self.writer.submit(self.save_failed_item, item_id, outcome['error'])
+                self.submit_outcome(item_id, work_ledger.FAILED)
+                ITEMS.inc(site=self.site_type, outcome='failed')
+                self.finish_job()
+
+        if self.write_tasks:
+            await asyncio.gather(*self.write_tasks, return_exceptions=True)
+
+    async def complete_write(self, job, future):
+        item_id = job['item']['id']
+        try:
+            await asyncio.wrap_future(future)
+        except Exception as e:
+            self.thread_safe_log(f"  💥 Critical error in {item_id}: {e}", LogLevel.ERROR)
+            self.schedule_retry(job, e)
+            return
+        ITEMS.inc(site=self.site_type, outcome='done')
+        self.thread_safe_log(f"Success {item_id} ({job['index']}/{job['total']})", category="item")
+        self.item_finished(item_id, work_ledger.DONE)
+
+    def item_finished(self, item_id, state):
+        with self.count_lock:
+            self.processed_count += 1
+        stats = self.recalculate_stats()
+        self.submit_outcome(item_id, state, stats)
+        self.finish_job()
+
+    def submit_outcome(self, item_id, state, stats=None):
+        future = self.writer.submit(self.record_outcome, item_id, state, stats)
+        future.add_done_callback(lambda f, item_id=item_id: self.outcome_failed(item_id, f))
+
+    def record_outcome(self, item_id, state, stats=None):
+        """
+        Thread do writer: ledger primeiro (o registro já foi publicado num batch
+        anterior), depois o config derivado e os stats persistidos. Journal, checkpoint
+        do ledger e compactação do scraper_config (fsync) ficam fora do event loop.
+        """
+        self.ledger.mark(item_id, state)
+        if state == work_ledger.DONE:
+            self.config.add_processed_item(self.site_type, item_id)
+        elif state == work_ledger.NOT_FOUND:
+            self.config.add_not_found_item(self.site_type, item_id)
+        elif state == work_ledger.FAILED:
+            self.config.add_failed_item(self.site_type, item_id)
+        if stats is not None:
+            self.aggregator.maybe_persist(stats)
+
+    def outcome_failed(self, item_id, future):
+        error = future.exception()
+        if error is not None:
+            self.thread_safe_log(f"  💥 Error saving state of {item_id}: {error}", LogLevel.ERROR)
 
     def recalculate_stats(self):
-        file_stats = self.config.update_stats_from_files(self.site_type)
+        """Stats em memória para a GUI; gravar no config fica com quem chamou"""
+        file_stats = self.aggregator.snapshot()
         self.stats_mutex.lock()
         try:
             for key, value in file_stats.items():
                 if hasattr(self.stats, key):
                     setattr(self.stats, key, value)
-            self.config.save_current_state(self.site_type, self.stats.__dict__)
-            self.stats_signal.emit(self.stats.__dict__)
-            self.config.save_stats(self.site_type, self.stats.__dict__)
+            stats = dict(self.stats.__dict__)
         finally:
             self.stats_mutex.unlock()
+        self.log_bus.stats(stats)
+        return stats
 
     async def check_item_exists_on_site_async(self, item_id):
         try:
-            main_url = f"{self.base_url}/{self.site_type}/tabs/items/?id={item_id}"
-            resp = await self.client.get(main_url)
-            
-            if resp.status_code != 200:
-                self.thread_safe_log(f"  ⚠️ Item {item_id}: HTTP {resp.status_code}")
-                return False
-            
-            if len(resp.text) < 500:
-                self.thread_safe_log(f"  ⚠️ Item {item_id}: Short response ({len(resp.text)} bytes) - possível erro de rede")
-                return False
-            
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            
-            phantom_item = soup.find('div', class_="not-found-page")
-            if phantom_item:
-                self.thread_safe_log(f"  👻 Soft 404 - Phantom Item: {item_id}")
-                return False
-            
-            main_menu = soup.find('nav', class_='outer-tabs-menu')
-            if not main_menu:
-                self.thread_safe_log(f"  ❌ Not a extractable item: {item_id}")
-                return False
-            
-            tab_links = main_menu.find_all('a', href=re.compile(r'tabs/items/'))
-            tab_wrapper = soup.find('div', class_='tab-wrapper')
-            content_elements = soup.find_all(['div', 'p', 'table'], class_=re.compile(
-                r'description|list-wrap|list-row|item-icon', re.I
-            ))
-            
-            has_content = len(content_elements) > 0
-            exists = main_menu and tab_links and tab_wrapper and has_content
-            
-            if not exists:
-                self.thread_safe_log(f"  ❌ Extractable not found: {item_id}")
-            
-            return exists
-            
+            resp = await self.session.get(self.main_page_url(item_id))
+        except RetryableHTTPError:
+            raise
         except Exception as e:
             self.thread_safe_log(f"  ⚠️ Error in verifying {item_id}: {e}")
             return False
+        return self.evaluate_main_page(item_id, resp)
+
+    def main_page_url(self, item_id):
+        return f"{self.base_url}/{self.site_type}/tabs/items/?id={item_id}"
+
+    def tab_urls(self, item_id):
+        return {
+            "skills": f"{self.base_url}/{self.site_type}/tabs/items/skills/?id={item_id}&size=1000",
+            "guaranteed": f"{self.base_url}/{self.site_type}/tabs/items/box/guaranteed/?id={item_id}&size=1000",
+            "random": f"{self.base_url}/{self.site_type}/tabs/items/box/random/?id={item_id}&size=1000",
+            "possible": f"{self.base_url}/{self.site_type}/tabs/items/box/possible/?id={item_id}&size=1000",
+        }
+
+    def evaluate_main_page(self, item_id, resp):
+        """
+        Decide se o item existe pela página principal, sem montar a árvore HTML:
+        assinaturas (regex) das mesmas marcas que a verificação com soup procurava.
+        """
+        if resp.status_code != 200:
+            self.thread_safe_log(f"  ⚠️ Item {item_id}: HTTP {resp.status_code}")
+            return False
+        
+        html = resp.text
+        if len(html) < 500:
+            self.thread_safe_log(f"  ⚠️ Item {item_id}: Short response ({len(html)} bytes) - possível erro de rede")
+            return False
+        
+        if _NOT_FOUND_PAGE_RE.search(html):
+            self.thread_safe_log(f"  👻 Soft 404 - Phantom Item: {item_id}")
+            return False
+        
+        menu = _TABS_MENU_RE.search(html)
+        if not menu:
+            self.thread_safe_log(f"  ❌ Not a extractable item: {item_id}")
+            return False
+        
+        menu_end = html.find('</nav>', menu.end())
+        tab_links = _TAB_LINK_RE.search(html, menu.end(), menu_end if menu_end != -1 else len(html))
+        exists = bool(tab_links and _TAB_WRAPPER_RE.search(html) and _CONTENT_RE.search(html))
+        
+        if not exists:
+            self.thread_safe_log(f"  ❌ Extractable not found: {item_id}")
+        
+        return exists
+
+    async def fetch_item_pages_async(self, item_id):
+        """
+        Estágio de fetch. Retorna None se o item não existe no site, senão {aba: html ou None}.
+
+        Em modo especulativo (padrão) a página principal e as 4 abas saem juntas: o item
+        custa um round-trip e a existência é decidida pela página principal depois
+        (soft 404 descarta as abas). Sem ele, verifica primeiro e só então baixa as abas.
+        """
+        urls = self.tab_urls(item_id)
+
+        if self.speculative_fetch:
+            main, *responses = await asyncio.gather(
+                self.session.get(self.main_page_url(item_id)),
+                *[self.session.get(url) for url in urls.values()],
+                return_exceptions=True)
+            if isinstance(main, RetryableHTTPError):
+                raise main
+            if isinstance(main, Exception):
+                self.thread_safe_log(f"  ⚠️ Error in verifying {item_id}: {main}")
+                return None
+            if not self.evaluate_main_page(item_id, main):
+                return None
+        else:
+            if not await self.check_item_exists_on_site_async(item_id):
+                return None
+            responses = await asyncio.gather(*[self.session.get(url) for url in urls.values()],
+                                             return_exceptions=True)
+
+        # Aba estrangulada (429/5xx/timeout) não pode virar "sem itens": o item inteiro volta para a fila
+        for resp in responses:
+            if isinstance(resp, RetryableHTTPError):
+                raise resp
+
+        pages = {}
+        for tab, resp in zip(urls, responses):
+            ok = isinstance(resp, httpx.Response) and resp.status_code == 200 and len(resp.content) > 100
+            # Bytes crus: vão assim para o process pool de parse e para o disco
+            pages[tab] = resp.content if ok else None
+        return pages
+
+    def parse_item_pages(self, item_data, pages, extracted=None):
+        """
+        Estágio de parse: monta o data.json + auditoria a partir da extração das abas
+        (`extracted`, vinda do process pool; se None, extrai aqui mesmo).
+        Não grava nada; os HTMLs que devem ir para disco voltam em 'files'.
+        """
+        if extracted is None:
+            extracted = extract_pages(self.extractor.name, pages)
+        for page, seconds in extracted.get('timings', {}).items():
+            PARSE_SECONDS.observe(seconds, page=page)
+        started = time.perf_counter()
 
-    async def process_single_item_async(self, item_data):
-        """Processa item com verificação de existência e contadores completos"""
         item_id = item_data['id']
         dat_action = item_data['default_action']
         
-        output_dir = Path(f"html_items_{self.site_type}")
-        item_dir = output_dir / item_id
-        
-        try:
-            item_exists = await self.check_item_exists_on_site_async(item_id)
-            
-            if not item_exists:
-                return False, False
-            
-            item_dir.mkdir(exist_ok=True)
-            
-            audit_data = {
-                'default_action': {
-                    'dat': dat_action,
-                    'site': None,
-                    'expected': None,
-                    'found': None,
-                    'status': 'pending'
-                }
+        audit_data = {
+            'default_action': {
+                'dat': dat_action,
+                'site': None,
+                'expected': None,
+                'found': None,
+                'status': 'pending'
             }
+        }
+        
+        is_extractable = False
+        box_data = {"guaranteed_items": [], "random_items": [], "possible_items": []}
+        site_action = "NONE"
+        has_skills = False
+        skill_data = None
+        files = {}
+
+        # SKILLS
+        skills_html = pages.get("skills")
+        
+        if skills_html:
+            temp_skill_data = extracted['skill_data']
             
-            is_extractable = False
-            box_data = {"guaranteed_items": [], "random_items": [], "possible_items": []}
-            site_action = "NONE"
-            has_skills = False
-            skill_data = None
-            
-            urls = {
-                "skills": f"{self.base_url}/{self.site_type}/tabs/items/skills/?id={item_id}&size=1000",
-                "guaranteed": f"{self.base_url}/{self.site_type}/tabs/items/box/guaranteed/?id={item_id}&size=1000",
-                "random": f"{self.base_url}/{self.site_type}/tabs/items/box/random/?id={item_id}&size=1000",
-                "possible": f"{self.base_url}/{self.site_type}/tabs/items/box/possible/?id={item_id}&size=1000",
-            }
-
-            responses = await asyncio.gather(*[self.client.get(url) for url in urls.values()], return_exceptions=True)
+            if temp_skill_data:
+                files["skills.html"] = skills_html
+                skill_data = temp_skill_data
+                has_skills = True
+                site_action = "SKILL_REDUCE"
 
-            # SKILLS
-            resp = responses[0]
-            skills_html = resp.text if isinstance(resp, httpx.Response) and resp.status_code == 200 and len(resp.text) > 100 else None
+        # BOXES
+        for box_type in ["guaranteed", "random", "possible"]:
+            html = pages.get(box_type)
             
-            if skills_html:
-                temp_skill_data = self.extract_skill_id(skills_html)
-                
-                if temp_skill_data:
-                    (item_dir / "skills.html").write_text(skills_html, encoding="utf-8")
-                    skill_data = temp_skill_data
-                    has_skills = True
-                    site_action = "SKILL_REDUCE"
-
-            # BOXES
-            for idx, box_type in enumerate(["guaranteed", "random", "possible"]):
-                resp = responses[idx + 1]
-                html = resp.text if isinstance(resp, httpx.Response) and resp.status_code == 200 and len(resp.text) > 100 else None
+            if html:
+                items = extracted['boxes'].get(box_type)
                 
-                if html:
-                    items = self.extract_items_from_html(html, box_type, item_id)
+                if items:
+                    files[f"box_{box_type}.html"] = html
                     
-                    if items:
-                        file_path = item_dir / f"box_{box_type}.html"
-                        file_path.write_text(html, encoding="utf-8")
-                        
-                        box_data[f"{box_type}_items"] = items
-                        is_extractable = True
-                        
-                        item_count = len(items)
-                        if box_type == "guaranteed":
-                            self.stats.total_guaranteed_items += item_count
-                        elif box_type == "random":
-                            self.stats.total_random_items += item_count
-                        elif box_type == "possible":
-                            self.stats.total_possible_items += item_count
-                        
-                        if not has_skills:
-                            site_action = "PEEL"
-            
-            # CONTADORES SEPARADOS ITEM BOX vs SKILL BOX
-            if is_extractable:
-                guaranteed_local = len(box_data.get("guaranteed_items", []))
-                random_local = len(box_data.get("random_items", []))
-                possible_local = len(box_data.get("possible_items", []))
-                
-                if has_skills:
-                    self.stats.skill_guaranteed += guaranteed_local
-                    self.stats.skill_random += random_local
-                    self.stats.skill_possible += possible_local
-                else:
-                    self.stats.item_guaranteed += guaranteed_local
-                    self.stats.item_random += random_local
-                    self.stats.item_possible += possible_local
-
-            audit_data['default_action']['site'] = site_action
-            
-            if audit_data['default_action']['site'] != "NONE":
-                audit_data['default_action']['expected'] = audit_data['default_action']['site']
-            else:
-                audit_data['default_action']['expected'] = "NONE"
-            
-            xml_action_found = self.check_xml_action(item_id, self.site_type)
-            audit_data['default_action']['found'] = xml_action_found
-            
-            if audit_data['default_action']['expected'] == audit_data['default_action']['found']:
-                audit_data['default_action']['status'] = 'consistent'
-            elif audit_data['default_action']['found'] is None:
-                audit_data['default_action']['status'] = 'missing'
-            else:
-                audit_data['default_action']['status'] = 'inconsistent'
-            
-            if not is_extractable:
-                self.thread_safe_log(f"  🔍 Item exists, but not extractable: {item_id}")
-                
-                item_data_save = {
-                    "item_id": item_id,
-                    "scraping_info": {
-                        "last_updated": time.strftime("%Y-%m-%d %H:%M:%S"),
-                        "is_extractable": False,
-                        "site_type": self.site_type,
-                        "has_skills": has_skills,
-                        "skill_data": skill_data
-                    },
-                    "audit_data": audit_data
-                }
-                
-                with open(item_dir / "data.json", 'w', encoding='utf-8') as f:
-                    json.dump(item_data_save, f, indent=2, ensure_ascii=False)
+                    box_data[f"{box_type}_items"] = items
+                    is_extractable = True
                     
-                self.emit_audit_data(item_id, audit_data, False)
-                return True, True
-            
-            item_type = "SKILL_REDUCE" if has_skills else "PEEL"
-            box_type_str = "Skill Box" if has_skills else "Item Box"
-            
-            self.thread_safe_log(f"  ✅ {box_type_str} - Status: {audit_data['default_action']['status']}")
-            
-            item_full_data = {
+                    if not has_skills:
+                        site_action = "PEEL"
+        
+        audit_data['default_action']['site'] = site_action
+        
+        if audit_data['default_action']['site'] != "NONE":
+            audit_data['default_action']['expected'] = audit_data['default_action']['site']
+        else:
+            audit_data['default_action']['expected'] = "NONE"
+        
+        xml_action_found = self.check_xml_action(item_id, self.site_type)
+        audit_data['default_action']['found'] = xml_action_found
+        
+        if audit_data['default_action']['expected'] == audit_data['default_action']['found']:
+            audit_data['default_action']['status'] = 'consistent'
+        elif audit_data['default_action']['found'] is None:
+            audit_data['default_action']['status'] = 'missing'
+        else:
+            audit_data['default_action']['status'] = 'inconsistent'
+        
+        if not is_extractable:
+            record = {
                 "item_id": item_id,
+                "schema_version": SCHEMA_VERSION,
+                "scraping_info": {
+                    "last_updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "is_extractable": False,
+                    "site_type": self.site_type,
+                    "has_skills": has_skills,
+                    "skill_data": skill_data
+                },
+                "audit_data": audit_data
+            }
+        else:
+            record = {
+                "item_id": item_id,
+                "schema_version": SCHEMA_VERSION,
                 "skill_data": skill_data,
                 "scraping_info": {
                     "last_updated": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "item_type": item_type,
+                    "item_type": "SKILL_REDUCE" if has_skills else "PEEL",
                     "has_skills": has_skills,
                     "is_extractable": True,
                     "site_type": self.site_type
@@ -446,20 +683,52 @@ class ScraperWorker(QThread):
                 "box_data": box_data,
                 "audit_data": audit_data
             }
-            
-            with open(item_dir / "data.json", 'w', encoding='utf-8') as f:
-                json.dump(item_full_data, f, indent=2, ensure_ascii=False)
-            
-            if has_skills:
-                self.stats.skill_box_found += 1
-            else:
-                self.stats.item_box_found += 1
-            
-            self.emit_audit_data(item_id, audit_data, True)
+
+        PARSE_SECONDS.observe(time.perf_counter() - started, page='record')
+        return {
+            'item_id': item_id,
+            'record': record,
+            'audit_data': audit_data,
+            'is_extractable': is_extractable,
+            'has_skills': has_skills,
+            'files': files,
+        }
+
+    def write_item_record(self, parsed):
+        """Estágio de write: HTMLs, data.json, contadores e sinal de auditoria"""
+        item_id = parsed['item_id']
+        audit_data = parsed['audit_data']
+
+        urls = self.tab_urls(item_id)
+        for name, html in parsed['files'].items():
+            self.html_archive.put(self.site_type, item_id, name, html, url=urls.get(PAGE_TABS[name]))
+
+        if not parsed['is_extractable']:
+            self.thread_safe_log(f"  🔍 Item exists, but not extractable: {item_id}", category="item")
+        else:
+            box_type_str = "Skill Box" if parsed['has_skills'] else "Item Box"
+            self.thread_safe_log(f"  ✅ {box_type_str} - Status: {audit_data['default_action']['status']}", category="item")
+
+        self.item_store.put(self.site_type, parsed['record'])
+        # Contadores (item box vs skill box, guaranteed/random/possible) por delta, só
+        # depois do registro publicado; record_item substitui a contribuição anterior
+        on_commit(lambda: self.aggregator.record_item(item_id, parsed['record']))
+
+        self.emit_audit_data(item_id, audit_data, parsed['is_extractable'])
+
+    async def process_single_item_async(self, item_data):
+        """Processa um item fora do pipeline (fetch -> parse -> write em sequência)"""
+        item_id = item_data['id']
+        try:
+            async with WikiSession.acquire() as self.session:
+                pages = await self.fetch_item_pages_async(item_id)
+            if pages is None:
+                return False, False
+            parsed = await asyncio.to_thread(self.parse_item_pages, item_data, pages)
+            await asyncio.wrap_future(self.writer.submit(self.write_item_record, parsed))
             return True, True
-                
         except Exception as e:
-            self.thread_safe_log(f"  💥 Critical error in {item_id}: {e}")
+            self.thread_safe_log(f"  💥 Critical error in {item_id}: {e}", LogLevel.ERROR)
             return False, True
 
     def check_xml_action(self, item_id, site_type):
@@ -502,98 +771,13 @@ class ScraperWorker(QThread):
         self.audit_signal.emit(audit_result)
     
     def extract_skill_id(self, html):
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            skill_links = soup.find_all('a', href=re.compile(r'skills/items/\d+'))
-            for link in skill_links:
-                href = link.get('href', '')
-                match = re.search(r'/(\d{4,5})_(\d+)_(\d+)\.html', str(href))
-                if match:
-                    return {
-                        "skill_id": match.group(1),
-                        "skill_level": match.group(2),
-                        "skill_sublevel": match.group(3)
-                    }
-            return None
-        except:
-            return None
+        return self.extractor.skill_ref(html)
     
     def extract_items_from_html(self, html, box_type, item_id):
-        items = []
-        try:
-            if not html or len(html) < 100:
-                return items
-                
-            soup = BeautifulSoup(html, 'html.parser')
-            item_wraps = soup.find_all('div', class_='item-wrap')
-            
-            for item_wrap in item_wraps:
-                if item_wrap.get('data-item'):
-                    item_data = self.extract_single_item_data(item_wrap)
-                    if item_data:
-                        items.append(item_data)
-            
-            return items
-        except:
-            return items
-
-    def extract_single_item_data(self, item_wrap):
-        try:
-            item_id = item_wrap.get('data-item', '')
-            if not item_id:
-                return None
-
-            name_elem = item_wrap.select_one('.name a')
-            if not name_elem:
-                return None
-            
-            name_parts = []
-            for content in name_elem.contents:
-                if content.name is None:
-                    text = content.strip()
-                    if text:
-                        name_parts.append(text)
-                else:
-                    span_text = content.get_text(strip=True)
-                    if span_text:
-                        name_parts.append(span_text)
-            
-            name_text = ' '.join(name_parts).strip()
-
-            if not name_text or name_text.lower() == "not available":
-                return None
-
-            count_elem = item_wrap.select_one('.count-col div')
-            count = count_elem.get_text(strip=True) if count_elem else "1"
-
-            item = {
-                "id": item_id,
-                "name": name_text,
-                "count": count
-            }
-            
-            enchant_elem = name_elem.select_one('.enchant')
-            if enchant_elem:
-                enchant_value = enchant_elem.get_text(strip=True)
-                if enchant_value.startswith('+'):
-                    enchant_value = enchant_value[1:]
-                try:
-                    item["enchant"] = int(enchant_value)
-                except ValueError:
-                    item["enchant"] = enchant_value
-            
-            name_container = item_wrap.select_one('.name')
-            if name_container and name_container.get('data-rank'):
-                item["grade"] = name_container.get('data-rank')
-            
-            return item
-        except:
-            return None
+        return self.extractor.box_items(html)
 
     def save_failed_item(self, item_id: str, error: str):
-        output_dir = Path(f"html_items_{self.site_type}")
-        item_dir = output_dir / item_id
-        item_dir.mkdir(exist_ok=True)
+        item_dir = Path(f"html_items_{self.site_type}") / item_id
         
         error_data = {
             "item_id": item_id,
@@ -603,8 +787,7 @@ class ScraperWorker(QThread):
         }
         
         try:
-            with open(item_dir / "failed.json", 'w', encoding='utf-8') as f:
-                json.dump(error_data, f, indent=2, ensure_ascii=False)
+            atomic_write(item_dir / "failed.json", json.dumps(error_data, indent=2, ensure_ascii=False).encode('utf-8'))
         except:
             pass
 
@@ -621,6 +804,11 @@ class ScraperWorker(QThread):
         if not xml_dir.exists():
             return []
         
+        # Uma consulta no item store em vez de abrir um data.json por item do XML
+        ghost_ids = get_item_store().ghost_item_ids(site_type)
+        if not ghost_ids:
+            return []
+        
         for xml_file in xml_dir.glob("*.xml"):
             try:
                 tree = ET.parse(xml_file)
@@ -628,14 +816,8 @@ class ScraperWorker(QThread):
                 
                 for item_elem in root.findall('.//item'):
                     item_id = item_elem.get('id')
-                    if item_id:
-                        data_file = Path(f"html_items_{site_type}/{item_id}/data.json")
-                        if data_file.exists():
-                            with open(data_file, 'r') as f:
-                                data = json.load(f)
-                            
-                            if data.get('scraping_info', {}).get('is_ghost_item'):
-                                ghost_items.append(item_id)
+                    if item_id and item_id in ghost_ids:
+                        ghost_items.append(item_id)
                                 
             except Exception as e:
                 print(f"Erro em {xml_file}: {e}")